@@ -0,0 +1,131 @@
+from collections import deque
+from typing import Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+
+def _format_stack(frame) -> str:
+    # Sin los frames del propio event loop, desde el callback que bloquea
+    stack = traceback.extract_stack(frame)
+    for i in range(len(stack) - 1, -1, -1):
+        if stack[i].filename.endswith(os.path.join("asyncio", "events.py")):
+            stack = stack[i + 1:]
+            break
+    return "".join(traceback.format_list(stack))
+
+
+class LoopWatchdog:
+    """
+    Detects code that blocks the event loop.
+
+    A heartbeat coroutine wakes up every `interval` seconds and records how
+    late it ran (the loop lag). A monitor thread checks the heartbeat; when
+    it is late by more than `threshold`, the loop is blocked and the thread
+    captures the stack of the loop thread, which shows the blocking call.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        interval: Optional[float] = None,
+        history: int = 20,
+        on_block: Optional[Callable[[dict], None]] = None,
+    ):
+        self.threshold = threshold
+        self.interval = interval or threshold / 2
+        self.on_block = on_block
+        self.blocks = 0
+        self.beats = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.recent = deque(maxlen=history)
+        self._current: Optional[dict] = None
+        self._beat = time.monotonic()
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional["LoopWatchdog"]:
+        """
+        Watchdog configured by LOOP_WATCHDOG ("false" disables it) and
+        LOOP_WATCHDOG_THRESHOLD_MS (100 by default)
+        """
+        if os.getenv("LOOP_WATCHDOG", "true").lower() == "false":
+            return None
+        threshold = float(os.getenv("LOOP_WATCHDOG_THRESHOLD_MS", 100)) / 1000
+        return cls(threshold=threshold, **kwargs)
+
+    def start(self) -> None:
+        """Start watching the running loop, call it from a coroutine"""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _heartbeat(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - start - self.interval)
+            self.beats += 1
+            self.last_lag = lag
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+            self._beat = now
+            current, self._current = self._current, None
+            if current is not None:
+                # El bloqueo terminó: ahora se conoce su duración
+                current["duration_ms"] = round(lag * 1000, 3)
+                logger.warning(
+                    f"Event loop bloqueado {current['duration_ms']} ms en:\n{current['stack']}"
+                )
+
+    def _monitor(self):
+        while not self._stop.wait(self.interval):
+            late = time.monotonic() - self._beat - self.interval
+            if late <= self.threshold or self._current is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            record = {
+                "at": time.time(),
+                "duration_ms": None,
+                "stack": _format_stack(frame) if frame else "",
+            }
+            self.blocks += 1
+            self.recent.append(record)
+            self._current = record
+            if self.on_block:
+                try:
+                    self.on_block(record)
+                except Exception as e:
+                    logger.error(f"Error en on_block del watchdog: {e}")
+
+    def stats(self) -> Dict:
+        """Block count, loop lag and the most recent blocking stacks"""
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "blocks": self.blocks,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "mean_lag_ms": round(self.total_lag * 1000 / self.beats, 3) if self.beats else 0.0,
+            "recent": list(self.recent),
+        }
@@ -1,10 +1,15 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Header, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import router
 from app.config import settings
 from app.websocket_manager import ws_manager
+from app.tracing import tracer
+from app import metrics, profiler
+from app.loop_watchdog import LoopWatchdog
 import logging
 import asyncio
+import time
+from typing import Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +28,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Ruta de la plantilla, no la URL, para no crear una serie por hash
+    route = request.scope.get("route")
+    route = route.path if route else "unmatched"
+    metrics.HTTP_REQUESTS.labels(route, request.method, response.status_code).inc()
+    metrics.HTTP_REQUEST_DURATION.labels(route).observe(time.perf_counter() - start)
+    return response
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+watchdog = LoopWatchdog.from_env(on_block=lambda record: metrics.LOOP_BLOCKS.inc())
+
+@app.on_event("startup")
+async def startup():
+    # SIGUSR2 escribe un perfil en PROFILE_DIR
+    profiler.install_signal_handler()
+    if watchdog:
+        watchdog.start()
+        metrics.LOOP_LAG.set_function(lambda: watchdog.last_lag)
+        metrics.LOOP_MAX_LAG.set_function(lambda: watchdog.max_lag)
+
+@app.get("/admin/loop")
+async def loop_stats(authorization: Optional[str] = Header(None)):
+    # Bloqueos del event loop con sus stacks
+    if not profiler.is_authorized(authorization) or not watchdog:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return watchdog.stats()
+
+@app.get("/admin/profile")
+async def profile_endpoint(
+    seconds: float = 10,
+    format: str = "json",
+    authorization: Optional[str] = Header(None)
+):
+    # Solo con el token ADMIN_TOKEN; sin token configurado el endpoint no existe
+    if not profiler.is_authorized(authorization):
+        raise HTTPException(status_code=404, detail="Not Found")
+    try:
+        result = await profiler.profile(seconds)
+    except profiler.ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "collapsed":
+        return Response(result["collapsed"], media_type="text/plain")
+    return result
+
 @app.websocket("/ws/bot")
 async def websocket_endpoint(websocket: WebSocket):
     try:
@@ -35,6 +90,12 @@ async def websocket_endpoint(websocket: WebSocket):
                 message = await websocket.receive_json()
                 if message.get("type") == "warning":
                     await ws_manager.process_warning(message)
+                elif message.get("type") == "trace" and message.get("transaction_hash"):
+                    tracer.record_remote(
+                        message["transaction_hash"],
+                        message.get("component", "bot"),
+                        message.get("spans", [])
+                    )
             except Exception as e:
                 logger.error(f"Error procesando mensaje: {e}")
                 break
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from app.schemas import TransactionRequest, TransactionResponse
 from app.websocket_manager import ws_manager
 from app.config import settings
+from app.tracing import tracer, is_reporter_authorized
+from app import metrics
 import hashlib
+import secrets
 import asyncio
 import httpx
 import logging
 import json
-from typing import Dict
+from contextlib import nullcontext
+from typing import Dict, List, Optional
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -29,7 +33,7 @@ def serialize_transaction(tx_request: TransactionRequest) -> dict:
         "reason": tx_request.reason
     }
 
-async def send_to_tx_agent(transaction_data: dict, warning: str = None):
+async def send_to_tx_agent(transaction_data: dict, warning: str = None, transaction_hash: str = None):
     try:
         try:
             jsonresp = json.loads(warning) if warning else {"message": "None", "status": "approved"}
@@ -52,12 +56,27 @@ async def send_to_tx_agent(transaction_data: dict, warning: str = None):
                 "warning": warning
             }
             logger.info(f"Enviando a txAgent: {data}")
-            response = await client.post(
-                f"{settings.TX_AGENT_URL}", 
-                json=data,
-                timeout=20.0  # Aumentamos el timeout a 20 segundos
-            )
-            return response.json()
+            # El txAgent mide sus fases y las devuelve en "spans"
+            headers = {"X-Transaction-Hash": transaction_hash} if transaction_hash else None
+            with tracer.span(transaction_hash, "tx_agent") if transaction_hash else nullcontext():
+                with metrics.TX_AGENT_DURATION.time():
+                    response = await client.post(
+                        f"{settings.TX_AGENT_URL}", 
+                        json=data,
+                        headers=headers,
+                        timeout=20.0  # Aumentamos el timeout a 20 segundos
+                    )
+            result = response.json()
+            spans = result.pop("spans", [])
+            for span in spans:
+                if span.get("name") == "llm":
+                    metrics.LLM_REQUEST_DURATION.observe(span["duration_ms"] / 1000)
+                    usage = span.get("attributes", {})
+                    metrics.LLM_TOKENS.labels("prompt").inc(usage.get("prompt_tokens", 0))
+                    metrics.LLM_TOKENS.labels("completion").inc(usage.get("completion_tokens", 0))
+            if transaction_hash:
+                tracer.record_remote(transaction_hash, "tx_agent", spans)
+            return result
         
     except httpx.ConnectError:
         logger.error(f"No se pudo conectar a txAgent en {settings.TX_AGENT_URL}")
@@ -73,13 +92,16 @@ async def process_transaction_with_timeout(tx_data: dict, transaction_hash: str)
         
         try:
             logger.info(f"Esperando warnings para {transaction_hash}...")
-            await asyncio.wait_for(event.wait(), timeout=10.0)
+            with tracer.span(transaction_hash, "bot_verdict") as attributes:
+                attributes["outcome"] = "timeout"
+                await asyncio.wait_for(event.wait(), timeout=10.0)
+                attributes["outcome"] = "warning"
             warning = ws_manager.get_warning(transaction_hash)
             
             if warning:
                 logger.info(f"Warning recibido para {transaction_hash}: {warning}")
                 warning_data = json.dumps(warning)
-                return await send_to_tx_agent(tx_data, warning_data)
+                return await send_to_tx_agent(tx_data, warning_data, transaction_hash)
             else:
                 logger.info(f"No se recibió warning para {transaction_hash}, procediendo con aprobación")
                 return {
@@ -89,6 +111,7 @@ async def process_transaction_with_timeout(tx_data: dict, transaction_hash: str)
                     "llm_response": "No warnings detected"
                 }
         except asyncio.TimeoutError:
+            metrics.VERDICT_TIMEOUTS.inc()
             logger.info(f"Timeout alcanzado para {transaction_hash}, procediendo con aprobación por defecto")
             return {
                 "status": "success",
@@ -107,9 +130,11 @@ async def process_agent_transaction(transaction: TransactionRequest):
         # Serializar la transacción
         tx_data = serialize_transaction(transaction)
         
-        # Generar hash
+        # Generar hash; con un nonce por petición, dos transacciones idénticas
+        # no comparten traza ni espera de warnings
+        nonce = secrets.token_hex(8)
         transaction_hash = hashlib.sha256(
-            json.dumps(tx_data, sort_keys=True).encode()
+            (json.dumps(tx_data, sort_keys=True) + nonce).encode()
         ).hexdigest()
         
         # Preparar mensaje para los bots
@@ -122,11 +147,16 @@ async def process_agent_transaction(transaction: TransactionRequest):
             }
         }
         
-        # Broadcast a los bots
-        await ws_manager.broadcast(tx_message)
-        
-        # Esperar el resultado del procesamiento y obtener la respuesta
-        tx_agent_response = await process_transaction_with_timeout(tx_data, transaction_hash)
+        with tracer.span(transaction_hash, "request") as attributes:
+            # Broadcast a los bots
+            with tracer.span(transaction_hash, "broadcast", bots=len(ws_manager.active_connections)):
+                with metrics.BROADCAST_DURATION.time():
+                    await ws_manager.broadcast(tx_message)
+            
+            # Esperar el resultado del procesamiento y obtener la respuesta
+            tx_agent_response = await process_transaction_with_timeout(tx_data, transaction_hash)
+            attributes["approval_status"] = tx_agent_response.get('approval_status', 'PENDING')
+            metrics.VERDICTS.labels(attributes["approval_status"]).inc()
         
         return TransactionResponse(
             status="success",
@@ -139,4 +169,30 @@ async def process_agent_transaction(transaction: TransactionRequest):
         raise HTTPException(
             status_code=500,
             detail=f"Error processing transaction: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/traces/{transaction_hash}")
+async def get_trace(transaction_hash: str):
+    spans = tracer.get(transaction_hash)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {
+        "transaction_hash": transaction_hash,
+        "phases_ms": tracer.summary(transaction_hash),
+        "spans": spans
+    }
+
+@router.post("/traces")
+async def report_spans(report: dict, authorization: Optional[str] = Header(None)):
+    # Spans medidos por otros componentes (bots, babysitter), solo con
+    # TRACE_TOKEN o ADMIN_TOKEN; sin token configurado el endpoint no existe
+    if not is_reporter_authorized(authorization):
+        raise HTTPException(status_code=404, detail="Not Found")
+    transaction_hash = report.get("transaction_hash")
+    spans: List[dict] = report.get("spans", [])
+    if not transaction_hash or not isinstance(spans, list):
+        raise HTTPException(status_code=400, detail="transaction_hash and spans are required")
+    tracer.record_remote(transaction_hash, report.get("component", "unknown"), spans)
+    return {"status": "success", "recorded": len(spans)}
+
+metrics.PENDING_VERDICTS.set_function(lambda: len(active_transactions))
@@ -0,0 +1,160 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import asyncio
+import hmac
+import json
+import logging
+import os
+import time
+
+import httpx
+
+from app import profiler
+
+logger = logging.getLogger(__name__)
+
+# Token compartido con los componentes que reportan spans (bots, babysitter)
+TRACE_TOKEN = os.getenv("TRACE_TOKEN")
+
+
+def is_reporter_authorized(token: Optional[str]) -> bool:
+    """Check a span reporter token: TRACE_TOKEN or ADMIN_TOKEN, never without one"""
+    if profiler.is_authorized(token):
+        return True
+    if not TRACE_TOKEN or not token:
+        return False
+    if token.startswith("Bearer "):
+        token = token[len("Bearer "):]
+    return hmac.compare_digest(token, TRACE_TOKEN)
+
+
+class Tracer:
+    """
+    Collects timed spans of each approval, keyed by the transaction hash.
+
+    The gateway records its own spans and the ones bots, the txAgent and
+    the babysitter report back, so one trace covers every component.
+    Spans can also be appended to a JSON Lines file (TRACE_FILE) and
+    forwarded to a collector (TRACE_COLLECTOR_URL).
+    """
+
+    def __init__(
+        self,
+        max_traces: int = 1000,
+        export_path: Optional[str] = None,
+        collector_url: Optional[str] = None,
+    ):
+        self.max_traces = max_traces
+        self.export_path = export_path
+        self.collector_url = collector_url
+        self.traces: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self._pending: List[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        trace_id: str,
+        name: str,
+        component: str,
+        start: float,
+        duration_ms: float,
+        **attributes,
+    ) -> dict:
+        """Store one finished span"""
+        span = {
+            "trace_id": trace_id,
+            "name": name,
+            "component": component,
+            "start": start,
+            "duration_ms": round(duration_ms, 3),
+            "attributes": attributes,
+        }
+        spans = self.traces.get(trace_id)
+        if spans is None:
+            spans = self.traces[trace_id] = []
+            while len(self.traces) > self.max_traces:
+                self.traces.popitem(last=False)
+        spans.append(span)
+        self._export(span)
+        return span
+
+    def record_remote(self, trace_id: str, component: str, spans: List[dict]):
+        """Store spans reported by another component"""
+        for span in spans or []:
+            try:
+                self.record(
+                    trace_id,
+                    span["name"],
+                    span.get("component", component),
+                    float(span["start"]),
+                    float(span["duration_ms"]),
+                    **span.get("attributes", {}),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Span inválido de {component}: {e}")
+
+    @contextmanager
+    def span(self, trace_id: str, name: str, component: str = "gateway", **attributes):
+        """Time the enclosed block, also across awaits"""
+        start = time.time()
+        began = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            self.record(
+                trace_id,
+                name,
+                component,
+                start,
+                (time.perf_counter() - began) * 1000,
+                **attributes,
+            )
+
+    def get(self, trace_id: str) -> List[dict]:
+        """Spans of one trace, in start order"""
+        return sorted(self.traces.get(trace_id, []), key=lambda span: span["start"])
+
+    def summary(self, trace_id: str) -> Dict[str, float]:
+        """Milliseconds spent per span name"""
+        totals: Dict[str, float] = {}
+        for span in self.traces.get(trace_id, []):
+            totals[span["name"]] = round(
+                totals.get(span["name"], 0) + span["duration_ms"], 3
+            )
+        return totals
+
+    def _export(self, span: dict):
+        if self.export_path:
+            try:
+                with open(self.export_path, "a") as f:
+                    f.write(json.dumps(span) + "\n")
+            except OSError as e:
+                logger.error(f"No se pudo escribir el span: {e}")
+        if self.collector_url:
+            self._pending.append(span)
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = loop.create_task(self._flush())
+
+    async def _flush(self):
+        # Batch the spans finished within the same second, until none are
+        # left: spans recorded while a batch is being sent go in the next one
+        while self._pending:
+            await asyncio.sleep(1)
+            batch, self._pending = self._pending, []
+            try:
+                async with httpx.AsyncClient() as client:
+                    await client.post(self.collector_url, json={"spans": batch}, timeout=5.0)
+            except httpx.HTTPError as e:
+                logger.error(f"No se pudieron enviar {len(batch)} spans al collector: {e}")
+
+
+tracer = Tracer(
+    max_traces=int(os.getenv("TRACE_MAX_TRACES", 1000)),
+    export_path=os.getenv("TRACE_FILE"),
+    collector_url=os.getenv("TRACE_COLLECTOR_URL"),
+)
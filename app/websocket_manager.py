@@ -3,6 +3,7 @@ from typing import List, Dict
 import json
 import asyncio
 import logging
+from app import metrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,6 +42,7 @@ class WebSocketManager:
     async def process_warning(self, warning_data: dict):
         tx_hash = warning_data.get("transaction_hash")
         if tx_hash:
+            metrics.BOT_WARNINGS.inc()
             self.warnings[tx_hash] = warning_data
             # Notificar a la transacción que está esperando
             from app.routes import active_transactions
@@ -54,4 +56,5 @@ class WebSocketManager:
     def clear_warning(self, tx_hash: str):
         self.warnings.pop(tx_hash, None)
 
-ws_manager = WebSocketManager() 
\ No newline at end of file
+ws_manager = WebSocketManager()
+metrics.BOTS_CONNECTED.set_function(lambda: len(ws_manager.active_connections)) 
\ No newline at end of file
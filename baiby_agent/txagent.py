@@ -6,9 +6,12 @@ import logging
 from supabase import create_client, Client
 from datetime import datetime
 import asyncio
+import time
+from contextlib import contextmanager
 from openai import OpenAI
 from dotenv import load_dotenv
 import os
+from app.loop_watchdog import LoopWatchdog
 
 load_dotenv()
 
@@ -24,6 +27,22 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 client = OpenAI(api_key=OPENAI_API_KEY)
 
 app = FastAPI(title="TX Agent Service")
+# Las llamadas síncronas a Supabase y OpenAI bloquean el event loop
+watchdog = LoopWatchdog.from_env()
+
+@app.on_event("startup")
+async def start_watchdog():
+    if watchdog:
+        watchdog.start()
+
+@app.get("/watchdog")
+async def watchdog_stats():
+    if not watchdog:
+        return {"enabled": False}
+    stats = watchdog.stats()
+    # Los stacks quedan en los logs
+    stats.pop("recent")
+    return {"enabled": True, **stats}
 
 class Transaction(BaseModel):
     to: str
@@ -39,7 +58,24 @@ class TransactionRequest(BaseModel):
     bot_reason: Optional[str] = None
     status: Optional[str] = None
 
-async def analyze_with_llm(request: TransactionRequest) -> tuple[bool, str]:
+@contextmanager
+def span(spans: list, name: str):
+    # Fase medida, devuelta al gateway para el trace de la transacción
+    start = time.time()
+    began = time.perf_counter()
+    attributes = {}
+    try:
+        yield attributes
+    finally:
+        spans.append({
+            "name": name,
+            "component": "tx_agent",
+            "start": start,
+            "duration_ms": round((time.perf_counter() - began) * 1000, 3),
+            "attributes": attributes
+        })
+
+async def analyze_with_llm(request: TransactionRequest) -> tuple[bool, str, dict]:
     try:
 
         # 2. Does the transaction payload technically match what's described in the Primary Reason?
@@ -71,11 +107,15 @@ async def analyze_with_llm(request: TransactionRequest) -> tuple[bool, str]:
         
         response = completion.choices[0].message.content
         decision = response.strip().upper().startswith("YES")
-        return decision, response
+        usage = {
+            "prompt_tokens": completion.usage.prompt_tokens,
+            "completion_tokens": completion.usage.completion_tokens
+        } if completion.usage else {}
+        return decision, response, usage
         
     except Exception as e:
         logger.error(f"Error en análisis LLM: {e}")
-        return False, str(e)
+        return False, str(e), {}
 
 @app.post("/")
 async def process_transaction(data: TransactionRequest):
@@ -83,41 +123,48 @@ async def process_transaction(data: TransactionRequest):
         logger.info(f"Transaction received: {data}")
         llm_response = "empty"
         approval_status = "APPROVED"  # Default status
+        spans = []
 
         if data.warning:
             try:
                 # First insert
                 logger.info("Performing first insert...")
-                result1 = supabase.table("live_chat").insert({
-                    "owner": "your_bot",
-                    "wallet": data.safeAddress,
-                    "messages": f"i want to send this TX:{data.transactions} because {data.reason}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }).execute()
+                with span(spans, "db_insert"):
+                    result1 = supabase.table("live_chat").insert({
+                        "owner": "your_bot",
+                        "wallet": data.safeAddress,
+                        "messages": f"i want to send this TX:{data.transactions} because {data.reason}",
+                        "timestamp": datetime.utcnow().isoformat()
+                    }).execute()
                 logger.info(f"First insert completed: {result1}")
 
                 # If status is warning, consult LLM
                 if data.status == "warning":
-                    should_proceed, llm_response = await analyze_with_llm(data)
+                    with span(spans, "llm") as attributes:
+                        should_proceed, llm_response, usage = await analyze_with_llm(data)
+                        attributes.update(usage)
                     approval_status = "APPROVED" if should_proceed else "REJECTED"
                     
                     # Second insert with LLM response
                     logger.info("Performing second insert with LLM analysis...")
-                    result2 = supabase.table("live_chat").insert({
-                        "owner": "bAIbysitter",
-                        "wallet": data.safeAddress,
-                        "messages": f"{approval_status} - LLM Analysis: {llm_response}",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }).execute()
+                    with span(spans, "db_insert"):
+                        result2 = supabase.table("live_chat").insert({
+                            "owner": "bAIbysitter",
+                            "wallet": data.safeAddress,
+                            "messages": f"{approval_status} - LLM Analysis: {llm_response}",
+                            "timestamp": datetime.utcnow().isoformat()
+                        }).execute()
                 else:
                     # Original insert if no warning
-                    await asyncio.sleep(3)
-                    result2 = supabase.table("live_chat").insert({
-                        "owner": "bAIbysitter",
-                        "wallet": data.safeAddress,
-                        "messages": f"Transaction {data.status} reason match llm {llm_response}",
-                        "timestamp": datetime.utcnow().isoformat()
-                    }).execute()
+                    with span(spans, "delay"):
+                        await asyncio.sleep(3)
+                    with span(spans, "db_insert"):
+                        result2 = supabase.table("live_chat").insert({
+                            "owner": "bAIbysitter",
+                            "wallet": data.safeAddress,
+                            "messages": f"Transaction {data.status} reason match llm {llm_response}",
+                            "timestamp": datetime.utcnow().isoformat()
+                        }).execute()
                 
                 logger.info(f"Second insert completed: {result2}")
                 
@@ -137,7 +184,8 @@ async def process_transaction(data: TransactionRequest):
             "data": {
                 "safeAddress": data.safeAddress,
                 "warning": data.warning
-            }
+            },
+            "spans": spans
         }
     except Exception as e:
         logger.error(f"Error procesando transacción: {e}")
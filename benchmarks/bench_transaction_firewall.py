@@ -0,0 +1,443 @@
+"""
+Offline benchmark of the transaction-firewall path.
+
+Starts the gateway (app/main.py) with stub bots and a stub txAgent as
+separate processes, drives /agent/transaction/ at a fixed concurrency the
+way the babysitter does, and broadcasts approved transactions to a stub
+chain. Nothing leaves the machine: the stubs replace GoPlus, Supabase,
+OpenAI and the Injective chain with configurable sleeps.
+
+Every request uses its own safe address, so the stubs can report when they
+saw it and the run is split into phases:
+
+    broadcast     client send -> stub bot receives the transaction
+    bot_verdict   bot receives -> txAgent receives the verdict
+                  (the gateway waits its full timeout when no bot warns)
+    tx_agent      time spent in the txAgent
+    llm           stub LLM analysis inside the txAgent
+    chain         stub chain broadcast after approval
+
+    python -m benchmarks.bench_transaction_firewall --requests 500 --concurrency 32
+
+The report is JSON (stdout or --output) so runs can be compared.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def record(events_path: str, **event):
+    """Append one event of a stub to its events file"""
+    with open(events_path, "a") as f:
+        f.write(json.dumps(event) + "\n")
+
+
+def read_events(events_path: str) -> List[dict]:
+    if not os.path.exists(events_path):
+        return []
+    with open(events_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- Stub txAgent -----------------------------------------------------------
+
+
+def run_tx_agent(port: int, events_path: str, llm_latency: float):
+    """Stand-in for baiby_agent/txagent.py: same contract, simulated LLM"""
+    from fastapi import FastAPI, Request
+    import uvicorn
+
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.post("/")
+    async def process_transaction(request: Request):
+        received = time.time()
+        data = await request.json()
+        llm_response = "empty"
+        approval_status = "APPROVED"
+        llm_time = 0.0
+        if data.get("warning") and data.get("status") == "warning":
+            start = time.time()
+            await asyncio.sleep(llm_latency)
+            llm_time = time.time() - start
+            llm_response = "YES - stub analysis"
+        record(
+            events_path,
+            component="tx_agent",
+            safe_address=data.get("safeAddress"),
+            received=received,
+            duration=time.time() - received,
+            llm=llm_time,
+        )
+        return {
+            "status": "success",
+            "message": f"Transaction {approval_status} - {llm_response}",
+            "approval_status": approval_status,
+            "llm_response": llm_response,
+        }
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# --- Stub bot ---------------------------------------------------------------
+
+
+async def run_bot(
+    url: str, bot_id: int, events_path: str, verdict_latency: float, warning_rate: float
+):
+    """Stand-in for bots/test_bot*.py: warns on a share of the transactions"""
+    import websockets
+
+    async with websockets.connect(url) as websocket:
+        record(events_path, component="bot", bot_id=bot_id, ready=True)
+
+        async def verdict(data: dict, received: float):
+            await asyncio.sleep(verdict_latency)
+            # Deterministic per transaction, so every bot agrees
+            if random.Random(data["hash"]).random() < warning_rate:
+                await websocket.send(
+                    json.dumps(
+                        {
+                            "type": "warning",
+                            "message": "Warning: stub bot flagged the destination",
+                            "transaction_hash": data["hash"],
+                            "status": "warning",
+                        }
+                    )
+                )
+            record(
+                events_path,
+                component="bot",
+                bot_id=bot_id,
+                safe_address=data.get("safewallet"),
+                received=received,
+            )
+
+        async for message in websocket:
+            received = time.time()
+            data = json.loads(message)
+            if data.get("type") == "transaction":
+                asyncio.ensure_future(verdict(data["data"], received))
+
+
+# --- Process sampling -------------------------------------------------------
+
+
+def sample_process(pid: int) -> Optional[dict]:
+    """CPU seconds and memory of a process, from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status", "r") as f:
+            status = dict(
+                line.split(":", 1) for line in f.read().splitlines() if ":" in line
+            )
+    except OSError:
+        return None
+    return {
+        # utime and stime are fields 14 and 15, 12 and 13 after the name
+        "cpu_s": (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        "rss_mb": int(status["VmRSS"].split()[0]) / 1024,
+        "peak_rss_mb": int(status["VmHWM"].split()[0]) / 1024,
+    }
+
+
+def component_usage(pids: List[int], before: Dict[int, dict], elapsed: float) -> dict:
+    cpu_s = rss_mb = peak_rss_mb = 0.0
+    for pid in pids:
+        after = sample_process(pid)
+        if after is None or before.get(pid) is None:
+            return {"available": False}
+        cpu_s += after["cpu_s"] - before[pid]["cpu_s"]
+        rss_mb += after["rss_mb"]
+        peak_rss_mb += after["peak_rss_mb"]
+    return {
+        "processes": len(pids),
+        "cpu_s": round(cpu_s, 3),
+        "cpu_percent": round(cpu_s / elapsed * 100, 1),
+        "rss_mb": round(rss_mb, 1),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+
+# --- Driver -----------------------------------------------------------------
+
+
+def percentiles(values: List[float]) -> Optional[dict]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def transaction_request(index: int, run_id: str) -> dict:
+    """Body the babysitter sends for a transfer, with a unique safe address"""
+    return {
+        "safeAddress": f"inj1bench{run_id}{index:08d}",
+        "erc20TokenAddress": "inj",
+        "reason": "Benchmark transfer",
+        "transactions": [
+            {"to": "inj1benchrecipient", "data": f"MsgSend {index}", "value": "1"}
+        ],
+    }
+
+
+async def drive(args, gateway_url: str, run_id: str) -> List[dict]:
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+
+        async def send(index: int) -> dict:
+            body = transaction_request(index, run_id)
+            async with semaphore:
+                sent = time.time()
+                result = {"safe_address": body["safeAddress"], "sent": sent}
+                try:
+                    response = await client.post(
+                        f"{gateway_url}/agent/transaction/", json=body
+                    )
+                    result["status"] = response.status_code
+                    approved = (
+                        response.status_code == 200
+                        and "APPROVED" in response.json().get("message", "")
+                    )
+                    if approved:
+                        # Stub chain broadcast of the approved transaction
+                        chain_start = time.time()
+                        await asyncio.sleep(args.chain_latency_ms / 1000)
+                        result["chain"] = time.time() - chain_start
+                except httpx.HTTPError as e:
+                    result["status"] = None
+                    result["error"] = str(e) or type(e).__name__
+                result["latency"] = time.time() - sent
+                return result
+
+        return await asyncio.gather(*[send(i) for i in range(args.requests)])
+
+
+async def wait_until(check, timeout: float, what: str):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if await check():
+                return
+        except (httpx.HTTPError, OSError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {what}")
+
+
+async def run_benchmark(args) -> dict:
+    run_id = f"{random.randrange(16 ** 6):06x}"
+    workdir = tempfile.mkdtemp(prefix="bench_firewall_")
+    events_path = os.path.join(workdir, "events.jsonl")
+    gateway_url = f"http://127.0.0.1:{args.gateway_port}"
+    python = sys.executable
+    logs = open(os.path.join(workdir, "components.log"), "w")
+    processes: Dict[str, List[subprocess.Popen]] = {}
+
+    def spawn(component: str, command: List[str], env: Optional[dict] = None):
+        process = subprocess.Popen(
+            command, cwd=ROOT, stdout=logs, stderr=logs, env={**os.environ, **(env or {})}
+        )
+        processes.setdefault(component, []).append(process)
+
+    this_module = "benchmarks.bench_transaction_firewall"
+    try:
+        spawn(
+            "tx_agent",
+            [python, "-m", this_module, "--role", "tx_agent",
+             "--port", str(args.tx_agent_port), "--events", events_path,
+             "--llm-latency-ms", str(args.llm_latency_ms)],
+        )
+        spawn(
+            "gateway",
+            [python, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+             "--port", str(args.gateway_port), "--log-level", "warning"],
+            env={"TX_AGENT_URL": f"http://127.0.0.1:{args.tx_agent_port}/"},
+        )
+
+        async with httpx.AsyncClient(timeout=2.0) as client:
+
+            async def up(url):
+                return (await client.get(url)).status_code == 200
+
+            await wait_until(lambda: up(f"{gateway_url}/docs"), 30, "the gateway")
+            await wait_until(
+                lambda: up(f"http://127.0.0.1:{args.tx_agent_port}/health"),
+                30,
+                "the txAgent",
+            )
+
+        for bot_id in range(args.bots):
+            spawn(
+                "bots",
+                [python, "-m", this_module, "--role", "bot", "--bot-id", str(bot_id),
+                 "--gateway-port", str(args.gateway_port), "--events", events_path,
+                 "--verdict-latency-ms", str(args.verdict_latency_ms),
+                 "--warning-rate", str(args.warning_rate)],
+            )
+
+        async def bots_ready():
+            ready = [e for e in read_events(events_path) if e.get("ready")]
+            return len(ready) >= args.bots
+
+        await wait_until(bots_ready, 30, "the bots")
+
+        pids = {name: [p.pid for p in procs] for name, procs in processes.items()}
+        before = {pid: sample_process(pid) for group in pids.values() for pid in group}
+        driver_cpu = time.process_time()
+        start = time.time()
+        results = await drive(args, gateway_url, run_id)
+        elapsed = time.time() - start
+        # Give the stubs a moment to flush their last events
+        await asyncio.sleep(0.5)
+
+        components = {
+            name: component_usage(group, before, elapsed) for name, group in pids.items()
+        }
+        components["driver"] = {
+            "processes": 1,
+            "cpu_s": round(time.process_time() - driver_cpu, 3),
+        }
+    finally:
+        for procs in processes.values():
+            for process in procs:
+                process.terminate()
+        for procs in processes.values():
+            for process in procs:
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        logs.close()
+
+    # Join the stub events to the requests by safe address
+    first_bot: Dict[str, float] = {}
+    tx_agent: Dict[str, dict] = {}
+    for event in read_events(events_path):
+        address = event.get("safe_address")
+        if not address:
+            continue
+        if event["component"] == "bot":
+            first_bot[address] = min(first_bot.get(address, event["received"]), event["received"])
+        elif event["component"] == "tx_agent":
+            tx_agent[address] = event
+
+    phases: Dict[str, List[float]] = {
+        "broadcast": [], "bot_verdict": [], "tx_agent": [], "llm": [], "chain": []
+    }
+    for result in results:
+        address = result["safe_address"]
+        if address in first_bot:
+            phases["broadcast"].append(first_bot[address] - result["sent"])
+            if address in tx_agent:
+                phases["bot_verdict"].append(tx_agent[address]["received"] - first_bot[address])
+        if address in tx_agent:
+            phases["tx_agent"].append(tx_agent[address]["duration"])
+            if tx_agent[address]["llm"]:
+                phases["llm"].append(tx_agent[address]["llm"])
+        if "chain" in result:
+            phases["chain"].append(result["chain"])
+
+    failed = [r for r in results if r.get("status") != 200]
+    if not args.keep_logs:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "bots": args.bots,
+            "warning_rate": args.warning_rate,
+            "verdict_latency_ms": args.verdict_latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "chain_latency_ms": args.chain_latency_ms,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2),
+        "errors": len(failed),
+        "latency": percentiles([r["latency"] for r in results if r.get("status") == 200]),
+        "phases": {name: percentiles(values) for name, values in phases.items()},
+        "components": components,
+        "logs": workdir if args.keep_logs else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transaction-firewall path")
+    parser.add_argument("--requests", type=int, default=200, help="transactions to send")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--bots", type=int, default=3, help="stub bot processes")
+    parser.add_argument(
+        "--warning-rate",
+        type=float,
+        default=1.0,
+        help="share of transactions the bots warn about; the rest wait the gateway timeout",
+    )
+    parser.add_argument("--verdict-latency-ms", type=float, default=50, help="stub bot check")
+    parser.add_argument("--llm-latency-ms", type=float, default=800, help="stub LLM analysis")
+    parser.add_argument("--chain-latency-ms", type=float, default=100, help="stub chain broadcast")
+    parser.add_argument("--gateway-port", type=int, default=18000)
+    parser.add_argument("--tx-agent-port", type=int, default=18001)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--keep-logs", action="store_true", help="keep component logs")
+    # Internal: run one of the stubs
+    parser.add_argument("--role", choices=["driver", "tx_agent", "bot"], default="driver")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--bot-id", type=int, default=0)
+    parser.add_argument("--events")
+    args = parser.parse_args()
+
+    if args.role == "tx_agent":
+        run_tx_agent(args.port, args.events, args.llm_latency_ms / 1000)
+    elif args.role == "bot":
+        asyncio.run(
+            run_bot(
+                f"ws://127.0.0.1:{args.gateway_port}/ws/bot",
+                args.bot_id,
+                args.events,
+                args.verdict_latency_ms / 1000,
+                args.warning_rate,
+            )
+        )
+    else:
+        report = asyncio.run(run_benchmark(args))
+        output = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output)
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
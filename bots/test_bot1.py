@@ -2,8 +2,15 @@ import asyncio
 import websockets
 import json
 import logging
+import time
 from datetime import datetime
 from goplus.address import Address
+import sys
+import os
+
+# El watchdog compartido vive en app/, un nivel arriba de bots/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.loop_watchdog import LoopWatchdog
 
 logging.basicConfig(
     level=logging.INFO,
@@ -38,6 +45,10 @@ async def check_address_security(address: str) -> tuple[bool, str]:
         return False, f"Error checking address: {str(e)}"
 
 async def monitor_transactions():
+    # Avisa con el stack cuando un chequeo síncrono bloquea el loop
+    watchdog = LoopWatchdog.from_env()
+    if watchdog:
+        watchdog.start()
     uri = "ws://localhost:8000/ws/bot"
     
     while True:  # Bucle principal para reconexión
@@ -59,6 +70,8 @@ async def monitor_transactions():
                             
                             logger.info(f"🔍 Analizando transacciones: {transactions}")
                             
+                            check_start = time.time()
+                            check_began = time.perf_counter()
                             # Verificar cada transacción con GoPlus
                             for tx in transactions:
                                 destination_address = tx.get("to")
@@ -80,6 +93,18 @@ async def monitor_transactions():
                                     await websocket.send(json.dumps(warning))
                                     logger.info(f"⚠️ Warning enviado: {warning}")
                                     break  # Solo enviamos un warning por lote de transacciones
+
+                            # Tiempo del chequeo, para el trace de la transacción en el gateway
+                            await websocket.send(json.dumps({
+                                "type": "trace",
+                                "transaction_hash": transaction_hash,
+                                "component": "bot_goplus",
+                                "spans": [{
+                                    "name": "bot_check",
+                                    "start": check_start,
+                                    "duration_ms": round((time.perf_counter() - check_began) * 1000, 3)
+                                }]
+                            }))
                     
                     except websockets.ConnectionClosed:
                         logger.warning("❌ Conexión cerrada. Intentando reconectar...")
@@ -2,6 +2,7 @@ import asyncio
 import websockets
 import json
 import logging
+import time
 import sys
 from datetime import datetime
 import traceback
@@ -10,6 +11,10 @@ import os
 from pyinjective.async_client import AsyncClient
 from pyinjective.core.network import Network
 import base64
+
+# El watchdog compartido vive en app/, un nivel arriba de bots/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.loop_watchdog import LoopWatchdog
 # Cargar variables de entorno
 load_dotenv()
 
@@ -86,6 +91,10 @@ async def check_first_transfer(from_address: str, to_address: str) -> bool:
         return True
 
 async def monitor_transactions():
+    # Avisa con el stack cuando un chequeo síncrono bloquea el loop
+    watchdog = LoopWatchdog.from_env()
+    if watchdog:
+        watchdog.start()
     while True:
         try:
             async with websockets.connect(WS_BOT_URL) as websocket:
@@ -103,6 +112,8 @@ async def monitor_transactions():
                         if not safewallet:
                             continue
                             
+                        check_start = time.time()
+                        check_began = time.perf_counter()
                         for tx in transactions:
                             to_address = tx.get("to")
                             if not to_address:
@@ -123,6 +134,18 @@ async def monitor_transactions():
                                 
                                 await websocket.send(json.dumps(warning))
                                 break
+
+                        # Tiempo del chequeo, para el trace de la transacción en el gateway
+                        await websocket.send(json.dumps({
+                            "type": "trace",
+                            "transaction_hash": transaction_hash,
+                            "component": "bot_new_address",
+                            "spans": [{
+                                "name": "bot_check",
+                                "start": check_start,
+                                "duration_ms": round((time.perf_counter() - check_began) * 1000, 3)
+                            }]
+                        }))
                                 
         except Exception as e:
             logger.error(f"❌ Error in monitor_transactions: {e}")
@@ -2,12 +2,18 @@ import asyncio
 import websockets
 import json
 import logging
+import time
 from datetime import datetime
 import traceback
 from web3 import Web3
 from risk_function import calculate_risk
 from dotenv import load_dotenv
 import os
+import sys
+
+# El watchdog compartido vive en app/, un nivel arriba de bots/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.loop_watchdog import LoopWatchdog
 
 # Cargar variables de entorno
 load_dotenv()
@@ -25,6 +31,10 @@ RPC_URL = os.getenv('RPC_URL')
 w3 = Web3(Web3.HTTPProvider(RPC_URL))
 
 async def monitor_transactions():
+    # Avisa con el stack cuando un chequeo síncrono bloquea el loop
+    watchdog = LoopWatchdog.from_env()
+    if watchdog:
+        watchdog.start()
     uri = WS_BOT_URL
     
     while True:  # Bucle principal para reconexión
@@ -46,6 +56,8 @@ async def monitor_transactions():
                             
                             logger.info(f"🔍 Analizando transacciones: {transactions}")
                             
+                            check_start = time.time()
+                            check_began = time.perf_counter()
                             # Verificar cada transacción
                             for tx in transactions:
                                 tx_data = tx.get("data", "")
@@ -63,6 +75,18 @@ async def monitor_transactions():
                                     await websocket.send(json.dumps(warning))
                                     logger.info(f"⚠️ Warning enviado: {warning}")
                                     break
+
+                            # Tiempo del chequeo, para el trace de la transacción en el gateway
+                            await websocket.send(json.dumps({
+                                "type": "trace",
+                                "transaction_hash": transaction_hash,
+                                "component": "bot_swap_risk",
+                                "spans": [{
+                                    "name": "bot_check",
+                                    "start": check_start,
+                                    "duration_ms": round((time.perf_counter() - check_began) * 1000, 3)
+                                }]
+                            }))
                     
                     except websockets.ConnectionClosed:
                         logger.warning("❌ Conexión cerrada. Intentando reconectar...")
@@ -1,26 +1,71 @@
 from openai import OpenAI
 import os
 from dotenv import load_dotenv
-from quart import Quart, request, jsonify
+from quart import Quart, Response, request, jsonify, g
 from datetime import datetime
 import argparse
 from injective_functions.factory import InjectiveClientFactory
 from injective_functions.utils.function_helper import (
-    FunctionSchemaLoader,
     FunctionExecutor,
+    InjectiveFunctionMapper,
 )
+from injective_functions.utils.schema_registry import SchemaRegistry
+from injective_functions.utils.http_session import HttpSessionManager
+from injective_functions.utils import metrics, profiler
+from injective_functions.utils.loop_watchdog import LoopWatchdog
+from injective_functions.utils.structured_logging import configure_logging, get_logger
+from app.conversation_store import ConversationStore, JsonFileBackend
+from app.result_renderer import render_results
 import json
 import asyncio
+import hashlib
+import logging
+import threading
+import time
 from hypercorn.config import Config
 from hypercorn.asyncio import serve
 import aiohttp
 from decimal import Decimal
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Optional
 
 # Initialize Quart app (async version of Flask)
 app = Quart(__name__)
+logger = get_logger(__name__)
+# One of every N chat requests is logged at INFO
+REQUEST_LOG_SAMPLE = int(os.getenv("LOG_REQUEST_SAMPLE", 100))
+# Seconds without an event after which a streamed response sends a keepalive line
+STREAM_KEEPALIVE_SECONDS = float(os.getenv("STREAM_KEEPALIVE_SECONDS", 15))
 
 
 class InjectiveChatAgent:
+    SYSTEM_PROMPT = """You are a helpful AI assistant on Injective Chain. 
+                    You will be answering all things related to injective chain, and help out with
+                    on-chain functions.
+                    
+                    When handling market IDs, always use these standardized formats:
+                    - For BTC perpetual: "BTC/USDT PERP" maps to "btcusdt-perp"
+                    - For ETH perpetual: "ETH/USDT PERP" maps to "ethusdt-perp"
+                    
+                    When users mention markets:
+                    1. If they use casual terms like "Bitcoin perpetual" or "BTC perp", interpret it as "BTC/USDT PERP"
+                    2. If they mention "Ethereum futures" or "ETH perpetual", interpret it as "ETH/USDT PERP"
+                    3. Always use the standardized format in your responses
+                    
+                    Before performing any action:
+                    1. Describe what you're about to do
+                    2. Ask for explicit confirmation
+                    3. Only proceed after receiving a "yes"
+                    
+                    When making function calls:
+                    1. Convert the standardized format (e.g., "BTC/USDT PERP") to the internal format (e.g., "btcusdt-perp")
+                    2. When displaying results to users, convert back to the standard format
+                    3. Always confirm before executing any functions
+                    
+                    For general questions, provide informative responses.
+                    When users want to perform actions, describe the action and ask for confirmation but for fetching data you dont have to ask for confirmation."""
+
     def __init__(self):
         # Load environment variables
         load_dotenv()
@@ -35,235 +80,563 @@ class InjectiveChatAgent:
         # Initialize OpenAI client
         self.client = OpenAI(api_key=self.api_key)
 
-        # Initialize conversation histories
-        self.conversations = {}
-        # Initialize injective agents
+        # Initialize conversation histories, optionally persisted to disk
+        store_dir = os.getenv("CONVERSATION_STORE_DIR")
+        self.conversations = ConversationStore(
+            max_sessions=int(os.getenv("CONVERSATION_MAX_SESSIONS", 1000)),
+            token_budget=int(os.getenv("CONVERSATION_TOKEN_BUDGET", 6000)),
+            backend=JsonFileBackend(store_dir) if store_dir else None,
+        )
+        # Initialize injective agents, one client bundle per agent id
         self.agents = {}
-        schema_paths = [
-            "./injective_functions/account/account_schema.json",
-            "./injective_functions/auction/auction_schema.json",
-            "./injective_functions/authz/authz_schema.json",
-            "./injective_functions/bank/bank_schema.json",
-            "./injective_functions/exchange/exchange_schema.json",
-            "./injective_functions/staking/staking_schema.json",
-            "./injective_functions/token_factory/token_factory_schema.json",
-            "./injective_functions/utils/utils_schema.json",
-        ]
-        self.function_schemas = FunctionSchemaLoader.load_schemas(schema_paths)
+        # agent id -> (key fingerprint, environment) the bundle was built for
+        self._agent_keys: Dict[str, tuple] = {}
+        self._agent_locks: Dict[str, asyncio.Lock] = {}
+        # Compiled function schemas, a subset is sent on every step
+        self.schema_registry = SchemaRegistry.load()
+        # session id -> tools of its last step, reused by bare follow-ups
+        self.session_tools: "OrderedDict[str, list]" = OrderedDict()
+
+        # Agent loop: one model for every step of a turn
+        self.model = os.getenv("AGENT_MODEL", "gpt-4o")
+        self.max_steps = max(2, int(os.getenv("AGENT_MAX_STEPS", 4)))
+        # Phrase simple function results (balances, tx hashes) without the model
+        self.local_rendering = os.getenv("AGENT_LOCAL_RENDERING", "true").lower() != "false"
+
+    async def prewarm(self, agents: list, concurrency: int = 8) -> dict:
+        """
+        Build the client bundles of several agents before their first chat.
+
+        Args:
+            agents (list): {"agent_id", "agent_key", "environment"} of each agent
+            concurrency (int, optional): Bundles created at the same time
+
+        Returns:
+            dict: {"warmed": [agent ids], "failed": [{"agent_id", "error"}]}
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def warm(agent: dict):
+            async with semaphore:
+                await self.initialize_agent(
+                    agent_id=agent["agent_id"],
+                    private_key=agent["agent_key"],
+                    environment=agent.get("environment", "mainnet"),
+                )
+
+        results = await asyncio.gather(
+            *[warm(agent) for agent in agents], return_exceptions=True
+        )
+        warmed, failed = [], []
+        for agent, result in zip(agents, results):
+            agent_id = agent.get("agent_id")
+            if isinstance(result, Exception):
+                logger.warning("agent_prewarm_failed", agent_id=agent_id, error=str(result))
+                failed.append({"agent_id": agent_id, "error": str(result)})
+            else:
+                warmed.append(agent_id)
+        return {"warmed": warmed, "failed": failed}
+
+    @staticmethod
+    def _agent_key(private_key: str, environment: str) -> tuple:
+        # Keys are compared by fingerprint, not kept in another map
+        return (hashlib.sha256(str(private_key).encode()).hexdigest(), environment)
 
     async def initialize_agent(
         self, agent_id: str, private_key: str, environment: str = "mainnet"
     ) -> None:
-        """Initialize Injective clients if they don't exist"""
-        try:
-            print(f"DEBUG - Initializing agent for environment: {environment}")
-            if agent_id in self.agents:
-                print(f"DEBUG - Agent {agent_id} already exists, reinitializing...")
-                del self.agents[agent_id]
-            
-            clients = await InjectiveClientFactory.create_all(
-                private_key=private_key,
-                network_type=environment
-            )
+        """
+        Initialize Injective clients if they don't exist.
+
+        The bundle of an agent is reused while its key and network are the
+        same, so its chain client stays ready across requests. Concurrent
+        requests of one agent wait for a single creation, and a rebuilt
+        bundle replaces the old one without a gap.
+        """
+        key = self._agent_key(private_key, environment)
+        if agent_id in self.agents and self._agent_keys.get(agent_id) == key:
+            return
+        lock = self._agent_locks.setdefault(agent_id, asyncio.Lock())
+        async with lock:
+            # Another request may have built it while this one waited
+            if agent_id in self.agents and self._agent_keys.get(agent_id) == key:
+                return
+            try:
+                logger.debug(
+                    "agent_init",
+                    agent_id=agent_id,
+                    environment=environment,
+                    reinitialized=agent_id in self.agents,
+                )
+                clients = await InjectiveClientFactory.create_all(
+                    private_key=private_key,
+                    network_type=environment
+                )
+            except Exception as e:
+                logger.error("agent_init_failed", agent_id=agent_id, error=str(e))
+                raise
             self.agents[agent_id] = clients
-            print(f"DEBUG - Agent initialized successfully for {environment}")
-        except Exception as e:
-            print(f"DEBUG - Error initializing agent: {str(e)}")
-            raise
+            self._agent_keys[agent_id] = key
+
+    async def validate_action(
+        self, function_name: str, arguments: dict, session_id: str, agent_id: str
+    ) -> Optional[dict]:
+        """
+        Ask the transaction firewall about a call that changes chain state.
+
+        Returns:
+            Optional[dict]: None if approved, the error result otherwise. Writes
+            are refused when the agent has no firewall configured.
+        """
+        babysitter = getattr(self.agents[agent_id].get("bank"), "babysitter", None)
+        if babysitter is None:
+            return {
+                "success": False,
+                "error": f"{function_name} requires the transaction firewall, which is not configured",
+            }
+        validation = await babysitter.validate_action(
+            function_name, arguments, self.conversations.history(session_id)
+        )
+        if babysitter.is_approved(validation):
+            return None
+        logger.info("action_rejected", function=function_name, reason=validation.get("message"))
+        return {
+            "success": False,
+            "error": f"Transaction rejected: {validation.get('message', validation.get('reason', 'Unknown reason'))}",
+        }
 
     async def execute_function(self, function_name: str, arguments: dict, session_id: str, agent_id: str):
         try:
-            print(f"DEBUG - Executing function: {function_name}")
-            print(f"DEBUG - Arguments: {arguments}")
-            print(f"DEBUG - Agent ID: {agent_id}")
+            logger.debug(
+                "function_call",
+                function=function_name,
+                arguments=arguments,
+                agent_id=agent_id,
+            )
             
             if function_name == "transfer_funds":
                 # Obtener el historial de chat de la sesión actual
-                chat_history = self.conversations.get(session_id, [])
-                print(f"DEBUG - Chat history length: {len(chat_history)}")
-                
-                result = await self.agents[agent_id]["bank"].transfer_funds(
-                    amount=Decimal(arguments["amount"]),
-                    denom=arguments.get("denom", "INJ"),
-                    to_address=arguments["to_address"],
-                    chat_history=chat_history
+                chat_history = self.conversations.history(session_id)
+                arguments = {
+                    "amount": Decimal(arguments["amount"]),
+                    "denom": arguments.get("denom", "INJ"),
+                    "to_address": arguments["to_address"],
+                    "chat_history": chat_history,
+                }
+            elif not InjectiveFunctionMapper.is_read_only(function_name):
+                # Every other write goes through the same firewall as transfers
+                rejection = await self.validate_action(
+                    function_name, arguments, session_id, agent_id
                 )
-                return result
+                if rejection is not None:
+                    metrics.FUNCTION_CALLS.labels(function_name, "rejected").inc()
+                    return rejection
+
+            result = await FunctionExecutor.execute_function(
+                self.agents[agent_id], function_name, arguments
+            )
+            failed = isinstance(result, dict) and (
+                "error" in result or result.get("success") is False
+            )
+            metrics.FUNCTION_CALLS.labels(
+                function_name, "error" if failed else "success"
+            ).inc()
+            return result
 
         except Exception as e:
-            print(f"DEBUG - Error executing function: {str(e)}")
-            import traceback
-            print(f"DEBUG - Traceback: {traceback.format_exc()}")
+            metrics.FUNCTION_CALLS.labels(function_name, "exception").inc()
+            logger.exception("function_failed", function=function_name, error=str(e))
             return {
                 "error": str(e),
                 "success": False,
                 "details": {"function": function_name, "arguments": arguments}
             }
 
-    async def get_response(
+    async def execute_tool_calls(
+        self,
+        tool_calls,
+        session_id: str,
+        agent_id: str,
+        events: Optional[asyncio.Queue] = None,
+    ) -> list:
+        """
+        Execute the tool calls of one model turn.
+
+        Read-only calls run concurrently, calls that change chain state run
+        one after another in the order the model requested them. With an
+        events queue, function_start and function_end events are put on it.
+
+        Returns:
+            list: (tool_call, arguments, result) in the order of tool_calls
+        """
+        calls = []
+        for tool_call in tool_calls:
+            try:
+                arguments = json.loads(tool_call.function.arguments or "{}")
+            except json.JSONDecodeError as e:
+                arguments = {"error": f"Invalid arguments: {str(e)}"}
+            calls.append((tool_call, arguments))
+
+        results = [None] * len(calls)
+        reads = [
+            i
+            for i, (tool_call, _) in enumerate(calls)
+            if InjectiveFunctionMapper.is_read_only(tool_call.function.name)
+        ]
+        writes = [i for i in range(len(calls)) if i not in reads]
+
+        async def run(i):
+            tool_call, arguments = calls[i]
+            name = tool_call.function.name
+            if events is not None:
+                events.put_nowait(
+                    {"type": "function_start", "name": name, "arguments": arguments}
+                )
+            if "error" in arguments:
+                results[i] = {"success": False, "error": arguments["error"]}
+            else:
+                results[i] = await self.execute_function(
+                    name, arguments, session_id, agent_id
+                )
+            if events is not None:
+                events.put_nowait(
+                    {"type": "function_end", "name": name, "result": results[i]}
+                )
+
+        async def run_writes():
+            for i in writes:
+                await run(i)
+
+        await asyncio.gather(*[run(i) for i in reads], run_writes())
+        return [
+            (tool_call, arguments, result)
+            for (tool_call, arguments), result in zip(calls, results)
+        ]
+
+    def select_tools(self, session_id: str) -> list:
+        """Tools relevant to the recent messages and function calls of a session"""
+        user_messages = []
+        recent_functions = []
+        for message in reversed(self.conversations.context(session_id)):
+            if message.get("role") == "user" and len(user_messages) < 3:
+                user_messages.append(message.get("content") or "")
+            for tool_call in message.get("tool_calls") or []:
+                recent_functions.append(tool_call["function"]["name"])
+        tools = self.schema_registry.select(
+            user_messages,
+            recent_functions,
+            previous=self.session_tools.get(session_id, ()),
+        )
+        self.session_tools[session_id] = [tool["function"]["name"] for tool in tools]
+        self.session_tools.move_to_end(session_id)
+        while len(self.session_tools) > self.conversations.max_sessions:
+            self.session_tools.popitem(last=False)
+        return tools
+
+    async def _stream_completion(self, **kwargs) -> AsyncIterator:
+        """
+        Stream chat completion chunks without blocking the event loop.
+
+        The chunks are read in a worker thread, which stops reading and
+        closes the model stream once the consumer is cancelled or closed.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        cancelled = threading.Event()
+
+        model = kwargs.get("model", "")
+
+        def produce():
+            start = time.perf_counter()
+            first = True
+            try:
+                stream = self.client.chat.completions.create(
+                    stream=True, stream_options={"include_usage": True}, **kwargs
+                )
+                for chunk in stream:
+                    if cancelled.is_set():
+                        # Nobody reads the rest, stop paying for it
+                        stream.close()
+                        break
+                    if first:
+                        metrics.LLM_FIRST_TOKEN.labels(model).observe(
+                            time.perf_counter() - start
+                        )
+                        first = False
+                    # The last chunk carries the token usage of the request
+                    if getattr(chunk, "usage", None):
+                        metrics.LLM_TOKENS.labels(model, "prompt").inc(
+                            chunk.usage.prompt_tokens
+                        )
+                        metrics.LLM_TOKENS.labels(model, "completion").inc(
+                            chunk.usage.completion_tokens
+                        )
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+            except Exception as e:
+                metrics.LLM_ERRORS.labels(model).inc()
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                metrics.LLM_REQUEST_DURATION.labels(model).observe(
+                    time.perf_counter() - start
+                )
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+        await producer
+
+    async def _stream_turn(self, **kwargs) -> AsyncIterator[dict]:
+        """
+        Stream one model turn.
+
+        Yields token events as they arrive, then a final
+        {"type": "message", "content", "tool_calls"} with the assembled tool calls.
+        """
+        content = ""
+        tool_calls: Dict[int, SimpleNamespace] = {}
+        async for chunk in self._stream_completion(**kwargs):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content += delta.content
+                yield {"type": "token", "content": delta.content}
+            for fragment in delta.tool_calls or []:
+                tool_call = tool_calls.setdefault(
+                    fragment.index,
+                    SimpleNamespace(
+                        id=None, function=SimpleNamespace(name="", arguments="")
+                    ),
+                )
+                if fragment.id:
+                    tool_call.id = fragment.id
+                if fragment.function and fragment.function.name:
+                    tool_call.function.name += fragment.function.name
+                if fragment.function and fragment.function.arguments:
+                    tool_call.function.arguments += fragment.function.arguments
+        yield {
+            "type": "message",
+            "content": content,
+            "tool_calls": [tool_calls[i] for i in sorted(tool_calls)],
+        }
+
+    async def _execute_with_events(
+        self, tool_calls, session_id: str, agent_id: str
+    ) -> AsyncIterator[dict]:
+        """
+        Execute tool calls, yielding their function_start / function_end
+        events as they happen and finally {"type": "executed", "calls"}.
+        """
+        events: asyncio.Queue = asyncio.Queue()
+        execution = asyncio.ensure_future(
+            self.execute_tool_calls(tool_calls, session_id, agent_id, events)
+        )
+        while not execution.done() or not events.empty():
+            getter = asyncio.ensure_future(events.get())
+            await asyncio.wait([getter, execution], return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield getter.result()
+            else:
+                getter.cancel()
+        yield {"type": "executed", "calls": execution.result()}
+
+    async def stream_response(
         self,
         message,
         session_id="default",
         private_key=None,
         agent_id=None,
         environment="mainnet",
-    ):
-        """Get response from OpenAI API."""
+    ) -> AsyncIterator[dict]:
+        """
+        Get response from OpenAI API as a stream of events.
+
+        Yields:
+            dict: {"type": "token", "content"} for model output,
+            {"type": "function_start", "name", "arguments"} and
+            {"type": "function_end", "name", "result"} around every function
+            call, and a last {"type": "done", ...} carrying the full response
+        """
         await self.initialize_agent(
             agent_id=agent_id, private_key=private_key, environment=environment
         )
-        print("initialized agents")
         try:
-            # Initialize conversation history for new sessions
-            if session_id not in self.conversations:
-                self.conversations[session_id] = []
-
             # Add user message to conversation history
-            self.conversations[session_id].append({"role": "user", "content": message})
-
-            # Get response from OpenAI
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a helpful AI assistant on Injective Chain. 
-                    You will be answering all things related to injective chain, and help out with
-                    on-chain functions.
-                    
-                    When handling market IDs, always use these standardized formats:
-                    - For BTC perpetual: "BTC/USDT PERP" maps to "btcusdt-perp"
-                    - For ETH perpetual: "ETH/USDT PERP" maps to "ethusdt-perp"
-                    
-                    When users mention markets:
-                    1. If they use casual terms like "Bitcoin perpetual" or "BTC perp", interpret it as "BTC/USDT PERP"
-                    2. If they mention "Ethereum futures" or "ETH perpetual", interpret it as "ETH/USDT PERP"
-                    3. Always use the standardized format in your responses
-                    
-                    Before performing any action:
-                    1. Describe what you're about to do
-                    2. Ask for explicit confirmation
-                    3. Only proceed after receiving a "yes"
-                    
-                    When making function calls:
-                    1. Convert the standardized format (e.g., "BTC/USDT PERP") to the internal format (e.g., "btcusdt-perp")
-                    2. When displaying results to users, convert back to the standard format
-                    3. Always confirm before executing any functions
-                    
-                    For general questions, provide informative responses.
-                    When users want to perform actions, describe the action and ask for confirmation but for fetching data you dont have to ask for confirmation.""",
-                    }
-                ]
-                + self.conversations[session_id],
-                functions=self.function_schemas,
-                function_call="auto",
-                max_tokens=2000,
-                temperature=0.7,
-            )
-
-            response_message = response.choices[0].message
-            print(response_message)
-            # Handle function calling
-            if (
-                hasattr(response_message, "function_call")
-                and response_message.function_call
-            ):
-                # Extract function details
-                function_name = response_message.function_call.name
-                function_args = json.loads(response_message.function_call.arguments)
-                # Execute the function
-                function_response = await self.execute_function(
-                    function_name, function_args, session_id, agent_id
-                )
-
-                # Add function call and response to conversation
-                self.conversations[session_id].append(
+            self.conversations.append(session_id, {"role": "user", "content": message})
+
+            final_response = None
+            function_calls = []
+            for step in range(self.max_steps):
+                # Continue the same conversation with the same model and
+                # system prefix until it stops calling functions
+                async for event in self._stream_turn(
+                    model=self.model,
+                    messages=[{"role": "system", "content": self.SYSTEM_PROMPT}]
+                    + self.conversations.context(session_id),
+                    tools=self.select_tools(session_id),
+                    tool_choice="none" if step == self.max_steps - 1 else "auto",
+                    max_tokens=2000,
+                    temperature=0.7,
+                ):
+                    if event["type"] == "token":
+                        yield event
+                    else:
+                        response_message = event
+
+                if not response_message["tool_calls"]:
+                    final_response = response_message["content"].strip()
+                    break
+
+                # Handle tool calls
+                async for event in self._execute_with_events(
+                    response_message["tool_calls"], session_id, agent_id
+                ):
+                    if event["type"] == "executed":
+                        executed = event["calls"]
+                    else:
+                        yield event
+
+                # Add the tool calls and their results to conversation
+                self.conversations.append(
+                    session_id,
                     {
                         "role": "assistant",
-                        "content": None,
-                        "function_call": {
-                            "name": function_name,
-                            "arguments": json.dumps(function_args),
-                        },
+                        "content": response_message["content"] or None,
+                        "tool_calls": [
+                            {
+                                "id": tool_call.id,
+                                "type": "function",
+                                "function": {
+                                    "name": tool_call.function.name,
+                                    "arguments": tool_call.function.arguments,
+                                },
+                            }
+                            for tool_call, _, _ in executed
+                        ],
                     }
                 )
+                for tool_call, _, result in executed:
+                    self.conversations.append(
+                        session_id,
+                        {
+                            "role": "tool",
+                            "tool_call_id": tool_call.id,
+                            "name": tool_call.function.name,
+                            "content": json.dumps(result, default=str),
+                        }
+                    )
+                function_calls += [
+                    {"name": tool_call.function.name, "result": result}
+                    for tool_call, _, result in executed
+                ]
 
-                self.conversations[session_id].append(
-                    {
-                        "role": "function",
-                        "name": function_name,
-                        "content": json.dumps(function_response),
-                    }
-                )
-
-                # Get final response
-                second_response = await asyncio.to_thread(
-                    self.client.chat.completions.create,
-                    model="gpt-4-turbo-preview",
-                    messages=self.conversations[session_id],
-                    max_tokens=2000,
-                    temperature=0.7,
-                )
-
-                final_response = second_response.choices[0].message.content.strip()
-                self.conversations[session_id].append(
-                    {"role": "assistant", "content": final_response}
-                )
-
-                return {
-                    "response": final_response,
-                    "function_call": {
-                        "name": function_name,
-                        "result": function_response,
-                    },
-                    "session_id": session_id,
-                }
-
-            # Handle regular response
-            bot_message = response_message.content
-            if bot_message:
-                self.conversations[session_id].append(
-                    {"role": "assistant", "content": bot_message}
-                )
-
-                return {
-                    "response": bot_message,
-                    "function_call": None,
-                    "session_id": session_id,
-                }
-            else:
-                default_response = "I'm here to help you with trading on Injective Chain. You can ask me about trading, checking balances, making transfers, or staking. How can I assist you today?"
-                self.conversations[session_id].append(
-                    {"role": "assistant", "content": default_response}
-                )
-
-                return {
-                    "response": default_response,
-                    "function_call": None,
-                    "session_id": session_id,
-                }
+                # Simple results are phrased locally, without another call
+                if self.local_rendering:
+                    final_response = render_results(
+                        [(tool_call.function.name, result) for tool_call, _, result in executed]
+                    )
+                    if final_response:
+                        yield {"type": "token", "content": final_response}
+                        break
+
+            if not final_response:
+                final_response = "I'm here to help you with trading on Injective Chain. You can ask me about trading, checking balances, making transfers, or staking. How can I assist you today?"
+                yield {"type": "token", "content": final_response}
+
+            self.conversations.append(
+                session_id, {"role": "assistant", "content": final_response}
+            )
+            yield {
+                "type": "done",
+                "response": final_response,
+                "function_call": function_calls[0] if function_calls else None,
+                "function_calls": function_calls,
+                "session_id": session_id,
+            }
 
         except Exception as e:
             error_response = f"I apologize, but I encountered an error: {str(e)}. How else can I help you?"
-            return {
+            yield {
+                "type": "done",
                 "response": error_response,
                 "function_call": None,
                 "session_id": session_id,
             }
 
+    async def get_response(
+        self,
+        message,
+        session_id="default",
+        private_key=None,
+        agent_id=None,
+        environment="mainnet",
+    ):
+        """Get response from OpenAI API."""
+        async for event in self.stream_response(
+            message, session_id, private_key, agent_id, environment
+        ):
+            if event["type"] == "done":
+                event.pop("type")
+                return event
+
     def clear_history(self, session_id="default"):
         """Clear conversation history for a specific session."""
-        if session_id in self.conversations:
-            self.conversations[session_id].clear()
+        self.conversations.clear(session_id)
+        self.session_tools.pop(session_id, None)
 
     def get_history(self, session_id="default"):
         """Get conversation history for a specific session."""
-        return self.conversations.get(session_id, [])
+        return self.conversations.history(session_id)
 
 
 # Initialize chat agent
 agent = InjectiveChatAgent()
+metrics.AGENTS_INITIALIZED.set_function(lambda: len(agent.agents))
+
+
+@app.before_request
+async def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+async def record_request(response):
+    # Streamed responses are timed until their headers are sent
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.HTTP_REQUESTS.labels(route, request.method, response.status_code).inc()
+    metrics.HTTP_REQUEST_DURATION.labels(route).observe(
+        time.perf_counter() - g.request_start
+    )
+    return response
+
+
+watchdog = LoopWatchdog.from_env(on_block=lambda record: metrics.LOOP_BLOCKS.inc())
+
+
+@app.before_serving
+async def startup():
+    """Profile on SIGUSR2 and watch the event loop for blocking calls"""
+    profiler.install_signal_handler()
+    if watchdog:
+        watchdog.start()
+        metrics.LOOP_LAG.set_function(lambda: watchdog.last_lag)
+        metrics.LOOP_MAX_LAG.set_function(lambda: watchdog.max_lag)
+
+
+@app.after_serving
+async def shutdown():
+    """Release pooled HTTP connections on shutdown"""
+    await HttpSessionManager.close()
 
 
 @app.route("/ping", methods=["GET"])
@@ -275,14 +648,74 @@ async def ping():
 
 
 
+@app.route("/metrics", methods=["GET"])
+async def metrics_endpoint():
+    """Prometheus metrics endpoint"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/admin/profile", methods=["GET"])
+async def profile_endpoint():
+    """
+    Sample the server for ?seconds=N (10 by default).
+
+    Requires the ADMIN_TOKEN bearer token. Returns the collapsed stacks for
+    flamegraph.pl or speedscope with ?format=collapsed, otherwise JSON with
+    the stacks, event loop lag and pending asyncio tasks.
+    """
+    if not profiler.is_authorized(request.headers.get("Authorization")):
+        return jsonify({"error": "Not found"}), 404
+    try:
+        seconds = float(request.args.get("seconds", 10))
+    except ValueError:
+        return jsonify({"error": "seconds must be a number"}), 400
+    try:
+        result = await profiler.profile(seconds)
+    except profiler.ProfilerBusyError as e:
+        return jsonify({"error": str(e)}), 409
+    if request.args.get("format") == "collapsed":
+        return Response(result["collapsed"], content_type="text/plain; charset=utf-8")
+    return jsonify(result)
+
+
+@app.route("/admin/loop", methods=["GET"])
+async def loop_stats_endpoint():
+    """Event loop blocks with their stacks, requires the ADMIN_TOKEN bearer token"""
+    if not watchdog or not profiler.is_authorized(request.headers.get("Authorization")):
+        return jsonify({"error": "Not found"}), 404
+    return jsonify(watchdog.stats())
+
+
+@app.route("/admin/prewarm", methods=["POST"])
+async def prewarm_endpoint():
+    """
+    Build the client bundles of {"agents": [{"agent_id", "agent_key",
+    "environment"}], "concurrency": N} ahead of their first chat. Requires
+    the ADMIN_TOKEN bearer token.
+    """
+    if not profiler.is_authorized(request.headers.get("Authorization")):
+        return jsonify({"error": "Not found"}), 404
+    data = await request.get_json()
+    agents = (data or {}).get("agents")
+    if not isinstance(agents, list) or not all(
+        isinstance(item, dict) and item.get("agent_id") and item.get("agent_key")
+        for item in agents
+    ):
+        return jsonify({"error": "agents must be a list of agent_id and agent_key"}), 400
+    try:
+        concurrency = int(data.get("concurrency", 8))
+    except (TypeError, ValueError):
+        return jsonify({"error": "concurrency must be a number"}), 400
+    return jsonify(await agent.prewarm(agents, concurrency))
+
+
 @app.route("/chat", methods=["POST"])
 async def chat_endpoint():
     """Main chat endpoint"""
     data = await request.get_json()
-    print("DEBUG - Received request data:", data)  # Debug line
     try:
         if not data or "message" not in data:
-            print("DEBUG - Missing message in request")  # Debug line
+            logger.warning("chat_request_invalid", fields=lambda: list(data or {}))
             return (
                 jsonify({
                     "error": "No message provided",
@@ -298,13 +731,23 @@ async def chat_endpoint():
         private_key = data.get("agent_key", "default")
         agent_id = data.get("agent_id", "default")
         
-        print(f"DEBUG - Processing request: session={session_id}, agent={agent_id}")  # Debug line
-        
+        logger.sampled(
+            logging.INFO,
+            "chat_request",
+            REQUEST_LOG_SAMPLE,
+            session_id=session_id,
+            agent_id=agent_id,
+            stream=bool(data.get("stream")),
+        )
+
+        if data.get("stream"):
+            return stream_chat(data["message"], session_id, private_key, agent_id)
+
         response = await agent.get_response(
             data["message"], session_id, private_key, agent_id
         )
         
-        print("DEBUG - Response generated:", response)  # Debug line
+        logger.debug("chat_response", session_id=session_id, response=response)
         return jsonify(response)
     except Exception as e:
         return (
@@ -319,6 +762,54 @@ async def chat_endpoint():
         )
 
 
+def stream_chat(message, session_id, private_key, agent_id) -> Response:
+    """
+    Stream the events of one chat turn as newline-delimited JSON, with a
+    {"type": "keepalive"} line after STREAM_KEEPALIVE_SECONDS of silence
+    """
+
+    async def generate():
+        events = agent.stream_response(message, session_id, private_key, agent_id)
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(events.__anext__())
+                # Keep the connection busy while the model or the chain is slow,
+                # so clients can keep a read timeout
+                done, _ = await asyncio.wait({pending}, timeout=STREAM_KEEPALIVE_SECONDS)
+                if not done:
+                    yield json.dumps({"type": "keepalive"}) + "\n"
+                    continue
+                try:
+                    event = pending.result()
+                except StopAsyncIteration:
+                    pending = None
+                    break
+                pending = None
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            yield json.dumps(
+                {
+                    "type": "done",
+                    "error": str(e),
+                    "response": "I apologize, but I encountered an error. Please try again.",
+                    "session_id": session_id,
+                }
+            ) + "\n"
+        finally:
+            # The client may be gone: stop the turn instead of finishing it unread
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            await events.aclose()
+
+    response = Response(generate(), mimetype="application/x-ndjson")
+    # A turn with chain transactions can outlast the default response timeout
+    response.timeout = None
+    return response
+
+
 @app.route("/history", methods=["GET"])
 async def history_endpoint():
     """Get chat history endpoint"""
@@ -340,6 +831,7 @@ def main():
     parser.add_argument("--host", default="0.0.0.0", help="Host for API server")
     parser.add_argument("--debug", action="store_true", help="Run in debug mode")
     args = parser.parse_args()
+    configure_logging("DEBUG" if args.debug else None)
 
     config = Config()
     config.bind = [f"{args.host}:{args.port}"]
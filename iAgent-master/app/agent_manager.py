@@ -1,33 +1,46 @@
+import os
 import secrets
-from typing import Dict, Literal, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Literal, Optional, Tuple
 from datetime import datetime
-import os
-import yaml
+import requests
 from pyinjective.wallet import PrivateKey
+from app.agent_store import create_agent_store
+from injective_functions.utils.structured_logging import get_logger
 
 NetworkType = Literal["mainnet", "testnet"]
+logger = get_logger(__name__)
+
+# Below this many agents, a process pool costs more than it saves
+PARALLEL_DERIVATION_THRESHOLD = 64
+
+
+def derive_agent_key(_=None) -> Tuple[str, str]:
+    """Generate a private key and derive its bech32 address"""
+    private_key = str(secrets.token_hex(32))
+    inj_pub_key = (
+        PrivateKey.from_hex(private_key)
+        .to_public_key()
+        .to_address()
+        .to_acc_bech32()
+    )
+    return private_key, str(inj_pub_key)
 
 
 class AgentManager:
     """Manages multiple trading agents and their private keys"""
 
-    def __init__(self, config_path: str = "agents_config.yaml"):
+    def __init__(self, config_path: str = "agents_config.yaml", store=None):
         self.config_path = config_path
-        self.agents: Dict[str, dict] = self._load_agents()
+        self.store = store or create_agent_store(config_path)
         self.current_agent: Optional[str] = None
+        self._current_agent_info: Optional[dict] = None
         self.current_network: NetworkType = "testnet"  # Default to testnet for safety
 
-    def _load_agents(self) -> Dict[str, dict]:
-        """Load agents from config file"""
-        if os.path.exists(self.config_path):
-            with open(self.config_path, "r") as f:
-                return yaml.safe_load(f) or {}
-        return {}
-
-    def _save_agents(self):
-        """Save agents to config file"""
-        with open(self.config_path, "w") as f:
-            yaml.dump(self.agents, f)
+    @property
+    def agents(self) -> Dict[str, dict]:
+        """Every agent, read from the store"""
+        return self.store.all()
 
     def switch_network(self, network: NetworkType):
         """Switch between mainnet and testnet"""
@@ -41,59 +54,157 @@ class AgentManager:
 
     def create_agent(self, name: str) -> dict:
         """Create a new agent with a private key"""
-        if name in self.agents:
+        if name in self.store:
             raise ValueError(f"Agent '{name}' already exists")
 
         # Generate new private key
-        private_key = str(secrets.token_hex(32))
-        inj_pub_key = (
-            PrivateKey.from_hex(private_key)
-            .to_public_key()
-            .to_address()
-            .to_acc_bech32()
-        )
+        private_key, address = derive_agent_key()
         agent_info = {
             "private_key": private_key,
-            "address": str(inj_pub_key),
+            "address": address,
             "created_at": datetime.now().isoformat(),
             "network": self.current_network,
         }
 
-        self.agents[name] = agent_info
-        self._save_agents()
+        self.store.put(name, agent_info)
         return agent_info
 
+    def create_agents(
+        self,
+        names: List[str],
+        workers: Optional[int] = None,
+        prewarm_url: Optional[str] = None,
+        admin_token: Optional[str] = None,
+    ) -> Dict[str, dict]:
+        """
+        Create many agents at once.
+
+        Keys and addresses are derived in a process pool, and every agent is
+        written to the store in a single transaction.
+
+        Args:
+            names (List[str]): Names of the new agents
+            workers (int, optional): Pool size, defaults to the CPU count
+            prewarm_url (str, optional): Chat server whose client bundles of
+                the new agents are built right away, see prewarm_agents
+            admin_token (str, optional): ADMIN_TOKEN of that server
+
+        Returns:
+            Dict[str, dict]: Info of the created agents by name
+        """
+        if len(set(names)) != len(names):
+            raise ValueError("Agent names must be unique")
+        existing = [name for name in names if name in self.store]
+        if existing:
+            raise ValueError(f"Agents already exist: {', '.join(existing[:10])}")
+
+        if len(names) < PARALLEL_DERIVATION_THRESHOLD:
+            keys = [derive_agent_key() for _ in names]
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                keys = list(
+                    pool.map(
+                        derive_agent_key,
+                        range(len(names)),
+                        chunksize=max(1, len(names) // (workers * 4)),
+                    )
+                )
+
+        created_at = datetime.now().isoformat()
+        agents = {
+            name: {
+                "private_key": private_key,
+                "address": address,
+                "created_at": created_at,
+                "network": self.current_network,
+            }
+            for name, (private_key, address) in zip(names, keys)
+        }
+        self.store.put_many(agents)
+        if prewarm_url:
+            try:
+                self.prewarm_agents(names, prewarm_url, admin_token)
+            except requests.RequestException as e:
+                # The agents exist, they are just built on their first chat
+                logger.warning("agent_prewarm_failed", server=prewarm_url, error=str(e))
+        return agents
+
+    def prewarm_agents(
+        self,
+        names: List[str],
+        server_url: str,
+        admin_token: Optional[str],
+        concurrency: int = 8,
+    ) -> Dict[str, list]:
+        """
+        Have the chat server build the client bundles of agents, so their
+        first chat does not wait for it.
+
+        Args:
+            names (List[str]): Agents to warm up
+            server_url (str): Chat server, e.g. http://localhost:5000
+            admin_token (str): ADMIN_TOKEN of the server
+            concurrency (int, optional): Bundles the server builds at the same time
+
+        Returns:
+            Dict[str, list]: {"warmed": [addresses], "failed": [{"agent_id", "error"}]}
+        """
+        agents = []
+        for name in names:
+            agent_info = self.store.get(name)
+            if agent_info is None:
+                raise ValueError(f"Agent '{name}' not found")
+            agents.append(
+                {
+                    "agent_id": agent_info["address"],
+                    "agent_key": agent_info["private_key"],
+                    "environment": agent_info["network"],
+                }
+            )
+        response = requests.post(
+            f"{server_url.rstrip('/')}/admin/prewarm",
+            json={"agents": agents, "concurrency": concurrency},
+            headers={"Authorization": f"Bearer {admin_token}"},
+            timeout=(10, None),
+        )
+        response.raise_for_status()
+        result = response.json()
+        for failure in result.get("failed", []):
+            logger.warning(
+                "agent_prewarm_failed", agent_id=failure["agent_id"], error=failure["error"]
+            )
+        return result
+
     def delete_agent(self, name: str):
         """Delete an existing agent"""
-        if name not in self.agents:
+        if name not in self.store:
             raise ValueError(f"Agent '{name}' not found")
 
-        del self.agents[name]
+        self.store.delete(name)
         if self.current_agent == name:
             self.current_agent = None
-        self._save_agents()
+            self._current_agent_info = None
 
     def switch_agent(self, name: str):
         """Switch to a different agent"""
-        if name not in self.agents:
+        agent_info = self.store.get(name)
+        if agent_info is None:
             raise ValueError(f"Agent '{name}' not found")
         self.current_agent = name
+        self._current_agent_info = agent_info
 
     def get_current_agent(self) -> Optional[dict]:
         """Get current agent information"""
         if self.current_agent:
-            return self.agents[self.current_agent]
+            if self._current_agent_info is None:
+                self._current_agent_info = self.store.get(self.current_agent)
+            return self._current_agent_info
         return None
 
     def list_agents(self) -> Dict[str, dict]:
         """List all available agents"""
-        return self.agents
+        return self.store.all()
 
     def get_agent_based_on_network(self):
-        testnet_agents, mainnet_agents = dict(), dict()
-        for agent, value in self.agents.items():
-            if value["network"] == "testnet":
-                testnet_agents[agent] = value
-            else:
-                mainnet_agents[agent] = value
-        return mainnet_agents, testnet_agents
+        return self.store.by_network("mainnet"), self.store.by_network("testnet")
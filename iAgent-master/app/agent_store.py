@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+import yaml
+
+
+AGENT_FIELDS = ("private_key", "address", "created_at", "network")
+
+
+class YamlAgentStore:
+    """Keeps every agent in one YAML file, rewritten on each change"""
+
+    def __init__(self, path: str = "agents_config.yaml"):
+        self.path = path
+        self.agents: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.agents = yaml.safe_load(f) or {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            yaml.dump(self.agents, f)
+        os.replace(tmp_path, self.path)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.agents
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.agents.get(name)
+
+    def put(self, name: str, agent_info: dict):
+        self.agents[name] = agent_info
+        self._save()
+
+    def put_many(self, agents: Dict[str, dict]):
+        self.agents.update(agents)
+        self._save()
+
+    def delete(self, name: str):
+        self.agents.pop(name, None)
+        self._save()
+
+    def all(self) -> Dict[str, dict]:
+        return dict(self.agents)
+
+    def by_network(self, network: str) -> Dict[str, dict]:
+        return {
+            name: info for name, info in self.agents.items() if info["network"] == network
+        }
+
+
+class SqliteAgentStore:
+    """
+    Keeps agents in a SQLite database in WAL mode.
+
+    Creating or deleting an agent is a single-row transaction, and agents
+    are listed per network through an index, so neither cost grows with
+    the size of the fleet.
+    """
+
+    def __init__(self, path: str = "agents.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS agents (
+                    name TEXT PRIMARY KEY,
+                    private_key TEXT,
+                    address TEXT,
+                    created_at TEXT,
+                    network TEXT
+                )"""
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS agents_network ON agents (network)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    @staticmethod
+    def _row_to_info(row: sqlite3.Row) -> dict:
+        return {field: row[field] for field in AGENT_FIELDS}
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def get(self, name: str) -> Optional[dict]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM agents WHERE name = ?", (name,)
+            ).fetchone()
+        return self._row_to_info(row) if row else None
+
+    def put(self, name: str, agent_info: dict):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO agents (name, private_key, address, created_at, network)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (name, *(agent_info.get(field) for field in AGENT_FIELDS)),
+            )
+
+    def put_many(self, agents: Dict[str, dict]):
+        """Write many agents in one transaction"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO agents (name, private_key, address, created_at, network)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [
+                    (name, *(info.get(field) for field in AGENT_FIELDS))
+                    for name, info in agents.items()
+                ],
+            )
+
+    def delete(self, name: str):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM agents WHERE name = ?", (name,))
+
+    def all(self) -> Dict[str, dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM agents ORDER BY name").fetchall()
+        return {row["name"]: self._row_to_info(row) for row in rows}
+
+    def by_network(self, network: str) -> Dict[str, dict]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM agents WHERE network = ? ORDER BY name", (network,)
+            ).fetchall()
+        return {row["name"]: self._row_to_info(row) for row in rows}
+
+    def import_yaml(self, yaml_path: str) -> int:
+        """
+        Import the agents of a legacy YAML config, once.
+
+        The YAML file is left untouched. Agents already in the database win
+        over YAML entries of the same name.
+
+        Returns:
+            int: Number of agents added, 0 if the import already ran
+        """
+        key = f"imported:{os.path.abspath(yaml_path)}"
+        with self._lock:
+            done = self.conn.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone()
+        if done or not os.path.exists(yaml_path):
+            return 0
+        with open(yaml_path, "r") as f:
+            agents = yaml.safe_load(f) or {}
+        with self._lock, self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO agents (name, private_key, address, created_at, network)"
+                " VALUES (?, ?, ?, ?, ?)",
+                [
+                    (name, *(info.get(field) for field in AGENT_FIELDS))
+                    for name, info in agents.items()
+                ],
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES (?, '1')", (key,))
+        return cursor.rowcount
+
+    def close(self):
+        self.conn.close()
+
+
+def create_agent_store(config_path: str = "agents_config.yaml"):
+    """
+    Create the store selected by AGENT_STORE ("sqlite", the default, or "yaml").
+
+    The SQLite database lives next to config_path, and the YAML config is
+    imported into it the first time it is opened.
+    """
+    backend = os.getenv("AGENT_STORE", "sqlite").lower()
+    if backend == "yaml":
+        return YamlAgentStore(config_path)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown AGENT_STORE: {backend}")
+    db_path = os.getenv(
+        "AGENT_STORE_PATH", os.path.splitext(config_path)[0] + ".db"
+    )
+    store = SqliteAgentStore(db_path)
+    store.import_yaml(config_path)
+    return store
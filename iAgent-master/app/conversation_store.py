@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+# Rough size of a token in characters, good enough for budgeting prompts
+CHARS_PER_TOKEN = 4
+# Marker appended to function results that were compacted
+COMPACTED_MARKER = "... [compacted"
+# Roles of messages carrying a function result
+RESULT_ROLES = ("function", "tool")
+
+
+def estimate_tokens(message: dict) -> int:
+    """Estimate the prompt tokens used by one chat message"""
+    size = len(message.get("content") or "")
+    if message.get("function_call"):
+        size += len(json.dumps(message["function_call"]))
+    if message.get("tool_calls"):
+        size += len(json.dumps(message["tool_calls"]))
+    return size // CHARS_PER_TOKEN + 4
+
+
+class JsonFileBackend:
+    """Stores each conversation as a JSON file in a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        name = hashlib.sha256(session_id.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.json")
+
+    def load(self, session_id: str) -> Optional[List[dict]]:
+        """Load a conversation, None if it was never saved"""
+        path = self._path(session_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def save(self, session_id: str, messages: List[dict]):
+        """Atomically save a conversation"""
+        path = self._path(session_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(messages, f)
+        os.replace(tmp_path, path)
+
+    def delete(self, session_id: str):
+        """Delete a saved conversation"""
+        path = self._path(session_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class ConversationStore:
+    """
+    Bounded store of chat histories keyed by session id.
+
+    Idle sessions are evicted in LRU order, old function results are compacted
+    into short summaries and the prompt sent to the model is trimmed to a
+    per-session token budget. With a backend, evicted sessions are reloaded
+    from disk on their next turn.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl: float = 3600,
+        token_budget: int = 6000,
+        keep_recent: int = 6,
+        summary_chars: int = 300,
+        backend: Optional[JsonFileBackend] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summary_chars = summary_chars
+        self.backend = backend
+        self.sessions: "OrderedDict[str, List[dict]]" = OrderedDict()
+        self.last_access: Dict[str, float] = {}
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.sessions
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def _evict(self):
+        """Drop sessions idle for longer than idle_ttl, then the least recently used"""
+        now = time.monotonic()
+        while self.sessions:
+            oldest = next(iter(self.sessions))
+            idle = now - self.last_access[oldest] > self.idle_ttl
+            if not idle and len(self.sessions) <= self.max_sessions:
+                break
+            self.sessions.pop(oldest)
+            self.last_access.pop(oldest)
+
+    def history(self, session_id: str) -> List[dict]:
+        """Get the (compacted) history of a session, creating it if needed"""
+        if session_id in self.sessions:
+            self.sessions.move_to_end(session_id)
+        else:
+            messages = self.backend.load(session_id) if self.backend else None
+            self.sessions[session_id] = messages or []
+        self.last_access[session_id] = time.monotonic()
+        self._evict()
+        return self.sessions.get(session_id, [])
+
+    def append(self, session_id: str, message: dict):
+        """Add a message to a session and compact its older function results"""
+        messages = self.history(session_id)
+        messages.append(message)
+        self._compact(messages)
+        if self.backend:
+            self.backend.save(session_id, messages)
+
+    def _compact(self, messages: List[dict]):
+        for message in messages[: -self.keep_recent]:
+            content = message.get("content")
+            if message.get("role") not in RESULT_ROLES or not content:
+                continue
+            if len(content) > self.summary_chars and COMPACTED_MARKER not in content:
+                message["content"] = (
+                    f"{content[: self.summary_chars]}{COMPACTED_MARKER}, "
+                    f"{len(content) - self.summary_chars} chars dropped]"
+                )
+
+    def context(self, session_id: str, token_budget: Optional[int] = None) -> List[dict]:
+        """
+        Get the most recent messages of a session that fit in a token budget.
+
+        The window never starts on a function result: it is extended back to
+        the assistant message that requested the results, even over budget,
+        and back to the user message before it when that still fits.
+
+        Args:
+            session_id (str): Session to read
+            token_budget (int, optional): Defaults to the store's budget
+
+        Returns:
+            List[dict]: Messages to send to the model, oldest first
+        """
+        budget = token_budget or self.token_budget
+        messages = self.history(session_id)
+        start = len(messages)
+        used = 0
+        while start > 0:
+            cost = estimate_tokens(messages[start - 1])
+            if start < len(messages) and used + cost > budget:
+                break
+            start -= 1
+            used += cost
+
+        # A function result must follow the assistant message that requested it
+        owner = start
+        while owner > 0 and messages[owner].get("role") in RESULT_ROLES:
+            owner -= 1
+        if messages[start:] and messages[start].get("role") in RESULT_ROLES:
+            if messages[owner].get("role") in RESULT_ROLES:
+                # No requesting message left: drop the orphaned results
+                while start < len(messages) and messages[start].get("role") in RESULT_ROLES:
+                    start += 1
+            else:
+                used += sum(estimate_tokens(message) for message in messages[owner:start])
+                start = owner
+
+        # Prefer starting on the user message that opened the turn
+        if messages[start:] and messages[start].get("role") != "user":
+            turn = start
+            extra = 0
+            while turn > 0 and messages[turn].get("role") != "user":
+                turn -= 1
+                extra += estimate_tokens(messages[turn])
+            if messages[turn].get("role") == "user" and used + extra <= budget:
+                start = turn
+        return messages[start:]
+
+    def clear(self, session_id: str):
+        """Clear the history of a session"""
+        if session_id in self.sessions:
+            self.sessions[session_id].clear()
+        if self.backend:
+            self.backend.delete(session_id)
@@ -0,0 +1,86 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _succeeded(result) -> bool:
+    return (
+        isinstance(result, dict)
+        and "error" not in result
+        and result.get("success") is not False
+    )
+
+
+def _render_balances(title: str) -> Callable[[dict], Optional[str]]:
+    def render(result: dict) -> Optional[str]:
+        balances = result.get("result")
+        if not isinstance(balances, dict):
+            return None
+        if not balances:
+            return f"{title}: none."
+        lines = [f"{title}:"]
+        for denom, amount in balances.items():
+            lines.append(f"- {amount} {denom}")
+        return "\n".join(lines)
+
+    return render
+
+
+def _find_tx_response(result: dict) -> Optional[dict]:
+    """Find the txResponse of a broadcast, bare or wrapped in "result" """
+    for candidate in (result, result.get("result")):
+        if isinstance(candidate, dict) and isinstance(candidate.get("txResponse"), dict):
+            return candidate["txResponse"]
+    return None
+
+
+def _render_tx(action: str) -> Callable[[dict], Optional[str]]:
+    def render(result: dict) -> Optional[str]:
+        tx_response = _find_tx_response(result)
+        if tx_response is None or not tx_response.get("txhash"):
+            return None
+        if int(tx_response.get("code", 0)) != 0:
+            # Let the model explain rejected transactions
+            return None
+        return f"{action} submitted. Transaction hash: {tx_response['txhash']}"
+
+    return render
+
+
+# Function results that are phrased locally instead of by the model
+RENDERERS: Dict[str, Callable[[dict], Optional[str]]] = {
+    "query_balances": _render_balances("Your balances"),
+    "query_spendable_balances": _render_balances("Your spendable balances"),
+    "transfer_funds": _render_tx("Transfer"),
+    "stake_tokens": _render_tx("Stake"),
+    "send_bid_auction": _render_tx("Auction bid"),
+    "place_derivative_limit_order": _render_tx("Derivative limit order"),
+    "place_derivative_market_order": _render_tx("Derivative market order"),
+    "place_spot_limit_order": _render_tx("Spot limit order"),
+    "place_spot_market_order": _render_tx("Spot market order"),
+    "cancel_derivative_limit_order": _render_tx("Order cancellation"),
+    "cancel_spot_limit_order": _render_tx("Order cancellation"),
+    "mint": _render_tx("Mint"),
+    "burn": _render_tx("Burn"),
+}
+
+
+def render_results(results: List[Tuple[str, dict]]) -> Optional[str]:
+    """
+    Phrase the results of one turn's function calls without the model.
+
+    Args:
+        results (List[Tuple[str, dict]]): (function name, result) per call
+
+    Returns:
+        Optional[str]: The reply, or None if any result needs the model,
+        e.g. failures and functions without a template
+    """
+    lines = []
+    for function_name, result in results:
+        renderer = RENDERERS.get(function_name)
+        if renderer is None or not _succeeded(result):
+            return None
+        rendered = renderer(result)
+        if rendered is None:
+            return None
+        lines.append(rendered)
+    return "\n\n".join(lines) if lines else None
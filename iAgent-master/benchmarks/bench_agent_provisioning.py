@@ -0,0 +1,83 @@
+"""
+Benchmark agent provisioning: AgentManager.create_agent in a loop against
+AgentManager.create_agents, for each agent store.
+
+Every run uses a fresh store in a temporary directory. The one-by-one
+baseline is capped with --baseline-agents, since the YAML store rewrites
+the whole file on every agent; its rate is reported per agent.
+
+    python -m benchmarks.bench_agent_provisioning --agents 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app.agent_manager import AgentManager
+from app.agent_store import SqliteAgentStore, YamlAgentStore
+
+
+def make_store(kind: str, directory: str):
+    if kind == "yaml":
+        return YamlAgentStore(os.path.join(directory, "agents_config.yaml"))
+    return SqliteAgentStore(os.path.join(directory, "agents_config.db"))
+
+
+def one_by_one(kind: str, count: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        manager = AgentManager(store=make_store(kind, directory))
+        start = time.perf_counter()
+        for i in range(count):
+            manager.create_agent(f"agent-{i}")
+        elapsed = time.perf_counter() - start
+    return {
+        "agents": count,
+        "total_s": round(elapsed, 3),
+        "agents_per_s": round(count / elapsed, 1),
+    }
+
+
+def bulk(kind: str, count: int, workers: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        manager = AgentManager(store=make_store(kind, directory))
+        start = time.perf_counter()
+        manager.create_agents([f"agent-{i}" for i in range(count)], workers=workers)
+        elapsed = time.perf_counter() - start
+        assert len(manager.list_agents()) == count
+    return {
+        "agents": count,
+        "total_s": round(elapsed, 3),
+        "agents_per_s": round(count / elapsed, 1),
+    }
+
+
+def main(agents: int, baseline_agents: int, workers: int):
+    results = {}
+    for kind in ("yaml", "sqlite"):
+        results[kind] = {
+            "one_by_one": one_by_one(kind, min(agents, baseline_agents)),
+            "bulk": bulk(kind, agents, workers),
+        }
+        results[kind]["speedup"] = round(
+            results[kind]["bulk"]["agents_per_s"]
+            / results[kind]["one_by_one"]["agents_per_s"],
+            2,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark agent provisioning")
+    parser.add_argument("--agents", type=int, default=10000, help="agents per bulk run")
+    parser.add_argument(
+        "--baseline-agents",
+        type=int,
+        default=1000,
+        help="agents created one by one for the baseline",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="process pool size"
+    )
+    args = parser.parse_args()
+    main(args.agents, args.baseline_agents, args.workers)
@@ -0,0 +1,163 @@
+"""
+Benchmark repeated mint/burn cycles of InjectiveTokenFactory against a
+stubbed chain client.
+
+Every stubbed RPC sleeps for --rpc-latency-ms, so the numbers show how many
+round-trips each write costs. The "legacy" mode re-runs init_client before
+every write, as the token factory did before ensure_ready.
+
+    python -m benchmarks.bench_token_factory --cycles 200 --rpc-latency-ms 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import secrets
+import statistics
+import time
+
+from injective_functions.utils import broadcast_engine, initializers
+from injective_functions.utils.initializers import ChainInteractor
+from injective_functions.token_factory import InjectiveTokenFactory
+
+
+RPC_LATENCY = 0.02
+
+
+async def rpc():
+    await asyncio.sleep(RPC_LATENCY)
+
+
+class StubComposer:
+    def coin(self, amount, denom):
+        return {"amount": amount, "denom": denom}
+
+    def msg_mint(self, sender, amount):
+        return {"type": "mint", "sender": sender, "amount": amount}
+
+    def msg_burn(self, sender, amount):
+        return {"type": "burn", "sender": sender, "amount": amount}
+
+
+class StubAsyncClient:
+    def __init__(self, network):
+        self.network = network
+        self.number = 1
+        self.sequence = 0
+
+    async def composer(self):
+        await rpc()
+        return StubComposer()
+
+    async def sync_timeout_height(self):
+        await rpc()
+
+    async def fetch_account(self, address):
+        await rpc()
+        return {"address": address}
+
+    async def fetch_bank_balances(self, address):
+        await rpc()
+        return {"balances": []}
+
+    def get_number(self):
+        return self.number
+
+    async def simulate(self, tx_bytes):
+        await rpc()
+        return {"gasInfo": {"gasUsed": "100000"}}
+
+    async def broadcast_tx_sync_mode(self, tx_bytes):
+        await rpc()
+        return {"txResponse": {"txhash": secrets.token_hex(32).upper()}}
+
+
+class StubSignDoc:
+    def SerializeToString(self):
+        return b"sign-doc"
+
+
+class StubTransaction:
+    """Skips protobuf packing of the stub messages"""
+
+    def with_messages(self, *msgs):
+        return self
+
+    def with_sequence(self, sequence):
+        return self
+
+    def with_account_num(self, number):
+        return self
+
+    def with_chain_id(self, chain_id):
+        return self
+
+    def with_gas(self, gas):
+        return self
+
+    def with_fee(self, fee):
+        return self
+
+    def get_sign_doc(self, pub_key):
+        return StubSignDoc()
+
+    def get_tx_data(self, signature, pub_key):
+        return b"tx-bytes"
+
+
+async def run_cycles(token_factory, cycles: int, legacy: bool) -> list:
+    denom = f"factory/{token_factory.chain_client.address.to_acc_bech32()}/bench"
+    durations = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        for write in (token_factory.mint, token_factory.burn):
+            if legacy:
+                await token_factory.chain_client.init_client()
+            result = await write(denom=denom, amount=1)
+            assert result["success"], result
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations: list) -> dict:
+    ordered = sorted(durations)
+    return {
+        "cycles": len(durations),
+        "mean_ms": round(statistics.mean(durations) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 3),
+        "total_s": round(sum(durations), 3),
+    }
+
+
+async def main(cycles: int):
+    initializers.AsyncClient = StubAsyncClient
+    broadcast_engine.Transaction = StubTransaction
+
+    results = {}
+    for mode in ("legacy", "ensure_ready"):
+        # ChainInteractor is chatty on stdout, keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            chain_client = ChainInteractor(private_key=secrets.token_hex(32))
+            await chain_client.ensure_ready()
+            durations = await run_cycles(
+                InjectiveTokenFactory(chain_client), cycles, legacy=mode == "legacy"
+            )
+        results[mode] = summarize(durations)
+
+    results["speedup"] = round(
+        results["legacy"]["mean_ms"] / results["ensure_ready"]["mean_ms"], 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark token factory writes")
+    parser.add_argument("--cycles", type=int, default=100, help="mint/burn cycles")
+    parser.add_argument(
+        "--rpc-latency-ms", type=float, default=20, help="latency of each stubbed RPC"
+    )
+    args = parser.parse_args()
+    RPC_LATENCY = args.rpc_latency_ms / 1000
+    asyncio.run(main(args.cycles))
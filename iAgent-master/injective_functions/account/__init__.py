@@ -52,7 +52,7 @@ class InjectiveAccounts(InjectiveBase):
 
     async def send_to_eth(self, denom: str, eth_dest: str, amount: str):
 
-        bridge_fee = get_bridge_fee()
+        bridge_fee = await get_bridge_fee()
         # prepare tx msg
         msg = self.chain_client.composer.MsgSendToEth(
             sender=self.chain_client.address.to_acc_bech32(),
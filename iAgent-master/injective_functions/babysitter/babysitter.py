@@ -1,15 +1,27 @@
-from typing import Dict, Any
-import aiohttp
+from typing import Dict, Any, List
 from decimal import Decimal
+from urllib.parse import urljoin
+import asyncio
+import json
+import os
+import time
 from injective_functions.base import InjectiveBase
-import inspect
+from injective_functions.utils.http_session import HttpSessionManager
+from injective_functions.utils.structured_logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Token the gateway requires to accept reported spans
+TRACE_TOKEN = os.getenv("TRACE_TOKEN")
+
 
 class TransactionBabysitter(InjectiveBase):
     def __init__(self, chain_client, api_url: str) -> None:
-        print(f"DEBUG - [TransactionBabysitter.__init__] Starting initialization")
         super().__init__(chain_client)
         self.api_url = api_url
-        print(f"DEBUG - [TransactionBabysitter.__init__] Initialized with API URL: {api_url}")
+        self.traces_url = urljoin(api_url, "/traces")
+        self._trace_tasks = set()
 
     async def validate_with_api(
         self,
@@ -21,9 +33,6 @@ class TransactionBabysitter(InjectiveBase):
         denom: str
     ) -> Dict[str, bool]:
         try:
-            print(f"DEBUG - [TransactionBabysitter.validate_with_api] Starting validation")
-            print(f"  - API URL: {self.api_url}")
-            
             # Extraer todos los mensajes del usuario del chat_history
             user_messages = [msg["content"] for msg in chat_history if msg.get("role") == "user"]
             full_conversation = " | ".join(user_messages)
@@ -46,30 +55,120 @@ class TransactionBabysitter(InjectiveBase):
                 }]
             }
             
-            print(f"DEBUG - Validation data: {validation_data}")
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=validation_data) as response:
-                    print(f"DEBUG - API Response status: {response.status}")
-                    if response.status == 200:
-                        result = await response.json()
-                        print(f"DEBUG - API Response: {result}")
-                        return result
-                    
-                    error_text = await response.text()
-                    print(f"DEBUG - API Error: {error_text}")
-                    return {
-                        "approved": False,
-                        "reason": f"API error: {response.status}"
-                    }
+            return await self._post_validation(validation_data)
                     
         except Exception as e:
-            print(f"DEBUG - Validation error: {str(e)}")
+            logger.error("validation_failed", error=str(e))
+            return {
+                "approved": False,
+                "reason": f"Validation error: {str(e)}"
+            }
+
+    async def _post_validation(self, validation_data: Dict[str, Any]) -> Dict[str, Any]:
+        logger.debug("validation_request", url=self.api_url, data=validation_data)
+
+        session = HttpSessionManager.get_session()
+        async with session.post(self.api_url, json=validation_data) as response:
+            if response.status == 200:
+                result = await response.json()
+                logger.debug("validation_response", result=result)
+                return result
+
+            error_text = await response.text()
+            logger.warning("validation_api_error", status=response.status, body=error_text)
+            return {
+                "approved": False,
+                "reason": f"API error: {response.status}"
+            }
+
+    @staticmethod
+    def is_approved(validation: Dict[str, Any]) -> bool:
+        """Check whether the firewall approved a transaction"""
+        return (
+            validation.get("status") == "success"
+            and "APPROVED" in validation.get("message", "")
+        )
+
+    async def validate_action(
+        self, function_name: str, arguments: Dict[str, Any], chat_history: list
+    ) -> Dict[str, Any]:
+        """
+        Validate any function that changes chain state, not just transfers.
+
+        The call is described as a single transaction whose data is the
+        function name and its arguments, so the firewall judges it against
+        the conversation like a transfer.
+
+        Args:
+            function_name (str): Function the agent wants to run
+            arguments (Dict[str, Any]): Arguments of the call
+            chat_history (list): Messages of the current session
+
+        Returns:
+            Dict[str, Any]: Firewall verdict, see is_approved
+        """
+        try:
+            user_messages = [msg["content"] for msg in chat_history if msg.get("role") == "user"]
+            sender = self.chain_client.address.to_acc_bech32()
+            recipient = next(
+                (
+                    str(arguments[field])
+                    for field in ("to_address", "grantee_address", "validator_address")
+                    if arguments.get(field)
+                ),
+                sender,
+            )
+            validation_start = time.time()
+            began = time.perf_counter()
+            validation = await self._post_validation({
+                "safeAddress": sender,
+                "erc20TokenAddress": str(arguments.get("denom", "")),
+                "reason": " | ".join(user_messages),
+                "transactions": [{
+                    "to": recipient,
+                    "data": f"{function_name}: {json.dumps(arguments, default=str, sort_keys=True)}",
+                    "value": str(arguments.get("amount", arguments.get("quantity", "0"))),
+                }]
+            })
+            if validation.get("transaction_hash"):
+                self.report_spans(validation["transaction_hash"], [{
+                    "name": "validation",
+                    "start": validation_start,
+                    "duration_ms": round((time.perf_counter() - began) * 1000, 3),
+                }])
+            return validation
+        except Exception as e:
+            logger.error("validation_failed", function=function_name, error=str(e))
             return {
                 "approved": False,
                 "reason": f"Validation error: {str(e)}"
             }
 
+    def report_spans(self, transaction_hash: str, spans: List[dict]) -> None:
+        """Send timed phases to the gateway trace, without waiting for it"""
+        if not TRACE_TOKEN:
+            return
+
+        async def post():
+            try:
+                session = HttpSessionManager.get_session()
+                async with session.post(
+                    self.traces_url,
+                    json={
+                        "transaction_hash": transaction_hash,
+                        "component": "babysitter",
+                        "spans": spans,
+                    },
+                    headers={"Authorization": f"Bearer {TRACE_TOKEN}"},
+                ) as response:
+                    await response.read()
+            except Exception as e:
+                logger.warning("span_report_failed", error=str(e))
+
+        task = asyncio.create_task(post())
+        self._trace_tasks.add(task)
+        task.add_done_callback(self._trace_tasks.discard)
+
     async def safe_transfer(
         self,
         amount: Decimal,
@@ -78,8 +177,6 @@ class TransactionBabysitter(InjectiveBase):
         chat_history: list
     ) -> Dict:
         try:
-            print(f"DEBUG - Babysitter safe_transfer initiated")
-            
             # Crear el mensaje de la transacción
             msg = self.chain_client.composer.MsgSend(
                 from_address=self.chain_client.address.to_acc_bech32(),
@@ -88,10 +185,11 @@ class TransactionBabysitter(InjectiveBase):
                 denom=denom
             )
             
-            print(f"DEBUG - Transaction message created")
-            print(f"DEBUG - Message details: {msg}")
+            logger.debug("safe_transfer", msg=msg)
 
             # Validar con la API
+            validation_start = time.time()
+            began = time.perf_counter()
             validation = await self.validate_with_api(
                 tx_payload=str(msg),
                 chat_history=chat_history,
@@ -100,26 +198,40 @@ class TransactionBabysitter(InjectiveBase):
                 amount=amount,
                 denom=denom
             )
+            spans = [{
+                "name": "validation",
+                "start": validation_start,
+                "duration_ms": round((time.perf_counter() - began) * 1000, 3),
+            }]
 
-            print(f"DEBUG - Validation result: {validation}")
+            logger.debug("validation_result", result=validation)
 
             # Verificar si la transacción está aprobada
-            if (validation.get("status") == "success" and 
-                "APPROVED" in validation.get("message", "")):
-                print(f"DEBUG - Transaction approved by babysitter, proceeding with broadcast")
+            if self.is_approved(validation):
+                logger.info("transfer_approved", to_address=to_address, amount=amount, denom=denom)
                 # Si la validación es exitosa, ejecutar la transacción
-                return await self.chain_client.build_and_broadcast_tx(msg)
+                broadcast_start = time.time()
+                began = time.perf_counter()
+                result = await self.chain_client.build_and_broadcast_tx(msg)
+                spans.append({
+                    "name": "chain_broadcast",
+                    "start": broadcast_start,
+                    "duration_ms": round((time.perf_counter() - began) * 1000, 3),
+                })
+                if validation.get("transaction_hash"):
+                    self.report_spans(validation["transaction_hash"], spans)
+                return result
             else:
-                print(f"DEBUG - Transaction rejected by babysitter")
+                logger.info("transfer_rejected", to_address=to_address, reason=validation.get("message"))
+                if validation.get("transaction_hash"):
+                    self.report_spans(validation["transaction_hash"], spans)
                 return {
                     "success": False,
                     "error": f"Transaction rejected: {validation.get('message', 'Unknown reason')}"
                 }
 
         except Exception as e:
-            print(f"DEBUG - Safe transfer error: {str(e)}")
-            import traceback
-            print(f"DEBUG - Full safe_transfer traceback: {traceback.format_exc()}")
+            logger.exception("safe_transfer_failed", error=str(e))
             return {
                 "success": False,
                 "error": f"Transaction failed: {str(e)}"
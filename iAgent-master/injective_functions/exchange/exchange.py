@@ -1,6 +1,10 @@
+import asyncio
+import os
 from decimal import Decimal
 from injective_functions.base import InjectiveBase
-from injective_functions.utils.indexer_requests import fetch_decimal_denoms
+from injective_functions.utils.denom_registry import DenomRegistry
+from injective_functions.utils.orderbook_replica import OrderbookReplicaManager
+from injective_functions.utils.structured_logging import get_logger
 from injective_functions.utils.helpers import (
     impute_market_id,
     impute_market_ids,
@@ -8,12 +12,63 @@ from injective_functions.utils.helpers import (
 )
 from pyinjective.client.model.pagination import PaginationOption
 
-from typing import Dict, List
+from typing import Awaitable, Callable, Dict, List, Union
+
+logger = get_logger(__name__)
+
+# Per-market queries of one multi-market call that run at the same time
+FAN_OUT_CONCURRENCY = int(os.getenv("EXCHANGE_FAN_OUT_CONCURRENCY", 8))
+
 
 class InjectiveExchange(InjectiveBase):
     def __init__(self, chain_client) -> None:
         # Initializes the network and the composer
         super().__init__(chain_client)
+
+    async def fan_out(
+        self,
+        market_ids: List[str],
+        query: Callable[[str], Awaitable],
+        max_concurrency: int = FAN_OUT_CONCURRENCY,
+        market_type: str = "derivative",
+    ) -> Dict:
+        """
+        Run a per-market query over several markets concurrently.
+
+        Tickers are resolved with a single index lookup, and a failing market
+        is reported in "errors" without failing the others.
+
+        Args:
+            market_ids (List[str]): Market ids or tickers
+            query (Callable): Coroutine function taking a resolved market id
+            max_concurrency (int, optional): Queries in flight at the same time
+            market_type (str, optional): Market type tickers resolve to. Defaults to "derivative".
+
+        Returns:
+            Dict: {"success", "result": {market_id: ...}, "errors": {market: ...}}
+        """
+        resolved = await impute_market_ids(
+            market_ids, self.chain_client.network_type, market_type
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(requested: str, market_id: str):
+            if market_id is None:
+                raise ValueError(f"Unknown market: {requested}")
+            async with semaphore:
+                return await query(market_id)
+
+        responses = await asyncio.gather(
+            *[run(requested, market_id) for requested, market_id in zip(market_ids, resolved)],
+            return_exceptions=True,
+        )
+        results, errors = {}, {}
+        for requested, market_id, response in zip(market_ids, resolved, responses):
+            if isinstance(response, Exception):
+                errors[requested] = detailed_exception_info(response)["error"]
+            else:
+                results[market_id] = response
+        return {"success": bool(results) or not errors, "result": results, "errors": errors}
     
     async def get_subaccount_deposits(
         self, subaccount_idx: int, denoms: List[str] = None
@@ -27,7 +82,9 @@ class InjectiveExchange(InjectiveBase):
                 )
             )
             deposits = deposits_response["deposits"]
-            denom_decimals = await fetch_decimal_denoms(self.chain_client.network_type)
+            denom_decimals = await DenomRegistry.for_network(
+                self.chain_client.network_type
+            ).resolve(list(deposits) + (denoms or []))
             human_readable_deposits = {}
             # checks if the denoms are specified
             if denoms:
@@ -69,7 +126,9 @@ class InjectiveExchange(InjectiveBase):
 
     async def get_aggregate_market_volumes(self, market_ids=List[str]) -> Dict:
         try:
-            market_ids = await impute_market_ids(market_ids)
+            market_ids = await impute_market_ids(
+                market_ids, self.chain_client.network_type
+            )
             res = await self.chain_client.client.fetch_aggregate_market_volumes(
                 market_ids=market_ids
             )
@@ -81,7 +140,9 @@ class InjectiveExchange(InjectiveBase):
         self, market_ids: List[str], addresses: List[str]
     ) -> Dict:
         try:
-            market_ids = await impute_market_ids(market_ids)
+            market_ids = await impute_market_ids(
+                market_ids, self.chain_client.network_type
+            )
             res = await self.chain_client.client.fetch_aggregate_volumes(
                 accounts=addresses,
                 market_ids=market_ids,
@@ -92,7 +153,9 @@ class InjectiveExchange(InjectiveBase):
 
     async def get_subaccount_orders(self, subaccount_idx: int, market_id: str) -> Dict:
         try:
-            market_id = await impute_market_id(market_id)
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type
+            )
 
             subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
             orders = await self.chain_client.client.fetch_chain_subaccount_orders(
@@ -106,7 +169,9 @@ class InjectiveExchange(InjectiveBase):
     async def get_historical_orders(self, market_id: str) -> Dict:
 
         try:
-            market_id = await impute_market_id(market_id)
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type
+            )
 
             res = await self.chain_client.client.fetch_historical_trade_records(
                 market_id=market_id
@@ -117,77 +182,115 @@ class InjectiveExchange(InjectiveBase):
 
     async def get_mid_price_and_tob_derivatives_market(self, market_id: str) -> Dict:
         try:
-            market_id = await impute_market_id(market_id)
-
-            res = await self.chain_client.client.fetch_derivative_mid_price_and_tob(
-                market_id=market_id,
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type
             )
+
+            # served from the price cache while it is fresh
+            res = await self.chain_client.price_cache.get(market_id, "derivative")
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
     async def get_mid_price_and_tob_spot_market(self, market_id: str) -> Dict:
         try:
-            market_id = await impute_market_id(market_id)
-
-            res = await self.chain_client.client.fetch_spot_mid_price_and_tob(
-                market_id=market_id,
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type, "spot"
             )
+
+            # served from the price cache while it is fresh
+            res = await self.chain_client.price_cache.get(market_id, "spot")
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
+    async def _orderbook(self, market_id: str, market_type: str, limit: int = None):
+        """Read an order book from its local replica, fetching from the chain without one"""
+        try:
+            # the first read of a market starts a replica, later reads are local
+            replica = await OrderbookReplicaManager.for_chain_client(
+                self.chain_client
+            ).ensure(market_id, market_type)
+        except Exception as e:
+            logger.warning("orderbook_replica_unavailable", market_id=market_id, error=str(e))
+            replica = None
+        if replica is not None:
+            return replica.snapshot(limit)
+        pagination = PaginationOption(limit)
+        if market_type == "spot":
+            return await self.chain_client.client.fetch_chain_spot_orderbook(
+                market_id=market_id,
+                pagination=pagination,
+            )
+        return await self.chain_client.client.fetch_chain_derivative_orderbook(
+            market_id=market_id,
+            pagination=pagination,
+        )
+
     async def get_derivatives_orderbook(
         self, market_id: str, limit: int = None
     ) -> Dict:
         try:
-            market_id = await impute_market_id(market_id)
-            pagination = PaginationOption(limit)
-            orderbook = await self.chain_client.client.fetch_chain_derivative_orderbook(
-                market_id=market_id,
-                pagination=pagination,
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type
             )
+            orderbook = await self._orderbook(market_id, "derivative", limit)
             return {"success": True, "result": orderbook}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
     async def get_spot_orderbook(self, market_id: str, limit: int = None) -> Dict:
         try:
-            market_id = await impute_market_id(market_id)
-            pagination = PaginationOption(limit)
-            orderbook = await self.chain_client.client.fetch_chain_spot_orderbook(
-                market_id=market_id,
-                pagination=pagination,
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type, "spot"
             )
+            orderbook = await self._orderbook(market_id, "spot", limit)
             return {"success": True, "result": orderbook}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
-    async def trader_derivative_orders(self, market_id: str, subaccount_idx: int):
+    async def trader_derivative_orders(
+        self, market_id: Union[str, List[str]], subaccount_idx: int
+    ):
         try:
-
-            market_id = await impute_market_id(market_id)
-
             subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
-            orders = (
-                await self.chain_client.client.fetch_chain_trader_derivative_orders(
+
+            async def query(market_id: str):
+                return await self.chain_client.client.fetch_chain_trader_derivative_orders(
                     market_id=market_id,
                     subaccount_id=subaccount_id,
                 )
+
+            if isinstance(market_id, list):
+                return await self.fan_out(market_id, query)
+
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type
             )
+            orders = await query(market_id)
             return {"success": True, "result": orders}
         except Exception as e:
             return {"success": False, "result": detailed_exception_info(e)}
 
-    async def trader_spot_orders(self, market_id: str, subaccount_idx: int):
+    async def trader_spot_orders(
+        self, market_id: Union[str, List[str]], subaccount_idx: int
+    ):
         try:
-            market_id = await impute_market_id(market_id)
-
             subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
-            orders = await self.chain_client.client.fetch_chain_trader_spot_orders(
-                market_id=market_id,
-                subaccount_id=subaccount_id,
+
+            async def query(market_id: str):
+                return await self.chain_client.client.fetch_chain_trader_spot_orders(
+                    market_id=market_id,
+                    subaccount_id=subaccount_id,
+                )
+
+            if isinstance(market_id, list):
+                return await self.fan_out(market_id, query, market_type="spot")
+
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type, "spot"
             )
+            orders = await query(market_id)
             return {"success": True, "result": orders}
         except Exception as e:
             return {"success": False, "result": detailed_exception_info(e)}
@@ -196,7 +299,9 @@ class InjectiveExchange(InjectiveBase):
         self, market_id: str, subaccount_idx: int, order_hashes: List[str]
     ) -> Dict:
         try:
-            market_id = await impute_market_id(market_id)
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type
+            )
 
             subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
             orders = (
@@ -214,7 +319,9 @@ class InjectiveExchange(InjectiveBase):
         self, market_id: str, subaccount_idx: int, order_hashes: List[str]
     ) -> Dict:
         try:
-            market_id = await impute_market_id(market_id)
+            market_id = await impute_market_id(
+                market_id, self.chain_client.network_type, "spot"
+            )
 
             subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
             orders = await self.chain_client.client.fetch_chain_spot_orders_by_hashes(
@@ -226,24 +333,20 @@ class InjectiveExchange(InjectiveBase):
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
-    async def get_subaccount_positions_in_markets(self, market_ids: List[str]) -> Dict:
+    async def get_subaccount_positions_in_markets(
+        self, market_ids: List[str], subaccount_idx: int = 0
+    ) -> Dict:
         try:
-            market_ids = await impute_market_ids(market_ids)
+            subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
 
-            subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_id)
-            positions = await self.chain_client.client.fetch_chain_subaccount_positions(
-                subaccount_id=subaccount_id,
-            )["state"]
-            position_map = {}
-            for position in positions:
-                position_map[position["market_id"]] = position["position"]
-
-            filtered_positions = dict()
-            if market_ids != None:
-                for market_id in market_ids:
-                    filtered_positions["market_id"] = position_map[market_id]
-                return {"success": True, "result": position_map}
-            return {"success": True, "result": position_map}
+            async def query(market_id: str):
+                res = await self.chain_client.client.fetch_chain_subaccount_position_in_market(
+                    subaccount_id=subaccount_id,
+                    market_id=market_id,
+                )
+                return res.get("state")
+
+            return await self.fan_out(market_ids, query)
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
@@ -257,7 +360,7 @@ class InjectiveExchange(InjectiveBase):
         min_notional: str,
     ) -> Dict:
         try:
-            await self.chain_client.init_client()
+            await self.chain_client.ensure_ready()
             msg = self.chain_client.composer.msg_instant_spot_market_launch(
                 sender=self.chain_client.address.to_acc_bech32(),
                 ticker=ticker,
@@ -267,7 +370,10 @@ class InjectiveExchange(InjectiveBase):
                 min_quantity_tick_size=Decimal(min_quantity_tick),
                 min_notional=Decimal(min_notional),
             )
-            res = await self.chain_client.message_broadcaster.broadcast([msg])
+            # broadcast the transaction through the shared engine
+            res = await self.chain_client.build_and_broadcast_tx(msg)
+            if "error" in res:
+                return {"success": False, "error": res["error"]}
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
@@ -290,7 +396,7 @@ class InjectiveExchange(InjectiveBase):
     ) -> Dict:
         try:
 
-            await self.chain_client.init_client()
+            await self.chain_client.ensure_ready()
             msg = self.chain_client.composer.msg_instant_perpetual_market_launch(
                 sender=self.chain_client.address.to_acc_bech32(),
                 ticker=ticker,
@@ -307,7 +413,10 @@ class InjectiveExchange(InjectiveBase):
                 min_quantity_tick_size=Decimal(min_quantity_tick),
                 min_notional=Decimal(min_notional_size),
             )
-            res = await self.chain_client.message_broadcaster.broadcast([msg])
+            # broadcast the transaction through the shared engine
+            res = await self.chain_client.build_and_broadcast_tx(msg)
+            if "error" in res:
+                return {"success": False, "error": res["error"]}
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
@@ -23,7 +23,7 @@ class InjectiveTrading(InjectiveBase):
         leverage: str,
     ):
         """Place a limit order"""
-        market_id = await impute_market_id(market_id)
+        market_id = await impute_market_id(market_id, self.chain_client.network_type)
         self.subaccount_id = self.chain_client.address.get_subaccount_id(
             index=subaccount_idx
         )
@@ -56,15 +56,13 @@ class InjectiveTrading(InjectiveBase):
     ):
         """Place a market order"""
 
-        market_id = await impute_market_id(market_id)
+        market_id = await impute_market_id(market_id, self.chain_client.network_type)
         self.subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
         # For market orders, we'll use the current price as an estimate
-        # this gets bbo and mid from composer.
+        # this gets bbo and mid from the price cache, fetching when stale.
         estimated_price = (
-            await self.chain_client.client.fetch_derivative_mid_price_and_tob(
-                market_id=market_id
-            )["midPrice"]
-        )
+            await self.chain_client.price_cache.get(market_id, "derivative")
+        )["midPrice"]
 
         msg = self.chain_client.composer.msg_create_derivative_market_order(
             sender=self.chain_client.address.to_acc_bech32(),
@@ -88,7 +86,7 @@ class InjectiveTrading(InjectiveBase):
     async def cancel_derivative_limit_order(
         self, market_id: str, subaccount_idx: int, order_hash: str
     ):
-        market_id = await impute_market_id(market_id)
+        market_id = await impute_market_id(market_id, self.chain_client.network_type)
         converted_order_hash = base64convert(order_hash)
         subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
         msg = self.chain_client.composer.msg_cancel_derivative_order(
@@ -109,7 +107,9 @@ class InjectiveTrading(InjectiveBase):
     ):
         """Place a limit order"""
 
-        market_id = await impute_market_id(market_id)
+        market_id = await impute_market_id(
+            market_id, self.chain_client.network_type, "spot"
+        )
         self.subaccount_id = self.chain_client.address.get_subaccount_id(
             index=subaccount_idx
         )
@@ -131,15 +131,15 @@ class InjectiveTrading(InjectiveBase):
     ):
         """Place a market order"""
 
-        market_id = await impute_market_id(market_id)
+        market_id = await impute_market_id(
+            market_id, self.chain_client.network_type, "spot"
+        )
         self.subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
         # For market orders, we'll use the current price as an estimate
-        # this gets bbo and mid from composer.
+        # this gets bbo and mid from the price cache, fetching when stale.
         estimated_price = (
-            await self.chain_client.client.fetch_derivative_mid_price_and_tob(
-                market_id=market_id
-            )["midPrice"]
-        )
+            await self.chain_client.price_cache.get(market_id, "spot")
+        )["midPrice"]
 
         msg = self.chain_client.composer.msg_create_spot_market_order(
             sender=self.chain_client.address.to_acc_bech32(),
@@ -158,7 +158,9 @@ class InjectiveTrading(InjectiveBase):
         self, market_id: str, subaccount_idx: int, order_hash: str
     ):
         converted_order_hash = base64convert(order_hash)
-        market_id = await impute_market_id(market_id)
+        market_id = await impute_market_id(
+            market_id, self.chain_client.network_type, "spot"
+        )
         subaccount_id = self.chain_client.address.get_subaccount_id(subaccount_idx)
         msg = self.chain_client.composer.msg_cancel_spot_order(
             sender=self.chain_client.address.to_acc_bech32(),
@@ -8,6 +8,10 @@ from injective_functions.exchange.exchange import InjectiveExchange
 from injective_functions.exchange.trader import InjectiveTrading
 from injective_functions.staking import InjectiveStaking
 from injective_functions.token_factory import InjectiveTokenFactory
+from injective_functions.utils.structured_logging import get_logger
+
+
+logger = get_logger(__name__)
 
 
 class InjectiveClientFactory:
@@ -31,12 +35,8 @@ class InjectiveClientFactory:
             Dict: Dictionary containing all initialized clients
         """
         try:
-            print(f"DEBUG - [InjectiveClientFactory.create_all] Starting client creation")
-            print(f"  - Network type: {network_type}")
-            print(f"  - API URL: {api_url}")
-            
+            logger.debug("create_clients", requested_network=network_type, api_url=api_url)
             network_type = "testnet"
-            print(f"DEBUG - [InjectiveClientFactory.create_all] Forced testnet mode")
             
             chain_client = ChainInteractor(
                 network_type=network_type,
@@ -44,10 +44,7 @@ class InjectiveClientFactory:
             )
             
             # Solo inicializar una vez
-            if not chain_client.client:
-                print(f"DEBUG - Initializing client for network: {network_type}")
-                await chain_client.init_client()
-                print(f"DEBUG - Chain client initialized successfully for {network_type}")
+            await chain_client.ensure_ready()
             
             clients = {
                 "bank": InjectiveBank(chain_client, api_url=api_url),
@@ -60,11 +57,9 @@ class InjectiveClientFactory:
                 "token_factory": InjectiveTokenFactory(chain_client)
             }
             
-            print(f"DEBUG - Created all clients for network: {chain_client.network.chain_id}")
+            logger.debug("clients_created", chain_id=chain_client.network.chain_id)
             return clients
             
-        except Exception as e:
-            print(f"DEBUG - Error creating clients: {str(e)}")
-            import traceback
-            print(f"DEBUG - Full traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("create_clients_failed")
             raise
@@ -14,7 +14,7 @@ class InjectiveTokenFactory(InjectiveBase):
         self, subdenom: str, name: str, symbol: str, decimals: int
     ) -> Dict:
         try:
-            await self.chain_client.init_client()
+            await self.chain_client.ensure_ready()
             msg = self.chain_client.composer.msg_create_denom(
                 sender=self.chain_client.address.to_acc_bech32(),
                 subdenom=subdenom,
@@ -23,38 +23,44 @@ class InjectiveTokenFactory(InjectiveBase):
                 decimals=decimals,
             )
 
-            # broadcast the transaction
-            res = await self.chain_client.message_broadcaster.broadcast([msg])
+            # broadcast the transaction through the shared engine
+            res = await self.chain_client.build_and_broadcast_tx(msg)
+            if "error" in res:
+                return {"success": False, "error": res["error"]}
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
     async def mint(self, denom: str, amount: int) -> Dict:
         try:
-            await self.chain_client.init_client()
+            await self.chain_client.ensure_ready()
             amount = self.chain_client.composer.coin(amount=amount, denom=denom)
             msg = self.chain_client.composer.msg_mint(
                 sender=self.chain_client.address.to_acc_bech32(),
                 amount=amount,
             )
 
-            # broadcast the transaction
-            res = await self.chain_client.message_broadcaster.broadcast([msg])
+            # broadcast the transaction through the shared engine
+            res = await self.chain_client.build_and_broadcast_tx(msg)
+            if "error" in res:
+                return {"success": False, "error": res["error"]}
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
 
     async def burn(self, denom: str, amount: int) -> Dict:
         try:
-            await self.chain_client.init_client()
+            await self.chain_client.ensure_ready()
             amount = self.chain_client.composer.coin(amount=amount, denom=denom)
             msg = self.chain_client.composer.msg_burn(
                 sender=self.chain_client.address.to_acc_bech32(),
                 amount=amount,
             )
 
-            # broadcast the transaction
-            res = await self.chain_client.message_broadcaster.broadcast([msg])
+            # broadcast the transaction through the shared engine
+            res = await self.chain_client.build_and_broadcast_tx(msg)
+            if "error" in res:
+                return {"success": False, "error": res["error"]}
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
@@ -72,7 +78,7 @@ class InjectiveTokenFactory(InjectiveBase):
         uri_hash: str,
     ) -> Dict:
         try:
-
+            await self.chain_client.ensure_ready()
             msg = self.chain_client.composer.msg_set_denom_metadata(
                 sender=sender,
                 description=description,
@@ -85,8 +91,10 @@ class InjectiveTokenFactory(InjectiveBase):
                 uri_hash=uri_hash,
             )
 
-            # broadcast the transaction
-            res = await self.chain_client.message_broadcaster.broadcast([msg])
+            # broadcast the transaction through the shared engine
+            res = await self.chain_client.build_and_broadcast_tx(msg)
+            if "error" in res:
+                return {"success": False, "error": res["error"]}
             return {"success": True, "result": res}
         except Exception as e:
             return {"success": False, "error": detailed_exception_info(e)}
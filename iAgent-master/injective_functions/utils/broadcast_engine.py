@@ -0,0 +1,361 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyinjective.transaction import Transaction
+
+from injective_functions.utils.metrics import (
+    CHAIN_BROADCAST_DURATION,
+    CHAIN_BROADCAST_QUEUE,
+    CHAIN_BROADCASTS,
+    CHAIN_GAS_USED,
+)
+from injective_functions.utils.structured_logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Attempts per transaction when a reserved sequence is invalidated
+MAX_SEQUENCE_ATTEMPTS = 3
+# Waiting messages of one batch key are packed into one tx, up to this many
+MAX_BATCH_SIZE = int(os.getenv("BROADCAST_MAX_BATCH", 8))
+# Seconds the worker waits for more messages before sending a batch
+BATCH_WINDOW = float(os.getenv("BROADCAST_BATCH_WINDOW", 0))
+# Transactions being built, simulated or broadcast at the same time
+MAX_IN_FLIGHT = int(os.getenv("BROADCAST_MAX_IN_FLIGHT", 4))
+
+
+class SimulationError(Exception):
+    """Raised when the chain rejects a transaction during simulation"""
+
+
+class GasPolicy:
+    """Gas and fee policy applied to every transaction of the engine"""
+
+    def __init__(
+        self,
+        gas_price: int = 160000000000,
+        default_gas: int = 245350,
+        multiplier: float = 2.0,
+    ) -> None:
+        # Ajustado para cumplir con el fee mínimo requerido
+        self.gas_price = gas_price
+        # Valor obtenido de la simulación, used for the simulation itself
+        self.default_gas = default_gas
+        self.multiplier = multiplier
+
+    def gas_limit(self, gas_used: int) -> int:
+        return int(gas_used * self.multiplier)
+
+    def fee(self, composer, denom: str, gas_limit: int) -> list:
+        return [composer.coin(amount=self.gas_price * gas_limit, denom=denom)]
+
+
+class BroadcastMetrics:
+    """Counters shared by every module that broadcasts through the engine"""
+
+    def __init__(self, latency_window: int = 1000) -> None:
+        self.messages_submitted = 0
+        self.batches_sent = 0
+        self.txs_broadcast = 0
+        self.txs_failed = 0
+        self.simulation_failures = 0
+        self.sequence_retries = 0
+        self.gas_used_total = 0
+        self.latencies = deque(maxlen=latency_window)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "messages_submitted": self.messages_submitted,
+            "batches_sent": self.batches_sent,
+            "txs_broadcast": self.txs_broadcast,
+            "txs_failed": self.txs_failed,
+            "simulation_failures": self.simulation_failures,
+            "sequence_retries": self.sequence_retries,
+            "gas_used_total": self.gas_used_total,
+            "latency_p50_s": ordered[len(ordered) // 2] if ordered else None,
+            "latency_max_s": ordered[-1] if ordered else None,
+        }
+
+
+class _Submission:
+    def __init__(self, msg, future: asyncio.Future, batch_key: Optional[str]) -> None:
+        self.msg = msg
+        self.future = future
+        self.batch_key = batch_key
+
+
+class BroadcastEngine:
+    """
+    Single broadcast path for every module of injective_functions.
+
+    Messages are submitted to a per-account queue, and each transaction is
+    built with the shared sequence allocator and gas policy, so mixed
+    workloads no longer race on the account sequence. Batching is opt-in:
+    only waiting messages submitted with the same batch key are packed into
+    one multi-msg transaction, so an unrelated caller's bad message never
+    fails another caller's transaction.
+    """
+
+    _engines: Dict[Tuple[str, str], "BroadcastEngine"] = {}
+
+    def __init__(
+        self,
+        chain_client,
+        gas_policy: Optional[GasPolicy] = None,
+        max_batch: int = MAX_BATCH_SIZE,
+        batch_window: float = BATCH_WINDOW,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ) -> None:
+        self.chain_client = chain_client
+        self.gas_policy = gas_policy or GasPolicy()
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_in_flight = max_in_flight
+        self.metrics = BroadcastMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Dispatches in flight, referenced until they finish
+        self._dispatches = set()
+
+    @classmethod
+    def for_chain_client(cls, chain_client) -> "BroadcastEngine":
+        """
+        Get the process-wide engine of the chain client's account.
+
+        Args:
+            chain_client (ChainInteractor): Initialized chain client
+
+        Returns:
+            BroadcastEngine: Shared engine, bound to the latest chain client
+        """
+        key = (chain_client.network.chain_id, chain_client.address.to_acc_bech32())
+        engine = cls._engines.get(key)
+        if engine is None:
+            engine = cls(chain_client)
+            cls._engines[key] = engine
+        else:
+            engine.chain_client = chain_client
+        return engine
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._in_flight = asyncio.Semaphore(self.max_in_flight)
+            self._worker = None
+            self._loop = loop
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, msg, batch_key: Optional[str] = None) -> Dict:
+        """
+        Queue a message and wait for the result of its transaction.
+
+        Args:
+            msg: Composer message to broadcast
+            batch_key (str, optional): Messages of one caller that may share a
+                transaction, and fail together. None sends the message alone.
+
+        Returns:
+            Dict: Broadcast result, or {"error": ...} on failure
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self.metrics.messages_submitted += 1
+        await self._queue.put(_Submission(msg, future, batch_key))
+        return await future
+
+    def _group(self, items: List[_Submission]) -> List[List[_Submission]]:
+        """Split waiting messages into transactions, in submission order"""
+        batches, open_batches = [], {}
+        for item in items:
+            batch = open_batches.get(item.batch_key)
+            if item.batch_key is None or batch is None or len(batch) >= self.max_batch:
+                batch = [item]
+                batches.append(batch)
+                if item.batch_key is not None:
+                    open_batches[item.batch_key] = batch
+            else:
+                batch.append(item)
+        return batches
+
+    async def _run(self) -> None:
+        while True:
+            items = [await self._queue.get()]
+            if items[0].batch_key is not None and self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(items) < self.max_batch and not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            for batch in self._group(items):
+                await self._in_flight.acquire()
+                task = self._loop.create_task(self._dispatch(batch))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[_Submission]) -> None:
+        try:
+            msgs = [item.msg for item in batch]
+            try:
+                results = [await self._broadcast(msgs)] * len(batch)
+            except SimulationError as e:
+                if len(batch) == 1:
+                    results = [{"error": f"Simulation failed: {str(e)}"}]
+                else:
+                    # One message may be invalid, do not fail the others with it
+                    logger.info("batch_split", size=len(batch))
+                    results = await asyncio.gather(
+                        *[self._broadcast_single(msg) for msg in msgs]
+                    )
+            for item, result in zip(batch, results):
+                if not item.future.done():
+                    item.future.set_result(result)
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_result({"error": str(e)})
+        finally:
+            self._in_flight.release()
+
+    async def _broadcast_single(self, msg) -> Dict:
+        try:
+            return await self._broadcast([msg])
+        except SimulationError as e:
+            return {"error": f"Simulation failed: {str(e)}"}
+
+    async def _broadcast(self, msgs: list) -> Dict:
+        allocator = self.chain_client.sequence_allocator
+        self.metrics.batches_sent += 1
+        start = time.monotonic()
+        # Reintentar cuando la secuencia reservada queda invalidada
+        for attempt in range(MAX_SEQUENCE_ATTEMPTS):
+            reservation = await allocator.reserve()
+            try:
+                res = await self._broadcast_with_sequence(msgs, reservation)
+            except Exception:
+                await allocator.release(reservation)
+                raise
+            if res is not None:
+                latency = time.monotonic() - start
+                self.metrics.latencies.append(latency)
+                CHAIN_BROADCAST_DURATION.observe(latency)
+                if "error" in res:
+                    self.metrics.txs_failed += 1
+                    CHAIN_BROADCASTS.labels("failed").inc()
+                else:
+                    self.metrics.txs_broadcast += 1
+                    CHAIN_BROADCASTS.labels("broadcast").inc()
+                return res
+            self.metrics.sequence_retries += 1
+            CHAIN_BROADCASTS.labels("sequence_retry").inc()
+            logger.info("sequence_stale", sequence=reservation.sequence)
+
+        self.metrics.txs_failed += 1
+        CHAIN_BROADCASTS.labels("failed").inc()
+        return {"error": "Could not obtain a valid account sequence"}
+
+    async def _broadcast_with_sequence(self, msgs: list, reservation) -> Optional[Dict]:
+        """Simulate, sign and broadcast msgs with a reserved sequence.
+
+        Returns None when the sequence has to be reserved again.
+        """
+        chain_client = self.chain_client
+        allocator = chain_client.sequence_allocator
+        network = chain_client.network
+
+        # Construir la transacción
+        tx = (
+            Transaction()
+            .with_messages(*msgs)
+            .with_sequence(reservation.sequence)
+            .with_account_num(chain_client.client.get_number())
+            .with_chain_id(network.chain_id)
+        )
+        gas_wanted = self.gas_policy.default_gas
+        tx = tx.with_gas(gas_wanted).with_fee(
+            self.gas_policy.fee(chain_client.composer, network.fee_denom, gas_wanted)
+        )
+
+        logger.debug(
+            "tx_built",
+            messages=len(msgs),
+            gas_limit=gas_wanted,
+            sequence=reservation.sequence,
+            chain_id=network.chain_id,
+        )
+
+        # La simulación valida la secuencia, así que espera a que las
+        # secuencias anteriores estén en el mempool
+        if not await allocator.wait_turn(reservation):
+            return None
+
+        # Simular la transacción primero
+        sim_sign_doc = tx.get_sign_doc(chain_client.pub_key)
+        sim_sig = chain_client.priv_key.sign(sim_sign_doc.SerializeToString())
+        sim_tx_raw_bytes = tx.get_tx_data(sim_sig, chain_client.pub_key)
+
+        try:
+            sim_res = await chain_client.client.simulate(sim_tx_raw_bytes)
+            logger.debug("tx_simulated", result=sim_res)
+        except Exception as e:
+            logger.warning("tx_simulation_failed", error=str(e))
+            await allocator.release(reservation)
+            if await allocator.resync_from_error(e):
+                return None
+            self.metrics.simulation_failures += 1
+            CHAIN_BROADCASTS.labels("simulation_failed").inc()
+            raise SimulationError(str(e)) from e
+
+        # Configurar gas y fee
+        gas_used = int(sim_res["gasInfo"]["gasUsed"])
+        self.metrics.gas_used_total += gas_used
+        CHAIN_GAS_USED.observe(gas_used)
+        gas_limit = self.gas_policy.gas_limit(gas_used)
+        fee = self.gas_policy.fee(chain_client.composer, network.fee_denom, gas_limit)
+
+        tx = tx.with_gas(gas_limit).with_fee(fee)
+
+        # Firmar y transmitir
+        sign_doc = tx.get_sign_doc(chain_client.pub_key)
+        sig = chain_client.priv_key.sign(sign_doc.SerializeToString())
+        tx_raw_bytes = tx.get_tx_data(sig, chain_client.pub_key)
+
+        res = await chain_client.client.broadcast_tx_sync_mode(tx_raw_bytes)
+        logger.debug(
+            "tx_broadcast",
+            gas_used=gas_used,
+            gas_limit=gas_limit,
+            tx_bytes=len(tx_raw_bytes),
+            result=res,
+        )
+
+        tx_response = res.get("txResponse", {}) if isinstance(res, dict) else {}
+        code = int(tx_response.get("code", 0))
+        if code != 0:
+            # Rechazada en CheckTx: la secuencia no se consumió
+            raw_log = tx_response.get("rawLog", "")
+            await allocator.release(reservation)
+            if await allocator.resync_from_error(raw_log):
+                return None
+            return {
+                "error": raw_log or f"Transaction rejected with code {code}",
+                "code": code,
+                "txhash": tx_response.get("txhash"),
+            }
+        await allocator.commit(reservation)
+        return res
+
+
+# Summed over every account's engine when metrics are scraped
+CHAIN_BROADCAST_QUEUE.set_function(
+    lambda: sum(
+        engine._queue.qsize()
+        for engine in list(BroadcastEngine._engines.values())
+        if engine._queue is not None
+    )
+)
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from injective_functions.utils.indexer_requests import fetch_decimal_denoms
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two background refreshes of the full denom list
+DEFAULT_REFRESH_INTERVAL = float(os.getenv("DENOM_REGISTRY_REFRESH_SECONDS", 300))
+# Seconds before a denom the chain did not know about is looked up again
+MISSING_DENOM_TTL = 60.0
+DEFAULT_SNAPSHOT_DIR = os.getenv(
+    "DENOM_REGISTRY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "iagent")
+)
+
+
+class DenomRegistry:
+    """
+    Process-wide cache of denom decimals for one network.
+
+    The registry starts from an on-disk snapshot when there is one, loads the
+    full list from the chain once, then keeps it fresh from a background task.
+    Denoms missing from the cache are fetched on demand.
+    """
+
+    _registries: Dict[str, "DenomRegistry"] = {}
+
+    def __init__(
+        self,
+        network_type: str = "mainnet",
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR,
+    ) -> None:
+        self.network_type = network_type
+        self.refresh_interval = refresh_interval
+        self.snapshot_path = (
+            os.path.join(snapshot_dir, f"denom_decimals_{network_type}.json")
+            if snapshot_dir
+            else None
+        )
+        self.decimals: Dict[str, int] = {}
+        self.last_refresh: float = 0.0
+        self._missing: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._initial_load: Optional[asyncio.Task] = None
+        self._load_snapshot()
+
+    @classmethod
+    def for_network(cls, network_type: str = "mainnet") -> "DenomRegistry":
+        """Get the shared registry of a network"""
+        registry = cls._registries.get(network_type)
+        if registry is None:
+            registry = cls(network_type)
+            cls._registries[network_type] = registry
+        return registry
+
+    @property
+    def is_mainnet(self) -> bool:
+        return self.network_type == "mainnet"
+
+    def _load_snapshot(self) -> None:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            self.decimals = {
+                denom: int(decimals)
+                for denom, decimals in snapshot["decimals"].items()
+            }
+            logger.info(
+                f"Loaded {len(self.decimals)} denoms from snapshot {self.snapshot_path}"
+            )
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable denom snapshot: {str(e)}")
+
+    def _save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"saved_at": time.time(), "decimals": self.decimals}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Could not write denom snapshot: {str(e)}")
+
+    async def refresh(self) -> Dict[str, int]:
+        """Reload the full denom list from the chain"""
+        async with self._lock:
+            fetched = await fetch_decimal_denoms(self.is_mainnet)
+            if fetched:
+                self.decimals.update(fetched)
+                self.last_refresh = time.monotonic()
+                self._missing.clear()
+                self._save_snapshot()
+            return self.decimals
+
+    def _ensure_refresher(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(
+                self._refresh_loop()
+            )
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Background denom refresh failed: {str(e)}")
+
+    async def get_decimals(self) -> Dict[str, int]:
+        """
+        Get the decimals of every known denom.
+
+        Returns:
+            Dict[str, int]: Mapping of denom to decimals
+        """
+        self._ensure_refresher()
+        if not self.last_refresh:
+            if self._initial_load is None or self._initial_load.done():
+                self._initial_load = asyncio.get_running_loop().create_task(
+                    self.refresh()
+                )
+            # A snapshot is served right away while the load runs in the background
+            if not self.decimals:
+                await asyncio.shield(self._initial_load)
+        return self.decimals
+
+    async def resolve(self, denoms: Iterable[str]) -> Dict[str, int]:
+        """
+        Get the decimals of specific denoms, fetching unknown ones on demand.
+
+        Args:
+            denoms (Iterable[str]): Denoms to look up
+
+        Returns:
+            Dict[str, int]: Decimals of the denoms known to the chain
+        """
+        denoms = list(denoms)
+        known = await self.get_decimals()
+        now = time.monotonic()
+        unknown: List[str] = [
+            denom
+            for denom in set(denoms)
+            if denom not in known
+            and (
+                denom not in self._missing
+                or now - self._missing[denom] >= MISSING_DENOM_TTL
+            )
+        ]
+        if unknown:
+            fetched = await fetch_decimal_denoms(self.is_mainnet, denoms=unknown)
+            self.decimals.update(fetched)
+            for denom in unknown:
+                if denom not in fetched:
+                    self._missing[denom] = now
+        return {denom: self.decimals[denom] for denom in denoms if denom in self.decimals}
+
+    def close(self) -> None:
+        """Stop the background refresh task"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
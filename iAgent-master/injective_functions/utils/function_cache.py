@@ -0,0 +1,194 @@
+import copy
+import json
+import os
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+# Scale every cache TTL, 0 disables the cache
+CACHE_TTL_SCALE = float(os.getenv("FUNCTION_CACHE_TTL_SCALE", 1.0))
+# Entries kept before expired ones are swept
+MAX_ENTRIES = int(os.getenv("FUNCTION_CACHE_MAX_ENTRIES", 10000))
+
+
+class CachePolicy:
+    """How long a read-only function result is reused, and what invalidates it"""
+
+    def __init__(self, ttl: float, key_fields: Tuple[str, ...] = (), groups=()) -> None:
+        # Seconds a result is served without calling the chain again
+        self.ttl = ttl
+        # Arguments that select a different result, the others are ignored
+        self.key_fields = key_fields
+        # Data the result depends on, dropped when a write touches it
+        self.groups = frozenset(groups)
+
+
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    # Bank
+    "query_balances": CachePolicy(10, ("denom_list",), {"balances"}),
+    "query_spendable_balances": CachePolicy(10, ("denom_list",), {"balances"}),
+    "query_total_supply": CachePolicy(30, ("denom_list",), {"supply"}),
+    # Exchange
+    "get_subaccount_deposits": CachePolicy(
+        10, ("subaccount_idx", "denoms"), {"balances"}
+    ),
+    "get_subaccount_orders": CachePolicy(
+        5, ("subaccount_idx", "market_id"), {"orders"}
+    ),
+    "trader_derivative_orders": CachePolicy(
+        5, ("market_id", "subaccount_idx"), {"orders"}
+    ),
+    "trader_spot_orders": CachePolicy(5, ("market_id", "subaccount_idx"), {"orders"}),
+    "get_derivatives_orderbook": CachePolicy(1, ("market_id", "limit"), {"orders"}),
+    "get_spot_orderbook": CachePolicy(1, ("market_id", "limit"), {"orders"}),
+    # Auction
+    "fetch_auctions": CachePolicy(30, (), {"auctions"}),
+    "fetch_latest_auction": CachePolicy(30, (), {"auctions"}),
+    "fetch_auction_bids": CachePolicy(10, ("bid_round",), {"auctions"}),
+    # Authz
+    "fetch_grants": CachePolicy(60, ("granter", "grantee", "msg_type"), {"grants"}),
+}
+
+# Data changed by each write function
+INVALIDATIONS: Dict[str, frozenset] = {
+    "transfer_funds": frozenset({"balances"}),
+    "stake_tokens": frozenset({"balances"}),
+    "send_bid_auction": frozenset({"balances", "auctions"}),
+    "place_derivative_limit_order": frozenset({"balances", "orders"}),
+    "place_derivative_market_order": frozenset({"balances", "orders"}),
+    "place_spot_limit_order": frozenset({"balances", "orders"}),
+    "place_spot_market_order": frozenset({"balances", "orders"}),
+    "cancel_derivative_limit_order": frozenset({"balances", "orders"}),
+    "cancel_spot_limit_order": frozenset({"balances", "orders"}),
+    "grant_address_auth": frozenset({"grants"}),
+    "revoke_address_auth": frozenset({"grants"}),
+    "create_denom": frozenset({"balances", "supply"}),
+    "mint": frozenset({"balances", "supply"}),
+    "burn": frozenset({"balances", "supply"}),
+}
+
+# Argument naming the other account a write function changes
+COUNTERPARTY_FIELDS: Dict[str, str] = {
+    "transfer_funds": "to_address",
+    "grant_address_auth": "grantee_address",
+    "revoke_address_auth": "grantee_address",
+}
+
+
+class FunctionResultCache:
+    """
+    Results of read-only functions, per account, following CACHE_POLICIES.
+
+    Failed calls are never stored, and a write function drops every cached
+    result of its account, and of the account it sends to when that one
+    reads through the cache too, that depends on the data it changes.
+    Results are copied in and out, so callers may modify them.
+    """
+
+    def __init__(
+        self, ttl_scale: float = CACHE_TTL_SCALE, max_entries: int = MAX_ENTRIES
+    ) -> None:
+        self.ttl_scale = ttl_scale
+        self.max_entries = max_entries
+        # (scope, function, key) -> (expiry, groups, result)
+        self.entries: Dict[Tuple, Tuple[float, frozenset, Any]] = {}
+        # Bumped by every write of a scope, see put()
+        self.generations: Dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, scope: Hashable, function_name: str, arguments: dict) -> Tuple:
+        policy = CACHE_POLICIES[function_name]
+        fields = {name: arguments.get(name) for name in policy.key_fields}
+        return (scope, function_name, json.dumps(fields, sort_keys=True, default=str))
+
+    def get(self, scope: Hashable, function_name: str, arguments: dict) -> Optional[Any]:
+        """Get a cached result, None on a miss or for uncached functions"""
+        if function_name not in CACHE_POLICIES or not self.ttl_scale:
+            return None
+        key = self._key(scope, function_name, arguments)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return copy.deepcopy(entry[2])
+        self.entries.pop(key, None)
+        self.misses += 1
+        return None
+
+    def generation(self, scope: Hashable) -> int:
+        """Current write generation of a scope, taken before a read starts"""
+        # Registers the scope, so writes of other accounts can reach it
+        return self.generations.setdefault(scope, 0)
+
+    def put(
+        self,
+        scope: Hashable,
+        function_name: str,
+        arguments: dict,
+        result: Any,
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Store a successful result of a cached function.
+
+        A result read while a write of the same scope was in flight may
+        already be stale, so it is dropped when generation is outdated.
+        """
+        policy = CACHE_POLICIES.get(function_name)
+        if policy is None or not self.ttl_scale:
+            return
+        if generation is not None and generation != self.generation(scope):
+            return
+        if not isinstance(result, dict) or "error" in result:
+            return
+        if result.get("success") is False:
+            return
+        if len(self.entries) >= self.max_entries:
+            self._sweep()
+        self.entries[self._key(scope, function_name, arguments)] = (
+            time.monotonic() + policy.ttl * self.ttl_scale,
+            policy.groups,
+            copy.deepcopy(result),
+        )
+
+    def invalidate(
+        self, scope: Hashable, function_name: str, arguments: Optional[dict] = None
+    ) -> None:
+        """
+        Drop the results a write function may have changed.
+
+        Args:
+            scope (Hashable): (network, address) of the account that wrote
+            function_name (str): Write function
+            arguments (dict, optional): Its arguments, naming the account on
+                the other side (e.g. a transfer recipient)
+        """
+        groups = INVALIDATIONS.get(function_name)
+        if not groups:
+            return
+        scopes = {scope}
+        counterparty = (arguments or {}).get(COUNTERPARTY_FIELDS.get(function_name))
+        if counterparty and isinstance(scope, tuple):
+            counterparty_scope = (scope[0], str(counterparty))
+            # Only accounts that read through this cache can hold its results
+            if counterparty_scope in self.generations:
+                scopes.add(counterparty_scope)
+        for changed in scopes:
+            self.generations[changed] = self.generation(changed) + 1
+        for key in [
+            key
+            for key, (_, entry_groups, _) in self.entries.items()
+            if key[0] in scopes and entry_groups & groups
+        ]:
+            del self.entries[key]
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if entry[0] <= now]:
+            del self.entries[key]
+        # Still full of live entries: drop the oldest ones
+        while len(self.entries) >= self.max_entries:
+            del self.entries[next(iter(self.entries))]
+
+    def clear(self) -> None:
+        self.entries.clear()
@@ -4,6 +4,8 @@ from typing import Dict, Tuple, Any, Optional
 import json
 from pathlib import Path
 
+from injective_functions.utils.function_cache import FunctionResultCache
+
 
 class InjectiveFunctionMapper:
     # Map function names to (client_type, method_name)
@@ -61,6 +63,32 @@ class InjectiveFunctionMapper:
         "set_denom_metadata": ("token_factory", "set_denom_metadata"),
     }
 
+    # Functions that only read chain state and can run concurrently
+    READ_ONLY_FUNCTIONS = frozenset(
+        {
+            "get_subaccount_deposits",
+            "get_aggregate_market_volumes",
+            "get_aggregate_account_volumes",
+            "get_subaccount_orders",
+            "get_historical_orders",
+            "get_mid_price_and_tob_derivatives_market",
+            "get_mid_price_and_tob_spot_market",
+            "get_derivatives_orderbook",
+            "get_spot_orderbook",
+            "trader_derivative_orders",
+            "trader_derivative_orders_by_hash",
+            "trader_spot_orders",
+            "trader_spot_orders_by_hash",
+            "query_balances",
+            "query_spendable_balances",
+            "query_total_supply",
+            "fetch_auctions",
+            "fetch_latest_auction",
+            "fetch_auction_bids",
+            "fetch_grants",
+        }
+    )
+
     @classmethod
     def get_function_mapping(cls, function_name: str) -> Optional[Tuple[str, str]]:
         """Get the client type and method name for a given function"""
@@ -71,6 +99,11 @@ class InjectiveFunctionMapper:
         """Check if a function name is valid"""
         return function_name in cls.FUNCTION_MAP
 
+    @classmethod
+    def is_read_only(cls, function_name: str) -> bool:
+        """Check if a function only reads chain state"""
+        return function_name in cls.READ_ONLY_FUNCTIONS
+
     @classmethod
     def get_all_client_types(cls) -> set:
         """Get all unique client types"""
@@ -103,6 +136,11 @@ class FunctionSchemaLoader:
 
         return combined_schemas["functions"]
 
+    @staticmethod
+    def to_tools(function_schemas: list) -> list:
+        """Wrap function schemas in the tools format of the chat completions API"""
+        return [{"type": "function", "function": schema} for schema in function_schemas]
+
     @staticmethod
     def validate_schema(schema: dict) -> bool:
         """Validate that a schema has the required structure"""
@@ -116,11 +154,22 @@ class FunctionSchemaLoader:
 
 
 class FunctionExecutor:
+    # Shared by every agent, entries are scoped to the account of the clients
+    cache = FunctionResultCache()
+
     @staticmethod
+    def cache_scope(client) -> Optional[Tuple[str, str]]:
+        """Network and address of the account a client acts for"""
+        chain_client = getattr(client, "chain_client", None)
+        if chain_client is None or chain_client.address is None:
+            return None
+        return (chain_client.network_type, chain_client.address.to_acc_bech32())
+
+    @classmethod
     async def execute_function(
-        clients: Dict[str, Any], function_name: str, arguments: dict
+        cls, clients: Dict[str, Any], function_name: str, arguments: dict
     ) -> dict:
-        """Execute a function with the appropriate client"""
+        """Execute a function with the appropriate client, reusing recent reads"""
         try:
             # Get the function mapping
             mapping = InjectiveFunctionMapper.get_function_mapping(function_name)
@@ -141,7 +190,22 @@ class FunctionExecutor:
                     "error": f"Method {method_name} not found in {client_type} client"
                 }
 
-            return await method(**arguments)
+            scope = cls.cache_scope(client)
+            if scope is None:
+                return await method(**arguments)
+
+            cached = cls.cache.get(scope, function_name, arguments)
+            if cached is not None:
+                return cached
+
+            # Invalidate before and after a write, so reads that overlap it
+            # are not stored
+            generation = cls.cache.generation(scope)
+            cls.cache.invalidate(scope, function_name, arguments)
+            result = await method(**arguments)
+            cls.cache.invalidate(scope, function_name, arguments)
+            cls.cache.put(scope, function_name, arguments, result, generation)
+            return result
 
         except Exception as e:
             return {
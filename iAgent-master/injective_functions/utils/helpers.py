@@ -2,8 +2,8 @@ from typing import Dict, List
 import json
 import re
 import base64
-import requests
-from injective_functions.utils.indexer_requests import get_market_id
+from injective_functions.utils.market_index import MarketIndex
+from injective_functions.utils.price_oracle import PriceOracle
 
 
 def base64convert(s):
@@ -15,14 +15,13 @@ def base64convert(s):
         return "0x" + base64.b64decode(s).hex().upper()
 
 
-def get_bridge_fee() -> float:
-    asset = "injective-protocol"
-    coingecko_endpoint = (
-        f"https://api.coingecko.com/api/v3/simple/price?ids={asset}&vs_currencies=usd"
-    )
-    token_price = requests.get(coingecko_endpoint).json()[asset]["usd"]
-    minimum_bridge_fee_usd = 10
-    return float(minimum_bridge_fee_usd / token_price)
+# Peggy bridge fee floor, paid in INJ
+MINIMUM_BRIDGE_FEE_USD = 10
+
+
+async def get_bridge_fee(oracle: PriceOracle = None) -> float:
+    token_price = await (oracle or PriceOracle.shared()).get_usd_price("INJ")
+    return float(MINIMUM_BRIDGE_FEE_USD / token_price)
 
 
 # TODO: validate this properly and assert type safety here
@@ -58,21 +57,30 @@ def combine_function_schemas(input_files: List[str]) -> Dict:
     return combined_data
 
 
-async def impute_market_ids(market_ids):
-    lst = []
-    for market_id in market_ids:
-        if validate_market_id(market_id):
-            lst.append(market_id)
-        else:
-            lst.append(await get_market_id(market_id))
-    return lst
+async def impute_market_ids(
+    market_ids, network_type: str = "mainnet", market_type: str = "derivative"
+):
+    # resolve every ticker with a single index lookup
+    tickers = [market_id for market_id in market_ids if not validate_market_id(market_id)]
+    resolved = dict(
+        zip(
+            tickers,
+            await MarketIndex.for_network(network_type).resolve_many(tickers, market_type),
+        )
+    )
+    return [
+        market_id if validate_market_id(market_id) else resolved[market_id]
+        for market_id in market_ids
+    ]
 
 
-async def impute_market_id(market_id):
+async def impute_market_id(
+    market_id, network_type: str = "mainnet", market_type: str = "derivative"
+):
     if validate_market_id(market_id):
         return market_id
     else:
-        return await get_market_id(market_id)
+        return await MarketIndex.for_network(network_type).resolve(market_id, market_type)
 
 
 def detailed_exception_info(e) -> Dict:
@@ -0,0 +1,56 @@
+import asyncio
+import os
+from typing import Optional
+
+import aiohttp
+
+
+# Connection pool settings shared by every HTTP call of the package
+CONNECTION_LIMIT = int(os.getenv("HTTP_CONNECTION_LIMIT", 100))
+CONNECTION_LIMIT_PER_HOST = int(os.getenv("HTTP_CONNECTION_LIMIT_PER_HOST", 20))
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+REQUEST_TIMEOUT = 30
+
+
+class HttpSessionManager:
+    """
+    Lifecycle manager of the aiohttp session used by injective_functions.
+
+    A single pooled session with keep-alive and DNS caching is created on
+    first use and reused by every caller, then closed once on shutdown.
+    """
+
+    _session: Optional[aiohttp.ClientSession] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def get_session(cls) -> aiohttp.ClientSession:
+        """
+        Get the shared session, creating it on the running loop if needed.
+
+        Returns:
+            aiohttp.ClientSession: Pooled session, must not be closed by callers
+        """
+        loop = asyncio.get_running_loop()
+        if cls._session is None or cls._session.closed or cls._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            cls._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            )
+            cls._loop = loop
+        return cls._session
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared session and its pooled connections"""
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
+        cls._loop = None
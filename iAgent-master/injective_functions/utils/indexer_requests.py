@@ -1,64 +1,57 @@
 import aiohttp
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 import re
 import json
-import logging
+from injective_functions.utils.http_session import HttpSessionManager
+from injective_functions.utils.structured_logging import get_logger
 
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 
 # This is expected to return a (kv) pair
-async def fetch_decimal_denoms(is_mainnet: bool) -> Dict[str, int]:
+async def fetch_decimal_denoms(
+    is_mainnet: bool, denoms: List[str] = None
+) -> Dict[str, int]:
     # default url
     request_url = (
         "https://sentry.lcd.injective.network/injective/exchange/v1beta1/exchange/denom_decimals"
         if is_mainnet
         else "https://testnet.lcd.injective.network/injective/exchange/v1beta1/exchange/denom_decimals"
     )
+    # only the requested denoms when looking up unknown ones
+    params = [("denoms", denom) for denom in denoms] if denoms else None
 
-    logger.info(f"Fetching denoms from: {request_url}")
+    logger.debug("denoms_fetch", url=request_url, denoms=len(denoms or []))
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(request_url) as response:
-                if response.status != 200:
-                    logger.error(f"Error status code: {response.status}")
-                    logger.error(f"Error response: {await response.text()}")
-                    return {}
+        session = HttpSessionManager.get_session()
+        async with session.get(request_url, params=params) as response:
+            if response.status != 200:
+                logger.error(
+                    "denoms_fetch_failed", status=response.status, body=await response.text()
+                )
+                return {}
 
-                raw_data = await response.text()
-                logger.info(f"Raw response: {raw_data}")
+            denom_data = json.loads(await response.text())
 
-                denom_data = json.loads(raw_data)
+            if "denom_decimals" not in denom_data:
+                logger.error("denoms_fetch_failed", keys=list(denom_data.keys()))
+                return {}
 
-                if "denom_decimals" not in denom_data:
-                    logger.error("No 'denom_decimals' key in response")
-                    logger.error(f"Response keys: {denom_data.keys()}")
-                    return {}
+            denom_data = denom_data["denom_decimals"]
+            logger.debug("denoms_fetched", count=len(denom_data))
 
-                denom_data = denom_data["denom_decimals"]
-                logger.info(f"Number of denoms found: {len(denom_data)}")
-
-                response_dic: Dict[str, int] = {}
-                for denom in denom_data:
-                    response_dic[denom["denom"]] = int(denom["decimals"])
-                    logger.info(
-                        f"Added denom: {denom['denom']} with decimals: {denom['decimals']}"
-                    )
-
-                return response_dic
+            return {denom["denom"]: int(denom["decimals"]) for denom in denom_data}
 
     except aiohttp.ClientError as e:
-        logger.error(f"Network error occurred: {str(e)}")
+        logger.error("denoms_fetch_failed", error=str(e))
         return {}
     except json.JSONDecodeError as e:
-        logger.error(f"JSON decode error: {str(e)}")
+        logger.error("denoms_fetch_failed", error=f"invalid JSON: {str(e)}")
         return {}
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("denoms_fetch_failed", error=str(e))
         return {}
 
 
@@ -131,53 +124,20 @@ def normalize_ticker(ticker_symbol: str) -> str:
     return f"{base}/{quote}{market_type}"
 
 
-async def get_market_id(ticker_symbol: str, network_type: str = "mainnet"):
+async def get_market_id(
+    ticker_symbol: str, network_type: str = "mainnet", market_type: str = "derivative"
+):
     """
-    Asynchronously fetches the market_id for a given ticker symbol from the Injective API.
+    Asynchronously resolves the market_id for a given ticker symbol.
+
+    Lookups go through the shared MarketIndex, so the market lists are only
+    downloaded when the index is loaded or refreshed.
 
     :param ticker_symbol: The ticker symbol to look up (e.g., 'BTCUSDT', 'btc-usdt', 'btc')
+    :param market_type: 'derivative' (the default) or 'spot'
     :return: The market_id as a string if found, else None
     """
-    # Normalize the ticker symbol to match the API format
-    normalized_ticker = normalize_ticker(ticker_symbol)
-    request_url = ""
-    # API endpoint for derivative markets
-    if network_type == "mainnet":
-        request_url = "https://sentry.lcd.injective.network/injective/exchange/v1beta1/derivative/markets"
-    else:
-        request_url = "https://testnet.sentry.lcd.injective.network/injective/exchange/v1beta1/derivative/markets"
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(request_url) as response:
-                data = await response.json()
-
-                # Initialize a mapping of tickers to market IDs
-                ticker_to_market_id = {}
-
-                # Check if 'markets' key exists in the response
-                if "markets" in data:
-                    for market_info in data["markets"]:
-                        market = market_info.get("market", {})
-                        ticker = market.get("ticker", "").upper()
-                        market_id = market.get("market_id")
-
-                        # Ensure market_id does not have extra quotes
-                        if isinstance(market_id, str):
-                            market_id = market_id.strip("'\"")
-
-                        if ticker and market_id:
-                            ticker_to_market_id[ticker] = market_id
-
-                    # Get the market_id for the normalized ticker
-                    market_id = ticker_to_market_id.get(normalized_ticker)
-                    if market_id:
-                        return market_id
-                    else:
-                        print(f"No market ID found for ticker: {normalized_ticker}")
-                else:
-                    print("No market data found in the response.")
-        except aiohttp.ClientError as e:
-            print(f"HTTP request failed: {e}")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-    return None
+    # imported here as market_index depends on normalize_ticker from this module
+    from injective_functions.utils.market_index import MarketIndex
+
+    return await MarketIndex.for_network(network_type).resolve(ticker_symbol, market_type)
@@ -1,11 +1,23 @@
+import asyncio
+import logging
+import time
 from grpc import RpcError
 from pyinjective.async_client import AsyncClient
 from pyinjective.constant import GAS_FEE_BUFFER_AMOUNT, GAS_PRICE
 from pyinjective.core.network import Network
-from pyinjective.core.broadcaster import MsgBroadcasterWithPk
-from pyinjective.transaction import Transaction
 from pyinjective.wallet import PrivateKey
 from injective_functions.utils.helpers import detailed_exception_info
+from injective_functions.utils.sequence_allocator import SequenceAllocator
+from injective_functions.utils.broadcast_engine import BroadcastEngine
+from injective_functions.utils.price_cache import PriceCache
+from injective_functions.utils.structured_logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Seconds after which ensure_ready refreshes the chain state
+READY_MAX_AGE = 30.0
 
 
 class ChainInteractor:
@@ -14,9 +26,6 @@ class ChainInteractor:
         # Forzar testnet
         self.network_type = "testnet"
         
-        print(f"DEBUG - Initializing ChainInteractor")
-        print(f"DEBUG - Forcing TESTNET mode")
-        
         try:
             # Initialize account
             self.priv_key = PrivateKey.from_hex(self.private_key)
@@ -25,140 +34,85 @@ class ChainInteractor:
             bech32_address = self.address.to_acc_bech32()
             
             # Siempre usar testnet
-            print(f"DEBUG - Setting up TESTNET")
             self.network = Network.testnet()
-            print(f"DEBUG - TESTNET chain_id: {self.network.chain_id}")
-            
-            print(f"DEBUG - Network endpoint: {self.network.grpc_endpoint}")
-            print(f"DEBUG - Fee denom: {self.network.fee_denom}")
-            print(f"DEBUG - Sender address: {bech32_address}")
+            logger.debug(
+                "chain_interactor_created",
+                chain_id=self.network.chain_id,
+                endpoint=self.network.grpc_endpoint,
+                fee_denom=self.network.fee_denom,
+                address=bech32_address,
+            )
             
-        except Exception as e:
-            print(f"DEBUG - Error in initialization: {str(e)}")
-            import traceback
-            print(f"DEBUG - Full traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("chain_interactor_failed")
             raise
 
         self.client = None
         self.composer = None
-        self.message_broadcaster = None
+        self.sequence_allocator = None
+        self.broadcast_engine = None
+        self.price_cache = None
+        # monotonic time of the last init or refresh, 0 when not ready
+        self.ready_at = 0.0
+        self._ready_lock = asyncio.Lock()
 
     async def init_client(self):
         """Initialize the Injective client and required components"""
-        print(f"DEBUG - Initializing client for network type: {self.network_type}")
+        logger.debug("client_init", network=self.network_type)
         self.client = AsyncClient(self.network)
         self.composer = await self.client.composer()
         await self.client.sync_timeout_height()
         
         try:
             account_info = await self.client.fetch_account(self.address.to_acc_bech32())
-            print(f"DEBUG - Account info fetched: {account_info}")
+            logger.debug("account_fetched", account=account_info)
         except Exception as e:
-            print(f"DEBUG - Error fetching account: {str(e)}")
+            logger.error("account_fetch_failed", error=str(e))
             raise
-        
-        self.message_broadcaster = MsgBroadcasterWithPk.new_using_simulation(
-            network=self.network,
-            private_key=self.private_key
+
+        # Shared by every ChainInteractor of this account so that concurrent
+        # agents never sign with the same sequence
+        self.sequence_allocator = SequenceAllocator.for_account(
+            self.client, self.network.chain_id, self.address.to_acc_bech32()
         )
-        print(f"DEBUG - Client initialized for {self.network.chain_id}")
+        self.sequence_allocator.seed(self.client.sequence)
+        self.broadcast_engine = BroadcastEngine.for_chain_client(self)
+        self.price_cache = PriceCache.for_network(self.network_type, self.client)
+        self.ready_at = time.monotonic()
+        logger.info("client_ready", chain_id=self.network.chain_id)
 
-    async def build_and_broadcast_tx(self, msg):
-        """Common function to build and broadcast transactions"""
-        try:
-            print(f"DEBUG - Building transaction")
-            print(f"DEBUG - Message payload: {msg}")
-            
-            if not self.client:
+    async def ensure_ready(self, max_age: float = READY_MAX_AGE):
+        """Initialize the client once, then only refresh chain state when stale.
+
+        Unlike init_client, this keeps the AsyncClient, composer and broadcast
+        engine and just re-syncs the timeout height every max_age seconds.
+        """
+        async with self._ready_lock:
+            if not self.client or not self.broadcast_engine:
                 await self.init_client()
-            
-            # Verificar la dirección del remitente
-            sender_address = self.address.to_acc_bech32()
-            print(f"DEBUG - Verified sender address: {sender_address}")
-            
-            # Construir la transacción
-            tx = (
-                Transaction()
-                .with_messages(msg)
-                .with_sequence(self.client.get_sequence())
-                .with_account_num(self.client.get_number())
-                .with_chain_id(self.network.chain_id)
-            )
-            
-            # Usar valores de gas basados en la simulación anterior
-            gas_wanted = 245350  # Valor obtenido de la simulación
-            tx = tx.with_gas(gas_wanted)
-            
-            # Configurar fee según el requerimiento de la red
-            gas_price = 160000000000  # Ajustado para cumplir con el fee mínimo requerido
-            initial_fee = [
-                self.composer.coin(
-                    amount=gas_price * gas_wanted,  # Esto dará aproximadamente 39256000000000 inj
-                    denom=self.network.fee_denom
-                )
-            ]
-            tx = tx.with_fee(initial_fee)
-            
-            print(f"DEBUG - Transaction details:")
-            print(f"  - Gas limit: {gas_wanted}")
-            print(f"  - Gas price: {gas_price}")
-            print(f"  - Total fee: {gas_price * gas_wanted}")
-            
-            # Obtener y mostrar el balance antes de la transacción
-            balance = await self.client.fetch_bank_balances(self.address.to_acc_bech32())
-            print(f"DEBUG - Current balance: {balance}")
-            
-            print(f"DEBUG - Transaction details:")
-            print(f"  - Sequence: {self.client.get_sequence()}")
-            print(f"  - Account number: {self.client.get_number()}")
-            print(f"  - Chain ID: {self.network.chain_id}")
-            
-            # Simular la transacción primero
-            sim_sign_doc = tx.get_sign_doc(self.pub_key)
-            sim_sig = self.priv_key.sign(sim_sign_doc.SerializeToString())
-            sim_tx_raw_bytes = tx.get_tx_data(sim_sig, self.pub_key)
-            
-            print(f"DEBUG - Simulation payload:")
-            print(f"  - Sign doc: {sim_sign_doc}")
-            print(f"  - Signature: {sim_sig.hex()}")
-            
-            try:
-                sim_res = await self.client.simulate(sim_tx_raw_bytes)
-                print(f"DEBUG - Simulation result: {sim_res}")
-            except Exception as e:
-                print(f"DEBUG - Simulation failed: {str(e)}")
-                return {"error": f"Simulation failed: {str(e)}"}
-
-            # Configurar gas y fee
-            gas_limit = int(sim_res["gasInfo"]["gasUsed"]) * 2
-            fee = [
-                self.composer.coin(
-                    amount=gas_price * gas_limit,
-                    denom=self.network.fee_denom,
-                )
-            ]
-            
-            tx = tx.with_gas(gas_limit).with_fee(fee)
-            print(f"DEBUG - Final transaction details:")
-            print(f"  - Gas limit: {gas_limit}")
-            print(f"  - Fee: {fee}")
-            
-            # Firmar y transmitir
-            sign_doc = tx.get_sign_doc(self.pub_key)
-            sig = self.priv_key.sign(sign_doc.SerializeToString())
-            tx_raw_bytes = tx.get_tx_data(sig, self.pub_key)
-            
-            print(f"DEBUG - Final transaction payload:")
-            print(f"  - Sign doc: {sign_doc}")
-            print(f"  - Signature: {sig.hex()}")
-            print(f"  - Raw bytes length: {len(tx_raw_bytes)}")
+            elif time.monotonic() - self.ready_at > max_age:
+                await self.client.sync_timeout_height()
+                self.ready_at = time.monotonic()
+
+    async def build_and_broadcast_tx(self, msg, batch_key: str = None):
+        """
+        Common function to build and broadcast transactions.
+
+        Messages of one caller passed with the same batch_key may be packed
+        into one transaction by the broadcast engine.
+        """
+        try:
+            await self.ensure_ready()
+
+            if logger.is_enabled(logging.DEBUG):
+                # Balance antes de la transacción, solo para depurar
+                sender_address = self.address.to_acc_bech32()
+                balance = await self.client.fetch_bank_balances(sender_address)
+                logger.debug("tx_build", sender=sender_address, msg=msg, balance=balance)
 
-            res = await self.client.broadcast_tx_sync_mode(tx_raw_bytes)
-            print(f"DEBUG - Broadcast result: {res}")
-            return res
+            # Todos los módulos comparten la misma cola de broadcast
+            return await self.broadcast_engine.submit(msg, batch_key)
 
         except Exception as e:
-            print(f"DEBUG - Transaction failed: {str(e)}")
-            import traceback
-            print(f"DEBUG - Full traceback: {traceback.format_exc()}")
+            logger.exception("tx_failed", error=str(e))
             return {"error": str(e)}
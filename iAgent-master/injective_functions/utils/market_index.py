@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+from injective_functions.utils.http_session import HttpSessionManager
+from injective_functions.utils.indexer_requests import normalize_ticker
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two background refreshes of the market lists
+DEFAULT_REFRESH_INTERVAL = float(os.getenv("MARKET_INDEX_REFRESH_SECONDS", 300))
+
+MARKET_ENDPOINTS = {
+    "mainnet": "https://sentry.lcd.injective.network/injective/exchange/v1beta1",
+    "testnet": "https://testnet.sentry.lcd.injective.network/injective/exchange/v1beta1",
+}
+MARKET_TYPES = ("derivative", "spot")
+
+
+class MarketIndex:
+    """
+    Process-wide ticker to market id index for one network.
+
+    Derivative and spot markets are loaded once, refreshed in the background
+    and looked up in O(1) through normalize_ticker. Lookups are per market
+    type, so a spot ticker never resolves to a derivative market or back.
+    """
+
+    _indexes: Dict[str, "MarketIndex"] = {}
+
+    def __init__(
+        self,
+        network_type: str = "mainnet",
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+    ) -> None:
+        self.network_type = network_type
+        self.refresh_interval = refresh_interval
+        self.base_url = MARKET_ENDPOINTS.get(network_type, MARKET_ENDPOINTS["testnet"])
+        # market type -> ticker -> market id, spot and derivative tickers overlap
+        self.tickers: Dict[str, Dict[str, str]] = {t: {} for t in MARKET_TYPES}
+        self.market_types: Dict[str, str] = {}
+        self.last_refresh: float = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_network(cls, network_type: str = "mainnet") -> "MarketIndex":
+        """Get the shared index of a network"""
+        index = cls._indexes.get(network_type)
+        if index is None:
+            index = cls(network_type)
+            cls._indexes[network_type] = index
+        return index
+
+    async def _fetch_markets(self, session, market_type: str) -> List[dict]:
+        request_url = f"{self.base_url}/{market_type}/markets"
+        async with session.get(request_url) as response:
+            data = await response.json()
+            if "markets" not in data:
+                logger.error(f"No market data found in the {market_type} response")
+                return []
+            return data["markets"]
+
+    @staticmethod
+    def _index(results: List[List[dict]]):
+        tickers = {market_type: {} for market_type in MARKET_TYPES}
+        market_types = {}
+        for market_type, markets in zip(MARKET_TYPES, results):
+            for market_info in markets:
+                # derivative markets are nested under "market", spot ones are flat
+                market = market_info.get("market", market_info)
+                ticker = market.get("ticker", "").upper()
+                market_id = market.get("market_id")
+
+                # Ensure market_id does not have extra quotes
+                if isinstance(market_id, str):
+                    market_id = market_id.strip("'\"")
+
+                if ticker and market_id:
+                    tickers[market_type][ticker] = market_id
+                    market_types[market_id] = market_type
+        return tickers, market_types
+
+    async def refresh(self) -> None:
+        """
+        Reload derivative and spot markets from the chain.
+
+        Any failure (HTTP error, timeout, malformed payload) is logged and the
+        previous index keeps being served.
+        """
+        async with self._lock:
+            try:
+                session = HttpSessionManager.get_session()
+                results = await asyncio.gather(
+                    *[self._fetch_markets(session, t) for t in MARKET_TYPES]
+                )
+                tickers, market_types = self._index(results)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"HTTP request failed: {e}")
+                return
+            except Exception as e:
+                logger.error(f"Malformed market data: {e}")
+                return
+
+            if market_types:
+                self.tickers = tickers
+                self.market_types = market_types
+                self.last_refresh = time.monotonic()
+
+    def _ensure_refresher(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.get_running_loop().create_task(
+                self._refresh_loop()
+            )
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Background market refresh failed: {str(e)}")
+
+    async def _ensure_loaded(self) -> None:
+        self._ensure_refresher()
+        if not self.last_refresh:
+            await self.refresh()
+
+    def lookup(self, ticker_symbol: str, market_type: str = "derivative") -> Optional[str]:
+        """Resolve a ticker among the markets of one type without any I/O"""
+        try:
+            normalized_ticker = normalize_ticker(ticker_symbol)
+        except ValueError:
+            return None
+        return self.tickers.get(market_type, {}).get(normalized_ticker)
+
+    async def resolve(
+        self, ticker_symbol: str, market_type: str = "derivative"
+    ) -> Optional[str]:
+        """
+        Resolve a ticker symbol to its market id.
+
+        Args:
+            ticker_symbol (str): Ticker to look up (e.g. 'BTCUSDT', 'btc-perp', 'inj')
+            market_type (str, optional): "derivative" or "spot". Defaults to "derivative".
+
+        Returns:
+            Optional[str]: The market id if found, else None
+        """
+        await self._ensure_loaded()
+        market_id = self.lookup(ticker_symbol, market_type)
+        if market_id is None:
+            logger.warning(f"No {market_type} market ID found for ticker: {ticker_symbol}")
+        return market_id
+
+    async def resolve_many(
+        self, ticker_symbols: Iterable[str], market_type: str = "derivative"
+    ) -> List[Optional[str]]:
+        """
+        Resolve several ticker symbols with a single index load.
+
+        Args:
+            ticker_symbols (Iterable[str]): Tickers to look up
+            market_type (str, optional): "derivative" or "spot". Defaults to "derivative".
+
+        Returns:
+            List[Optional[str]]: Market ids in input order, None when not found
+        """
+        await self._ensure_loaded()
+        return [self.lookup(ticker_symbol, market_type) for ticker_symbol in ticker_symbols]
+
+    def market_type(self, market_id: str) -> Optional[str]:
+        """Get whether a market id is a 'derivative' or 'spot' market"""
+        return self.market_types.get(market_id)
+
+    def close(self) -> None:
+        """Stop the background refresh task"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
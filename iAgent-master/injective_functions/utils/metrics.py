@@ -0,0 +1,276 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds, from a cached read to a slow chain broadcast
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class _ThreadCells:
+    """
+    One cell of values per writing thread.
+
+    Only the owning thread writes to its cell, so updates take no lock;
+    a scrape sums the cells of every thread.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._local = threading.local()
+        self._cells: List[list] = []
+
+    def get(self) -> list:
+        cell = getattr(self._local, "cell", None)
+        if cell is None:
+            cell = self._local.cell = [0] * self.size
+            self._cells.append(cell)
+        return cell
+
+    def totals(self) -> list:
+        totals = [0] * self.size
+        for cell in list(self._cells):
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild:
+    def __init__(self) -> None:
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._cells.get()[0] += amount
+
+    def value(self) -> float:
+        return self._cells.totals()[0]
+
+
+class _GaugeChild:
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from function on every scrape"""
+        self._function = function
+
+    def value(self) -> float:
+        return self._function() if self._function else self._value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        # One slot per bucket, one for +Inf, and the sum
+        self._cells = _ThreadCells(len(buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.get()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry or REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """Child metric of one label combination, created on first use"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self._children[()]
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labelnames, key)), child.value())
+            for key, child in list(self._children.items())
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default().set_function(function)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        for key, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, key))
+            totals = child._cells.totals()
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), totals):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                samples.append((f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            samples.append((f"{self.name}_sum", labels, totals[-1]))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Registry:
+    """Metrics of the process, rendered in the Prometheus text format"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    label_text = ",".join(
+                        f'{key}="{_escape(item)}"' for key, item in labels.items()
+                    )
+                    name = f"{name}{{{label_text}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Agent server
+HTTP_REQUESTS = Counter(
+    "agent_http_requests_total", "HTTP requests served", ("route", "method", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "agent_http_request_duration_seconds", "Time to produce the response", ("route",)
+)
+AGENTS_INITIALIZED = Gauge("agent_initialized_agents", "Agents with chain clients")
+FUNCTION_CALLS = Counter(
+    "agent_function_calls_total", "Injective functions executed", ("function", "outcome")
+)
+
+# OpenAI
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "Duration of chat completion requests", ("model",)
+)
+LLM_FIRST_TOKEN = Histogram(
+    "llm_first_token_seconds", "Time until the first streamed chunk", ("model",)
+)
+LLM_ERRORS = Counter("llm_errors_total", "Failed chat completion requests", ("model",))
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens used", ("model", "type"))
+
+# Chain
+CHAIN_BROADCAST_DURATION = Histogram(
+    "chain_broadcast_duration_seconds",
+    "Time from taking an account sequence to the broadcast result",
+)
+CHAIN_BROADCASTS = Counter(
+    "chain_broadcasts_total", "Transactions broadcast", ("outcome",)
+)
+CHAIN_BROADCAST_QUEUE = Gauge(
+    "chain_broadcast_queue_depth", "Messages waiting in the broadcast queues"
+)
+CHAIN_GAS_USED = Histogram(
+    "chain_gas_used",
+    "Gas used by each transaction, from its simulation",
+    buckets=(50000, 100000, 150000, 200000, 300000, 500000, 1000000, 2000000),
+)
+
+# Event loop, from the watchdog
+LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total", "Times the event loop was blocked beyond the threshold"
+)
+LOOP_LAG = Gauge("event_loop_lag_seconds", "Lag of the last event loop heartbeat")
+LOOP_MAX_LAG = Gauge("event_loop_max_lag_seconds", "Largest event loop lag seen")
@@ -0,0 +1,370 @@
+import asyncio
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections import deque
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Markets with a live replica, the least recently read one is dropped beyond this
+MAX_REPLICAS = int(os.getenv("ORDERBOOK_MAX_REPLICAS", 16))
+# Seconds without a read after which a replica and its stream are dropped
+REPLICA_IDLE_SECONDS = float(os.getenv("ORDERBOOK_REPLICA_IDLE_SECONDS", 300))
+# Stream updates kept while a replica waits for its snapshot
+MAX_BUFFERED_UPDATES = 1000
+# Indexer values are in chain units, chain queries in the extended (x 1e18) format
+CHAIN_FORMAT_DECIMALS = 18
+
+
+def _chain_format(value: str) -> str:
+    return str(int(Decimal(value).scaleb(CHAIN_FORMAT_DECIMALS)))
+
+
+def _levels(levels: List[dict]) -> List[dict]:
+    """Indexer price levels as chain {"p", "q"} levels, inactive ones at zero"""
+    return [
+        {
+            "p": _chain_format(level["price"]),
+            "q": _chain_format(level["quantity"]) if level.get("isActive", True) else "0",
+        }
+        for level in levels
+    ]
+
+
+class PriceLevels:
+    """
+    One side of an order book kept in sorted parallel arrays.
+
+    Levels are ordered best first, so a top-N read is a slice of N entries.
+    """
+
+    def __init__(self, descending: bool) -> None:
+        self.descending = descending
+        self._keys: List[Decimal] = []
+        self._levels: List[dict] = []
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+    def set(self, price: str, quantity: str) -> None:
+        """Set the absolute quantity of a price level, removing it at zero"""
+        key = -Decimal(price) if self.descending else Decimal(price)
+        i = bisect_left(self._keys, key)
+        exists = i < len(self._keys) and self._keys[i] == key
+        if Decimal(quantity) == 0:
+            if exists:
+                del self._keys[i]
+                del self._levels[i]
+        elif exists:
+            self._levels[i] = {"p": price, "q": quantity}
+        else:
+            self._keys.insert(i, key)
+            self._levels.insert(i, {"p": price, "q": quantity})
+
+    def top(self, n: Optional[int] = None) -> List[dict]:
+        return self._levels[:n] if n else list(self._levels)
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._levels.clear()
+
+
+class OrderbookReplica:
+    """
+    In-process replica of one market's order book.
+
+    Updates that arrive before the snapshot, or after a sequence gap, are
+    buffered; seeding replays the buffered updates newer than the snapshot.
+    """
+
+    def __init__(self, market_id: str, market_type: str = "derivative") -> None:
+        self.market_id = market_id
+        self.market_type = market_type
+        self.buys = PriceLevels(descending=True)
+        self.sells = PriceLevels(descending=False)
+        self.sequence: Optional[int] = None
+        # False until seeded, and again while resyncing after a gap
+        self.synced = False
+        self.last_read = time.monotonic()
+        self._buffer: deque = deque(maxlen=MAX_BUFFERED_UPDATES)
+
+    def _set_levels(self, buys: List[dict], sells: List[dict]) -> None:
+        for level in buys:
+            self.buys.set(level["p"], level["q"])
+        for level in sells:
+            self.sells.set(level["p"], level["q"])
+
+    def seed(self, sequence: int, buys: List[dict], sells: List[dict]) -> bool:
+        """
+        Replace the book with a snapshot taken at sequence, then replay the
+        buffered updates that came after it.
+
+        Returns:
+            bool: False if the buffered updates do not continue the snapshot
+        """
+        self.buys.clear()
+        self.sells.clear()
+        self._set_levels(buys, sells)
+        self.sequence = sequence
+        buffered = sorted(
+            (update for update in self._buffer if update[0] > sequence),
+            key=lambda update: update[0],
+        )
+        self._buffer.clear()
+        for i, (update_sequence, update_buys, update_sells) in enumerate(buffered):
+            if update_sequence != self.sequence + 1:
+                logger.warning(
+                    f"Orderbook gap on {self.market_id}: {self.sequence} -> {update_sequence}"
+                )
+                # Keep the rest for the next snapshot
+                self._buffer.extend(buffered[i:])
+                self.synced = False
+                return False
+            self._set_levels(update_buys, update_sells)
+            self.sequence = update_sequence
+        self.synced = True
+        return True
+
+    def apply(self, sequence: int, buys: List[dict], sells: List[dict]) -> bool:
+        """
+        Apply a stream update of absolute level quantities.
+
+        Returns:
+            bool: False if a sequence gap was detected and the book needs a resync
+        """
+        if not self.synced:
+            self._buffer.append((sequence, buys, sells))
+            return True
+        if sequence <= self.sequence:
+            # already applied
+            return True
+        if sequence != self.sequence + 1:
+            logger.warning(
+                f"Orderbook gap on {self.market_id}: {self.sequence} -> {sequence}"
+            )
+            self.synced = False
+            self._buffer.append((sequence, buys, sells))
+            return False
+        self._set_levels(buys, sells)
+        self.sequence = sequence
+        return True
+
+    def snapshot(self, limit: Optional[int] = None) -> dict:
+        """Top levels in the chain orderbook response format"""
+        self.last_read = time.monotonic()
+        return {
+            "buysPriceLevel": self.buys.top(limit),
+            "sellsPriceLevel": self.sells.top(limit),
+        }
+
+    def top_of_book(self) -> dict:
+        best_buy = self.buys.top(1)
+        best_sell = self.sells.top(1)
+        best_buy_price = best_buy[0]["p"] if best_buy else None
+        best_sell_price = best_sell[0]["p"] if best_sell else None
+        mid_price = None
+        if best_buy_price and best_sell_price:
+            mid_price = str((Decimal(best_buy_price) + Decimal(best_sell_price)) / 2)
+        return {
+            "midPrice": mid_price,
+            "bestBuyPrice": best_buy_price,
+            "bestSellPrice": best_sell_price,
+        }
+
+
+class OrderbookReplicaManager:
+    """
+    Keeps order book replicas of recently read markets current from the
+    indexer orderbook streams, and feeds their top of book to the price cache.
+
+    Each market has its own stream, so adding or dropping a market leaves
+    the other replicas untouched. Snapshots and stream updates come from the
+    indexer because they share one sequence per market.
+    """
+
+    _managers: Dict[str, "OrderbookReplicaManager"] = {}
+
+    def __init__(self, chain_client) -> None:
+        self.chain_client = chain_client
+        self.replicas: Dict[str, OrderbookReplica] = {}
+        self._streams: Dict[str, asyncio.Task] = {}
+        self._seeding: Dict[str, asyncio.Future] = {}
+        self._tasks = set()
+
+    @classmethod
+    def for_chain_client(cls, chain_client) -> "OrderbookReplicaManager":
+        """Get the shared manager of the chain client's network"""
+        manager = cls._managers.get(chain_client.network_type)
+        if manager is None:
+            manager = cls(chain_client)
+            cls._managers[chain_client.network_type] = manager
+        else:
+            manager.chain_client = chain_client
+        return manager
+
+    def get(self, market_id: str) -> Optional[OrderbookReplica]:
+        """Get the replica of a market if it is subscribed and in sync"""
+        replica = self.replicas.get(market_id)
+        if replica is not None and replica.synced:
+            return replica
+        return None
+
+    async def ensure(
+        self, market_id: str, market_type: str = "derivative"
+    ) -> Optional[OrderbookReplica]:
+        """
+        Get an in-sync replica of a market, subscribing to it on first read.
+
+        Returns:
+            Optional[OrderbookReplica]: None while the replica cannot be synced
+        """
+        self._drop_idle()
+        if market_id not in self.replicas:
+            await self.subscribe(market_id, market_type)
+        else:
+            pending = self._seeding.get(market_id)
+            if pending is not None:
+                await asyncio.shield(pending)
+        replica = self.get(market_id)
+        if replica is not None:
+            replica.last_read = time.monotonic()
+        return replica
+
+    async def subscribe(self, market_id: str, market_type: str = "derivative") -> None:
+        """Seed a replica of a market and keep it current from its stream"""
+        if market_id in self.replicas:
+            return
+        while len(self.replicas) >= MAX_REPLICAS:
+            self.unsubscribe(
+                min(self.replicas.values(), key=lambda replica: replica.last_read).market_id
+            )
+        replica = OrderbookReplica(market_id, market_type)
+        self.replicas[market_id] = replica
+        # Stream first: updates are buffered until the snapshot lands
+        self._streams[market_id] = asyncio.get_running_loop().create_task(
+            self._listen(replica)
+        )
+        try:
+            await self._resync(replica)
+        except Exception:
+            self.unsubscribe(market_id)
+            raise
+
+    def unsubscribe(self, market_id: str) -> None:
+        """Drop the replica of a market and close its stream"""
+        self.replicas.pop(market_id, None)
+        stream = self._streams.pop(market_id, None)
+        if stream is not None:
+            stream.cancel()
+
+    def _drop_idle(self) -> None:
+        now = time.monotonic()
+        for market_id, replica in list(self.replicas.items()):
+            if now - replica.last_read > REPLICA_IDLE_SECONDS:
+                self.unsubscribe(market_id)
+
+    async def _fetch_snapshot(self, replica: OrderbookReplica) -> Tuple[int, List, List]:
+        client = self.chain_client.client
+        if replica.market_type == "spot":
+            res = await client.fetch_spot_orderbook_v2(market_id=replica.market_id)
+        else:
+            res = await client.fetch_derivative_orderbook_v2(market_id=replica.market_id)
+        orderbook = res.get("orderbook", {})
+        return (
+            int(orderbook.get("sequence", 0)),
+            _levels(orderbook.get("buys", [])),
+            _levels(orderbook.get("sells", [])),
+        )
+
+    def _resync(self, replica: OrderbookReplica) -> asyncio.Future:
+        """Seed a replica from a new snapshot, sharing a seeding in progress"""
+        pending = self._seeding.get(replica.market_id)
+        if pending is None or pending.done():
+            pending = asyncio.ensure_future(self._seed(replica))
+            self._seeding[replica.market_id] = pending
+            pending.add_done_callback(
+                lambda _: self._seeding.pop(replica.market_id, None)
+            )
+        return pending
+
+    async def _seed(self, replica: OrderbookReplica) -> None:
+        sequence, buys, sells = await self._fetch_snapshot(replica)
+        if self.replicas.get(replica.market_id) is not replica:
+            return
+        if replica.seed(sequence, buys, sells):
+            self._publish(replica)
+        else:
+            # Updates between the snapshot and the buffer were missed
+            self._spawn(self._retry_seed(replica))
+
+    async def _retry_seed(self, replica: OrderbookReplica) -> None:
+        await asyncio.sleep(1)
+        if self.replicas.get(replica.market_id) is replica and not replica.synced:
+            try:
+                await self._resync(replica)
+            except Exception as e:
+                logger.error(f"Orderbook resync failed for {replica.market_id}: {str(e)}")
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _publish(self, replica: OrderbookReplica) -> None:
+        price_cache = self.chain_client.price_cache
+        if price_cache is not None:
+            tob = replica.top_of_book()
+            price_cache.update(
+                replica.market_id,
+                tob["midPrice"],
+                tob["bestBuyPrice"],
+                tob["bestSellPrice"],
+            )
+
+    async def _listen(self, replica: OrderbookReplica) -> None:
+        client = self.chain_client.client
+        listen = (
+            client.listen_spot_orderbook_updates
+            if replica.market_type == "spot"
+            else client.listen_derivative_orderbook_updates
+        )
+        first = True
+        while True:
+            if not first:
+                # The stream ended, updates may have been missed
+                replica.synced = False
+                self._spawn(self._retry_seed(replica))
+            first = False
+            try:
+                await listen(market_ids=[replica.market_id], callback=self._on_update)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    f"Orderbook stream of {replica.market_id} failed, reconnecting: {str(e)}"
+                )
+            await asyncio.sleep(1)
+
+    async def _on_update(self, event: dict) -> None:
+        update = event.get("orderbookLevelUpdates", {})
+        replica = self.replicas.get(update.get("marketId"))
+        if replica is None:
+            return
+        applied = replica.apply(
+            int(update.get("sequence", 0)),
+            _levels(update.get("buys", [])),
+            _levels(update.get("sells", [])),
+        )
+        if not applied:
+            self._spawn(self._retry_seed(replica))
+        elif replica.synced:
+            self._publish(replica)
+
+    def close(self) -> None:
+        """Drop every replica and close their streams"""
+        for market_id in list(self.replicas):
+            self.unsubscribe(market_id)
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Oldest mid price / top of book, in seconds, served without a round-trip
+DEFAULT_MAX_AGE = float(os.getenv("PRICE_CACHE_MAX_AGE", 2.0))
+
+
+class PriceCache:
+    """
+    Per-network cache of mid price and top of book per market.
+
+    Entries are fed by update() from orderbook streams or by poll loops
+    started with subscribe(). Reads older than the freshness bound fall back
+    to a fetch, and concurrent fetches of one market share a single request.
+    """
+
+    _caches: Dict[str, "PriceCache"] = {}
+
+    def __init__(self, client, max_age: float = DEFAULT_MAX_AGE) -> None:
+        self.client = client
+        self.max_age = max_age
+        # market_id -> (monotonic time, {"midPrice", "bestBuyPrice", "bestSellPrice"})
+        self.entries: Dict[str, Tuple[float, dict]] = {}
+        self._fetches: Dict[str, asyncio.Future] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def for_network(cls, network_type: str, client) -> "PriceCache":
+        """Get the shared cache of a network, bound to the latest client"""
+        cache = cls._caches.get(network_type)
+        if cache is None:
+            cache = cls(client)
+            cls._caches[network_type] = cache
+        else:
+            cache.client = client
+        return cache
+
+    def update(
+        self,
+        market_id: str,
+        mid_price: Optional[str],
+        best_buy_price: Optional[str],
+        best_sell_price: Optional[str],
+    ) -> None:
+        """Store a new top of book, e.g. from an orderbook stream"""
+        self.entries[market_id] = (
+            time.monotonic(),
+            {
+                "midPrice": mid_price,
+                "bestBuyPrice": best_buy_price,
+                "bestSellPrice": best_sell_price,
+            },
+        )
+
+    def peek(self, market_id: str, max_age: Optional[float] = None) -> Optional[dict]:
+        """Get the cached top of book if it is fresh enough, without I/O"""
+        entry = self.entries.get(market_id)
+        bound = self.max_age if max_age is None else max_age
+        if entry and time.monotonic() - entry[0] <= bound:
+            return entry[1]
+        return None
+
+    async def _fetch(self, market_id: str, market_type: str) -> dict:
+        if market_type == "spot":
+            res = await self.client.fetch_spot_mid_price_and_tob(market_id=market_id)
+        else:
+            res = await self.client.fetch_derivative_mid_price_and_tob(
+                market_id=market_id
+            )
+        self.update(
+            market_id,
+            res.get("midPrice"),
+            res.get("bestBuyPrice"),
+            res.get("bestSellPrice"),
+        )
+        return self.entries[market_id][1]
+
+    async def get(
+        self, market_id: str, market_type: str = "derivative", max_age: Optional[float] = None
+    ) -> dict:
+        """
+        Get the mid price and top of book of a market.
+
+        Args:
+            market_id (str): Market to read
+            market_type (str, optional): "derivative" or "spot". Defaults to "derivative".
+            max_age (float, optional): Freshness bound in seconds, defaults to the cache's
+
+        Returns:
+            dict: {"midPrice", "bestBuyPrice", "bestSellPrice"}
+        """
+        cached = self.peek(market_id, max_age)
+        if cached is not None:
+            return cached
+        pending = self._fetches.get(market_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(market_id, market_type))
+            self._fetches[market_id] = pending
+            pending.add_done_callback(lambda _: self._fetches.pop(market_id, None))
+        return await asyncio.shield(pending)
+
+    def subscribe(
+        self, market_id: str, market_type: str = "derivative", interval: Optional[float] = None
+    ) -> None:
+        """Keep a market fresh by polling it every interval seconds"""
+        poller = self._pollers.get(market_id)
+        if poller is None or poller.done():
+            self._pollers[market_id] = asyncio.get_running_loop().create_task(
+                self._poll(market_id, market_type, interval or self.max_age / 2)
+            )
+
+    async def _poll(self, market_id: str, market_type: str, interval: float) -> None:
+        while True:
+            try:
+                await self._fetch(market_id, market_type)
+            except Exception as e:
+                logger.error(f"Price poll failed for {market_id}: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def unsubscribe(self, market_id: str) -> None:
+        """Stop polling a market"""
+        poller = self._pollers.pop(market_id, None)
+        if poller is not None:
+            poller.cancel()
+
+    def close(self) -> None:
+        """Stop every poll loop"""
+        for market_id in list(self._pollers):
+            self.unsubscribe(market_id)
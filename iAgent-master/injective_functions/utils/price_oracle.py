@@ -0,0 +1,251 @@
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from injective_functions.utils.http_session import HttpSessionManager
+from injective_functions.utils.structured_logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# Seconds a USD price is served without a refresh
+DEFAULT_TTL = float(os.getenv("PRICE_ORACLE_TTL", 60))
+# Oldest price, in seconds, still served while a refresh runs in the background
+DEFAULT_MAX_STALE = float(os.getenv("PRICE_ORACLE_MAX_STALE", 3600))
+DEFAULT_SNAPSHOT_DIR = os.getenv(
+    "PRICE_ORACLE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "iagent")
+)
+COINGECKO_URL = os.getenv(
+    "COINGECKO_URL", "https://api.coingecko.com/api/v3/simple/price"
+)
+
+
+class PriceUnavailableError(Exception):
+    """Raised when a price can neither be fetched nor served from the cache"""
+
+
+class PriceSource(ABC):
+    """Where the oracle reads USD prices from"""
+
+    name = ""
+
+    @abstractmethod
+    async def fetch(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Fetch the USD price of several symbols in one request.
+
+        Args:
+            symbols (Iterable[str]): Upper case symbols, e.g. "INJ"
+
+        Returns:
+            Dict[str, float]: USD price of each symbol the source knows
+        """
+
+
+class CoinGeckoSource(PriceSource):
+    """USD prices from the CoinGecko simple price endpoint"""
+
+    name = "coingecko"
+    # Symbol -> CoinGecko asset id
+    DEFAULT_IDS = {
+        "INJ": "injective-protocol",
+        "ETH": "ethereum",
+        "WETH": "weth",
+        "BTC": "bitcoin",
+        "USDT": "tether",
+        "USDC": "usd-coin",
+        "ATOM": "cosmos",
+    }
+
+    def __init__(self, ids: Optional[Dict[str, str]] = None, url: str = COINGECKO_URL) -> None:
+        self.ids = {**self.DEFAULT_IDS, **(ids or {})}
+        self.url = url
+        self.api_key = os.getenv("COINGECKO_API_KEY")
+
+    async def fetch(self, symbols: Iterable[str]) -> Dict[str, float]:
+        by_id = {self.ids[symbol]: symbol for symbol in symbols if symbol in self.ids}
+        if not by_id:
+            return {}
+        headers = {"x-cg-demo-api-key": self.api_key} if self.api_key else None
+        session = HttpSessionManager.get_session()
+        async with session.get(
+            self.url,
+            params={"ids": ",".join(by_id), "vs_currencies": "usd"},
+            headers=headers,
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+        return {
+            symbol: float(data[asset]["usd"])
+            for asset, symbol in by_id.items()
+            if asset in data and "usd" in data[asset]
+        }
+
+
+class PriceOracle:
+    """
+    Process-wide cache of USD prices.
+
+    Prices younger than the TTL are served without I/O. Older ones, up to
+    max_stale, are served right away while a refresh runs in the background
+    (stale-while-revalidate). Every known symbol is refreshed in a single
+    request to the source, and concurrent refreshes share it. The cache is
+    snapshotted on disk so a cold start has prices before the first fetch.
+    """
+
+    _shared: Optional["PriceOracle"] = None
+
+    def __init__(
+        self,
+        source: Optional[PriceSource] = None,
+        ttl: float = DEFAULT_TTL,
+        max_stale: float = DEFAULT_MAX_STALE,
+        snapshot_dir: Optional[str] = DEFAULT_SNAPSHOT_DIR,
+    ) -> None:
+        self.source = source or CoinGeckoSource()
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.snapshot_path = (
+            os.path.join(snapshot_dir, f"usd_prices_{self.source.name or 'custom'}.json")
+            if snapshot_dir
+            else None
+        )
+        # symbol -> (wall clock time of the fetch, USD price)
+        self.prices: Dict[str, Tuple[float, float]] = {}
+        self._refresh: Optional[asyncio.Future] = None
+        self._refresh_symbols: Set[str] = set()
+        self._load_snapshot()
+
+    @classmethod
+    def shared(cls) -> "PriceOracle":
+        """Get the oracle shared by every module of the process"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def set_shared(cls, oracle: "PriceOracle") -> None:
+        """Replace the shared oracle, e.g. to plug in another price source"""
+        cls._shared = oracle
+
+    def _load_snapshot(self) -> None:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            self.prices = {
+                symbol: (float(entry["at"]), float(entry["usd"]))
+                for symbol, entry in snapshot["prices"].items()
+            }
+            logger.info(
+                "price_snapshot_loaded", path=self.snapshot_path, symbols=len(self.prices)
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("price_snapshot_unreadable", error=str(e))
+
+    def _save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(
+                    {
+                        "prices": {
+                            symbol: {"at": at, "usd": usd}
+                            for symbol, (at, usd) in self.prices.items()
+                        }
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning("price_snapshot_write_failed", error=str(e))
+
+    def peek(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Get the cached USD price if it is fresh enough, without I/O"""
+        entry = self.prices.get(symbol.upper())
+        bound = self.ttl if max_age is None else max_age
+        if entry and time.time() - entry[0] <= bound:
+            return entry[1]
+        return None
+
+    async def _fetch(self, symbols: Iterable[str]) -> None:
+        symbols = set(symbols)
+        start = time.perf_counter()
+        fetched = await self.source.fetch(symbols)
+        now = time.time()
+        for symbol, usd in fetched.items():
+            self.prices[symbol] = (now, usd)
+        logger.debug(
+            "prices_refreshed",
+            source=self.source.name,
+            symbols=len(fetched),
+            duration_ms=round((time.perf_counter() - start) * 1000, 3),
+        )
+        if fetched:
+            self._save_snapshot()
+
+    def refresh(self, symbols: Iterable[str] = ()) -> asyncio.Future:
+        """Refresh every known symbol plus symbols, sharing an ongoing refresh"""
+        wanted = set(self.prices) | {symbol.upper() for symbol in symbols}
+        pending = self._refresh
+        if pending is not None and not pending.done() and wanted <= self._refresh_symbols:
+            return pending
+        pending = asyncio.ensure_future(self._fetch(wanted))
+        self._refresh_symbols = wanted
+        pending.add_done_callback(self._refresh_done)
+        self._refresh = pending
+        return pending
+
+    def _refresh_done(self, future: asyncio.Future) -> None:
+        if self._refresh is future:
+            self._refresh = None
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("price_refresh_failed", error=str(future.exception()))
+
+    async def get_usd_price(self, symbol: str) -> float:
+        """
+        Get the USD price of a symbol.
+
+        Args:
+            symbol (str): Token symbol, e.g. "INJ"
+
+        Returns:
+            float: USD price, possibly up to max_stale seconds old
+
+        Raises:
+            PriceUnavailableError: If there is no usable price
+        """
+        symbol = symbol.upper()
+        entry = self.prices.get(symbol)
+        age = time.time() - entry[0] if entry else None
+        if age is not None and age <= self.ttl:
+            return entry[1]
+        if age is not None and age <= self.max_stale:
+            # Serve the stale price, the next caller gets the refreshed one
+            self.refresh((symbol,))
+            return entry[1]
+        try:
+            await asyncio.shield(self.refresh((symbol,)))
+        except Exception as e:
+            if entry is None:
+                raise PriceUnavailableError(f"No USD price for {symbol}: {str(e)}") from e
+            logger.warning("price_served_expired", symbol=symbol, age_s=round(age, 1))
+            return entry[1]
+        entry = self.prices.get(symbol, entry)
+        if entry is None:
+            raise PriceUnavailableError(
+                f"No USD price for {symbol} from {self.source.name or 'the price source'}"
+            )
+        return entry[1]
+
+
+async def get_usd_price(symbol: str) -> float:
+    """USD price of a symbol from the shared oracle"""
+    return await PriceOracle.shared().get_usd_price(symbol)
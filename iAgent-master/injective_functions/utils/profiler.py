@@ -0,0 +1,233 @@
+import asyncio
+import hmac
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from injective_functions.utils.structured_logging import get_logger
+
+
+# Seconds between two stack samples, 100 Hz by default
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.01))
+# Seconds between two event loop lag probes
+LAG_PROBE_INTERVAL = 0.05
+MAX_PROFILE_SECONDS = 120.0
+# Admin token for the profile endpoint, the endpoint is off without one
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+logger = get_logger(__name__)
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one runs"""
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler of every thread of the process.
+
+    A background thread reads the stack of the other threads at a fixed
+    interval, so profiled code runs unmodified. Stacks are counted in the
+    collapsed format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Stacks as "frame;frame;frame count" lines"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def _await_chain(awaitable) -> List[str]:
+    """Frames a coroutine is suspended in, down to the future it waits on"""
+    chain = []
+    while awaitable is not None:
+        frame = (
+            getattr(awaitable, "cr_frame", None)
+            or getattr(awaitable, "gi_frame", None)
+            or getattr(awaitable, "ag_frame", None)
+        )
+        if frame is None:
+            # The future or iterator at the bottom of the chain
+            chain.append(f"<{type(awaitable).__name__}>")
+            break
+        code = frame.f_code
+        chain.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        awaitable = (
+            getattr(awaitable, "cr_await", None)
+            or getattr(awaitable, "gi_yieldfrom", None)
+            or getattr(awaitable, "ag_await", None)
+        )
+    return chain
+
+
+def dump_tasks() -> List[Dict]:
+    """Every pending task of the running loop with what it is awaiting"""
+    current = asyncio.current_task()
+    return [
+        {
+            "name": task.get_name(),
+            "coro": getattr(task.get_coro(), "__qualname__", repr(task.get_coro())),
+            "awaiting": _await_chain(task.get_coro()),
+        }
+        for task in asyncio.all_tasks()
+        if task is not current and not task.done()
+    ]
+
+
+async def measure_loop_lag(seconds: float, interval: float = LAG_PROBE_INTERVAL) -> Dict:
+    """
+    Sleep in short steps and measure how late the loop wakes up.
+
+    Returns:
+        Dict: Probe count with mean, p50, p99 and max lag in milliseconds
+    """
+    loop = asyncio.get_running_loop()
+    lags = []
+    deadline = loop.time() + seconds
+    while loop.time() < deadline:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - start - interval) * 1000)
+    lags.sort()
+    if not lags:
+        return {"probes": 0}
+    return {
+        "probes": len(lags),
+        "mean_ms": round(sum(lags) / len(lags), 3),
+        "p50_ms": round(lags[len(lags) // 2], 3),
+        "p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))], 3),
+        "max_ms": round(lags[-1], 3),
+    }
+
+
+async def profile(seconds: float, interval: float = SAMPLE_INTERVAL) -> Dict:
+    """
+    Profile the process for a number of seconds.
+
+    Args:
+        seconds (float): Profile duration, capped at MAX_PROFILE_SECONDS
+        interval (float, optional): Seconds between stack samples
+
+    Returns:
+        Dict: {"seconds", "samples", "collapsed", "loop_lag", "tasks"}
+
+    Raises:
+        ProfilerBusyError: If a profile is already running
+    """
+    seconds = min(max(seconds, interval), MAX_PROFILE_SECONDS)
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusyError("A profile is already running")
+    try:
+        profiler = SamplingProfiler(interval)
+        profiler.start()
+        try:
+            loop_lag = await measure_loop_lag(seconds)
+        finally:
+            profiler.stop()
+        return {
+            "seconds": seconds,
+            "samples": profiler.samples,
+            "collapsed": profiler.collapsed(),
+            "loop_lag": loop_lag,
+            "tasks": dump_tasks(),
+        }
+    finally:
+        _profile_lock.release()
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Check an admin token, always False when ADMIN_TOKEN is not set"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    if token.startswith("Bearer "):
+        token = token[len("Bearer "):]
+    return hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+async def profile_to_files(seconds: float, directory: str) -> str:
+    """Profile and write <prefix>.folded and <prefix>.json, returning the prefix"""
+    result = await profile(seconds)
+    os.makedirs(directory, exist_ok=True)
+    prefix = os.path.join(directory, f"profile-{os.getpid()}-{int(time.time())}")
+    with open(f"{prefix}.folded", "w") as f:
+        f.write(result.pop("collapsed"))
+    with open(f"{prefix}.json", "w") as f:
+        json.dump(result, f, indent=2)
+    return prefix
+
+
+def install_signal_handler(
+    seconds: float = float(os.getenv("PROFILE_SIGNAL_SECONDS", 10)),
+    directory: str = os.getenv("PROFILE_DIR", "profiles"),
+) -> bool:
+    """
+    Profile on SIGUSR2 and write the result to directory.
+
+    Must be called from the running loop. Returns False where the loop
+    does not support signal handlers.
+    """
+    if not hasattr(signal, "SIGUSR2"):
+        return False
+    loop = asyncio.get_running_loop()
+    tasks = set()
+
+    async def run():
+        try:
+            prefix = await profile_to_files(seconds, directory)
+            logger.warning("profile_written", path=prefix)
+        except (ProfilerBusyError, OSError) as e:
+            logger.error("profile_failed", error=str(e))
+
+    def on_signal():
+        task = loop.create_task(run())
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    try:
+        loop.add_signal_handler(signal.SIGUSR2, on_signal)
+    except (NotImplementedError, RuntimeError):
+        return False
+    return True
@@ -0,0 +1,295 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from injective_functions.utils.function_helper import (
+    FunctionSchemaLoader,
+    InjectiveFunctionMapper,
+)
+
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+# Every module keeps its schemas in <module>/<module>_schema.json
+SCHEMA_GLOB = "*/*_schema.json"
+DEFAULT_ARTIFACT_PATH = os.getenv(
+    "SCHEMA_REGISTRY_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "iagent", "schema_registry.json"),
+)
+# Most tools sent to the model on one step, 0 sends every tool.
+# A smaller subset is a shorter prompt, but every change of subset also
+# changes the cached prompt prefix; 0 keeps the prefix identical.
+MAX_TOOLS = int(os.getenv("SCHEMA_REGISTRY_MAX_TOOLS", 8))
+# Extra score of a keyword that is part of the function name
+NAME_BOOST = 2
+# Extra score of a function the user calls by its exact name
+EXACT_NAME_BOOST = 10
+ARTIFACT_VERSION = 2
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from",
+    "get", "i", "in", "is", "it", "me", "my", "of", "on", "or", "please", "show",
+    "that", "the", "this", "to", "what", "with", "you", "your", "id", "ids",
+}
+# Words users say mapped to the keywords the schemas use
+SYNONYMS = {
+    "send": "transfer",
+    "pay": "transfer",
+    "bid": "auction",
+    "delegate": "stake",
+    "staking": "stake",
+    "perp": "derivative",
+    "perpetual": "derivative",
+    "futures": "derivative",
+    "price": "mid",
+    "book": "orderbook",
+    "token": "denom",
+    "wallet": "balance",
+    "permission": "grant",
+    "transaction": "tx",
+    "hash": "tx",
+}
+
+
+def tokenize(text: str, synonyms: bool = True) -> Set[str]:
+    """
+    Normalize text into index keywords.
+
+    Synonyms only apply to what users say: schema text keeps its own words,
+    so "send" in send_bid_auction does not read as "transfer".
+    """
+    keywords = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOP_WORDS or len(word) < 2:
+            continue
+        if synonyms:
+            word = SYNONYMS.get(word, word)
+        # crude plural folding: balances -> balance, orders -> order
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        keywords.add(word)
+    return keywords
+
+
+def _schema_keywords(schema: dict) -> Set[str]:
+    parameters = schema.get("parameters", {}).get("properties", {})
+    text = " ".join(
+        [schema["name"].replace("_", " "), schema.get("description", "")]
+        + [name.replace("_", " ") for name in parameters]
+    )
+    return tokenize(text, synonyms=False)
+
+
+def _compact(value):
+    """Collapse whitespace of every description in a schema"""
+    if isinstance(value, dict):
+        return {
+            key: " ".join(item.split()) if key == "description" and isinstance(item, str)
+            else _compact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_compact(item) for item in value]
+    return value
+
+
+class SchemaRegistry:
+    """
+    Function schemas compiled once into a compact artifact, with a keyword
+    index used to send the model only the tools relevant to a turn.
+    """
+
+    _loaded: Optional["SchemaRegistry"] = None
+
+    def __init__(self, tools: List[dict], index: Dict[str, List[str]], source_hash: str):
+        self.tools = tools
+        self.index = index
+        self.source_hash = source_hash
+        self.tools_by_name = {tool["function"]["name"]: tool for tool in tools}
+        self.name_keywords = {
+            name: tokenize(name.replace("_", " "), synonyms=False)
+            for name in self.tools_by_name
+        }
+
+    @staticmethod
+    def schema_paths() -> List[Path]:
+        return sorted(PACKAGE_DIR.glob(SCHEMA_GLOB))
+
+    @staticmethod
+    def source_hash(paths: Iterable[Path]) -> str:
+        digest = hashlib.sha256()
+        for path in paths:
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, strict: bool = False) -> "SchemaRegistry":
+        """
+        Compile the schema files, validated against FUNCTION_MAP.
+
+        Args:
+            strict (bool, optional): Raise instead of dropping schemas that
+                no client implements
+
+        Returns:
+            SchemaRegistry: Registry of every implemented function
+        """
+        paths = cls.schema_paths()
+        schemas = FunctionSchemaLoader.load_schemas([str(path) for path in paths])
+
+        problems = []
+        seen = set()
+        valid = []
+        for schema in schemas:
+            name = schema.get("name")
+            if name in seen:
+                problems.append(f"duplicate schema {name}")
+            elif not InjectiveFunctionMapper.validate_function(name):
+                problems.append(f"schema {name} is not in FUNCTION_MAP")
+            else:
+                valid.append(_compact(schema))
+            seen.add(name)
+        for name in InjectiveFunctionMapper.FUNCTION_MAP:
+            if name not in seen:
+                problems.append(f"FUNCTION_MAP entry {name} has no schema")
+        if problems and strict:
+            raise ValueError("Invalid function schemas: " + "; ".join(problems))
+        for problem in problems:
+            logger.warning(problem)
+
+        index: Dict[str, List[str]] = {}
+        for schema in valid:
+            client_type, _ = InjectiveFunctionMapper.get_function_mapping(schema["name"])
+            for keyword in _schema_keywords(schema) | tokenize(client_type, synonyms=False):
+                index.setdefault(keyword, []).append(schema["name"])
+
+        return cls(FunctionSchemaLoader.to_tools(valid), index, cls.source_hash(paths))
+
+    def save(self, path: str = DEFAULT_ARTIFACT_PATH) -> None:
+        """Write the compiled registry, atomically"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": ARTIFACT_VERSION,
+                    "source_hash": self.source_hash,
+                    "tools": self.tools,
+                    "index": self.index,
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ARTIFACT_PATH) -> "SchemaRegistry":
+        """
+        Get the process-wide registry, loaded on first use.
+
+        The artifact is reused while the schema files are unchanged, and
+        rebuilt otherwise.
+        """
+        if cls._loaded is not None:
+            return cls._loaded
+        current_hash = cls.source_hash(cls.schema_paths())
+        registry = None
+        try:
+            with open(path, "r") as f:
+                artifact = json.load(f)
+            if (
+                artifact.get("version") == ARTIFACT_VERSION
+                and artifact.get("source_hash") == current_hash
+            ):
+                registry = cls(artifact["tools"], artifact["index"], current_hash)
+        except (OSError, ValueError, KeyError):
+            pass
+        if registry is None:
+            registry = cls.build()
+            try:
+                registry.save(path)
+            except OSError as e:
+                logger.warning(f"Could not write schema registry to {path}: {str(e)}")
+        cls._loaded = registry
+        return registry
+
+    def select(
+        self,
+        texts: Iterable[str],
+        recent_functions: Iterable[str] = (),
+        max_tools: int = MAX_TOOLS,
+        previous: Iterable[str] = (),
+    ) -> List[dict]:
+        """
+        Pick the tools relevant to a turn.
+
+        Args:
+            texts (Iterable[str]): Recent user messages, most recent first
+            recent_functions (Iterable[str]): Functions called recently in the
+                session, kept so confirmations ("yes") can still call them
+            max_tools (int, optional): Most tools to return, 0 for every tool
+            previous (Iterable[str], optional): Tools picked on the previous
+                turn, reused when nothing else matches
+
+        Returns:
+            List[dict]: The most relevant tools in registry order, so the same
+            subset always gives the same prompt. Every tool when nothing
+            matches, so the model never loses a function it needs
+        """
+        if max_tools <= 0:
+            return self.tools
+        scores: Dict[str, float] = {}
+        for name in recent_functions:
+            if name in self.tools_by_name:
+                scores[name] = scores.get(name, 0) + 1
+        for weight, text in zip((3, 2, 1), texts):
+            lowered = text.lower()
+            keywords = tokenize(text)
+            for keyword in keywords:
+                matches = self.index.get(keyword, [])
+                for name in matches:
+                    # Rare keywords are stronger evidence than common ones
+                    scores[name] = scores.get(name, 0) + weight / len(matches)
+            for name, name_keywords in self.name_keywords.items():
+                # Verbs and nouns of the function name beat description words
+                bonus = NAME_BOOST * weight * len(keywords & name_keywords)
+                if name in lowered:
+                    bonus += EXACT_NAME_BOOST * weight
+                if bonus:
+                    scores[name] = scores.get(name, 0) + bonus
+        if not scores:
+            # A bare follow-up ("yes") keeps the tools of the previous turn
+            scores = {name: 1 for name in previous if name in self.tools_by_name}
+            if not scores:
+                return self.tools
+        chosen = set(sorted(scores, key=lambda name: scores[name], reverse=True)[:max_tools])
+        return [tool for tool in self.tools if tool["function"]["name"] in chosen]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the function schema registry")
+    parser.add_argument("--output", default=DEFAULT_ARTIFACT_PATH, help="Artifact path")
+    parser.add_argument(
+        "--strict", action="store_true", help="Fail on schemas FUNCTION_MAP does not cover"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+    try:
+        registry = SchemaRegistry.build(strict=args.strict)
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+    registry.save(args.output)
+    print(f"Wrote {len(registry.tools)} tools to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
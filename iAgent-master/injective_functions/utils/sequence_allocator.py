@@ -0,0 +1,149 @@
+import asyncio
+import re
+from typing import Dict, Optional, Tuple
+
+
+SEQUENCE_MISMATCH_RE = re.compile(
+    r"account sequence mismatch, expected (\d+)", re.IGNORECASE
+)
+
+
+def is_sequence_mismatch(error) -> bool:
+    """Check if a chain error or raw log is an account sequence mismatch"""
+    return bool(SEQUENCE_MISMATCH_RE.search(str(error)))
+
+
+class SequenceReservation:
+    """A sequence number handed out to one transaction builder."""
+
+    def __init__(self, sequence: int) -> None:
+        self.sequence = sequence
+        # Set when a gap or a resync makes this sequence unusable
+        self.stale = False
+
+
+class SequenceAllocator:
+    """
+    Per-account allocator of transaction sequence numbers.
+
+    Concurrent builders reserve increasing sequences up front, prepare their
+    transactions in parallel and then wait for their turn, so broadcasts hit
+    the mempool in sequence order while several signed txs are in flight.
+    Sequences of txs that never reach the mempool are rolled back, and
+    "account sequence mismatch" errors resync the counter from the chain.
+    """
+
+    _registry: Dict[Tuple[str, str], "SequenceAllocator"] = {}
+
+    def __init__(self, client, address: str) -> None:
+        self.client = client
+        self.address = address
+        self._next_sequence: Optional[int] = None
+        self._last_broadcast = -1
+        self._outstanding: Dict[int, SequenceReservation] = {}
+        self._cond = asyncio.Condition()
+
+    @classmethod
+    def for_account(
+        cls, client, chain_id: str, address: str
+    ) -> "SequenceAllocator":
+        """
+        Get the process-wide allocator of an account.
+
+        Args:
+            client (AsyncClient): Client used to resync the account sequence
+            chain_id (str): Chain the account lives on
+            address (str): Bech32 address of the account
+
+        Returns:
+            SequenceAllocator: Shared allocator, bound to the latest client
+        """
+        key = (chain_id, address)
+        allocator = cls._registry.get(key)
+        if allocator is None:
+            allocator = cls(client, address)
+            cls._registry[key] = allocator
+        else:
+            allocator.client = client
+        return allocator
+
+    def seed(self, sequence: int) -> None:
+        """Use a freshly fetched on-chain sequence if none is tracked yet"""
+        if self._next_sequence is None:
+            self._reset(sequence)
+
+    def _reset(self, sequence: int) -> None:
+        for reservation in self._outstanding.values():
+            reservation.stale = True
+        self._outstanding.clear()
+        self._next_sequence = sequence
+        self._last_broadcast = sequence - 1
+        self._cond.notify_all()
+
+    async def sync(self) -> int:
+        """Reload the sequence from chain, invalidating outstanding reservations"""
+        async with self._cond:
+            await self.client.fetch_account(self.address)
+            self._reset(int(self.client.sequence))
+            return self._next_sequence
+
+    async def reserve(self) -> SequenceReservation:
+        """Hand out the next sequence number"""
+        async with self._cond:
+            if self._next_sequence is None:
+                await self.client.fetch_account(self.address)
+                self._reset(int(self.client.sequence))
+            reservation = SequenceReservation(self._next_sequence)
+            self._next_sequence += 1
+            self._outstanding[reservation.sequence] = reservation
+            return reservation
+
+    async def wait_turn(self, reservation: SequenceReservation) -> bool:
+        """
+        Wait until every lower sequence has been broadcast or released.
+
+        Returns:
+            bool: False if the reservation went stale and must be retried
+        """
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: reservation.stale
+                or min(self._outstanding) == reservation.sequence
+            )
+            return not reservation.stale
+
+    async def commit(self, reservation: SequenceReservation) -> None:
+        """Mark a sequence as accepted into the mempool"""
+        async with self._cond:
+            if self._outstanding.pop(reservation.sequence, None) is reservation:
+                self._last_broadcast = max(
+                    self._last_broadcast, reservation.sequence
+                )
+            self._cond.notify_all()
+
+    async def release(self, reservation: SequenceReservation) -> None:
+        """Roll back a sequence whose tx never reached the mempool"""
+        async with self._cond:
+            if self._outstanding.get(reservation.sequence) is not reservation:
+                return
+            del self._outstanding[reservation.sequence]
+            # Higher reservations cannot have been broadcast yet and would now
+            # leave a gap, so they are invalidated and their builders retry.
+            for sequence in [s for s in self._outstanding if s > reservation.sequence]:
+                self._outstanding.pop(sequence).stale = True
+            self._next_sequence = max([self._last_broadcast, *self._outstanding]) + 1
+            self._cond.notify_all()
+
+    async def resync_from_error(self, error) -> bool:
+        """
+        Resync from the expected sequence reported by a mismatch error.
+
+        Returns:
+            bool: True if the error was a sequence mismatch
+        """
+        match = SEQUENCE_MISMATCH_RE.search(str(error))
+        if not match:
+            return False
+        async with self._cond:
+            self._reset(int(match.group(1)))
+        return True
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Optional
+
+
+# Longest rendered field, sign docs and chat histories are cut to this
+MAX_FIELD_LENGTH = int(os.getenv("LOG_MAX_FIELD_LENGTH", 500))
+
+
+def _render_value(value: Any) -> str:
+    # Fields can be callables, only called when the event is rendered
+    if callable(value):
+        value = value()
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > MAX_FIELD_LENGTH:
+        text = f"{text[:MAX_FIELD_LENGTH]}...({len(text)} chars)"
+    return text
+
+
+class _Event:
+    """Log message rendered only when a handler formats the record"""
+
+    __slots__ = ("event", "fields")
+
+    def __init__(self, event: str, fields: Dict[str, Any]) -> None:
+        self.event = event
+        self.fields = fields
+
+    def rendered_fields(self) -> Dict[str, str]:
+        return {key: _render_value(value) for key, value in self.fields.items()}
+
+    def __str__(self) -> str:
+        parts = [self.event]
+        for key, text in self.rendered_fields().items():
+            if not text or any(char in text for char in ' ="\n'):
+                text = json.dumps(text)
+            parts.append(f"{key}={text}")
+        return " ".join(parts)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, fields of structured events included"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        if isinstance(record.msg, _Event):
+            entry["event"] = record.msg.event
+            entry.update(record.msg.rendered_fields())
+        else:
+            entry["event"] = record.getMessage()
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class StructuredLogger:
+    """
+    Logger of named events with key/value fields.
+
+    Nothing is rendered when the level is disabled, and fields are only
+    turned into text by the handler, so disabled debug events cost one
+    level check.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.logger = logging.getLogger(name)
+        self._sample_counts: Dict[str, int] = {}
+
+    def is_enabled(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level: int, event: str, exc_info=None, **fields) -> None:
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, _Event(event, fields), exc_info=exc_info)
+
+    def debug(self, event: str, **fields) -> None:
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event: str, **fields) -> None:
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event: str, **fields) -> None:
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event: str, **fields) -> None:
+        self.log(logging.ERROR, event, **fields)
+
+    def exception(self, event: str, **fields) -> None:
+        """Log an error with the traceback of the exception being handled"""
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+    def sampled(self, level: int, event: str, every: int, **fields) -> None:
+        """
+        Log one of every `every` occurrences of a high-volume event.
+
+        The logged event carries sampled=every so counts can be scaled back.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        count = self._sample_counts.get(event, 0)
+        self._sample_counts[event] = count + 1
+        if count % every == 0:
+            self.logger.log(level, _Event(event, {**fields, "sampled": every}))
+
+
+_handler: Optional[logging.Handler] = None
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(name)
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None) -> None:
+    """
+    Set up the root handler once.
+
+    Args:
+        level (str, optional): Level name, defaults to LOG_LEVEL or WARNING
+        fmt (str, optional): "text" or "json", defaults to LOG_FORMAT or text
+    """
+    global _handler
+    level = (level or os.getenv("LOG_LEVEL", "WARNING")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _handler is not None:
+        return
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(
+        JsonFormatter()
+        if fmt == "json"
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s")
+    )
+    root.addHandler(_handler)
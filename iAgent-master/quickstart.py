@@ -1,15 +1,19 @@
+import asyncio
 import os
+import statistics
 import sys
 import time
 import threading
 from datetime import datetime
+import aiohttp
 import colorama
 from colorama import Fore, Style, Back
 import requests
+from requests.adapters import HTTPAdapter
 import argparse
 import json
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional
 from app.agent_manager import AgentManager
 
 
@@ -20,12 +24,17 @@ colorama.init()
 class InjectiveCLI:
     """Enhanced CLI interface with agent management"""
 
-    def __init__(self, api_url: str, debug: bool = False):
+    def __init__(self, api_url: str, debug: bool = False, stream: bool = True):
         self.api_url = api_url
         self.debug = debug
+        self.stream = stream
         self.session_id = datetime.now().strftime("%Y%m%d-%H%M%S")
         self.animation_stop = False
         self.agent_manager = AgentManager()
+        # Keep-alive connections reused by every interactive request
+        self.http = requests.Session()
+        self.http.mount("http://", HTTPAdapter(pool_maxsize=4))
+        self.http.mount("https://", HTTPAdapter(pool_maxsize=4))
 
     def clear_screen(self):
         """Clear the terminal screen."""
@@ -208,7 +217,9 @@ class InjectiveCLI:
         print(f"{Fore.YELLOW}Available Commands:")
         print("General: quit, clear, help, history, ping, debug, session")
         print("Network: switch_network [mainnet|testnet]")
-        print("Agents: create_agent, delete_agent, switch_agent, list_agents")
+        print(
+            "Agents: create_agent, create_agents, delete_agent, switch_agent, list_agents"
+        )
         print("=" * 80 + Style.RESET_ALL)
 
     def handle_agent_commands(self, command: str, args: str) -> bool:
@@ -239,6 +250,29 @@ class InjectiveCLI:
                 print(f"Address: {agent_info['address']}")
                 return True
 
+            elif command == "create_agents":
+                parts = args.split()
+                if len(parts) != 2 or not parts[1].isdigit():
+                    print(
+                        f"{Fore.RED}Error: Usage: create_agents <prefix> <count>{Style.RESET_ALL}"
+                    )
+                    return True
+                prefix, count = parts[0], int(parts[1])
+                start = time.perf_counter()
+                # With the server's ADMIN_TOKEN, the server builds their clients right away
+                admin_token = os.getenv("ADMIN_TOKEN")
+                self.agent_manager.create_agents(
+                    [f"{prefix}-{i}" for i in range(count)],
+                    prewarm_url=self.api_url if admin_token else None,
+                    admin_token=admin_token,
+                )
+                print(
+                    f"{Fore.GREEN}Created {count} agents on {self.agent_manager.get_current_network().upper()} "
+                    f"in {time.perf_counter() - start:.2f}s"
+                    f"{' (pre-warmed)' if admin_token else ''}{Style.RESET_ALL}"
+                )
+                return True
+
             elif command == "delete_agent":
                 if not args:
                     print(f"{Fore.RED}Error: Agent name required{Style.RESET_ALL}")
@@ -306,7 +340,7 @@ class InjectiveCLI:
                 return
 
             print(f"DEBUG - Sending request to: {url}")
-            response = requests.post(
+            response = self.http.post(
                 url, json=data, params=params, headers=headers, timeout=60
             )
             
@@ -320,6 +354,184 @@ class InjectiveCLI:
             #print(f"DEBUG - Request error: {str(e)}")
             raise Exception(f"API request failed: {str(e)}")
 
+    def stream_request(self, endpoint: str, data: dict) -> Iterator[dict]:
+        """Make a streaming API request, yielding events as they arrive"""
+        url = f"{self.api_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        headers = {"Content-Type": "application/json", "Accept": "application/x-ndjson"}
+
+        data["stream"] = True
+
+        try:
+            # The read timeout applies between lines, the server sends a
+            # keepalive line while a turn is busy
+            with self.http.post(
+                url, json=data, headers=headers, timeout=(10, 60), stream=True
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("type") != "keepalive":
+                        yield event
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"API request failed: {str(e)}")
+
+    def display_stream(self, events: Iterator[dict]):
+        """Render streamed events as they arrive"""
+        streaming_text = False
+        for event in events:
+            # The first event replaces the spinner
+            self.stop_animation()
+            event_type = event.get("type")
+            if event_type == "token":
+                if not streaming_text:
+                    sys.stdout.write(f"{Fore.BLUE}Response: ")
+                    streaming_text = True
+                sys.stdout.write(event["content"])
+                sys.stdout.flush()
+                continue
+
+            if streaming_text:
+                print(Style.RESET_ALL)
+                streaming_text = False
+
+            if event_type == "function_start":
+                print(f"{Fore.YELLOW}→ Calling {event['name']}...{Style.RESET_ALL}")
+            elif event_type == "function_end":
+                result = event.get("result")
+                failed = isinstance(result, dict) and (
+                    "error" in result or result.get("success") is False
+                )
+                if failed:
+                    print(f"{Fore.RED}✗ {event['name']} failed{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.GREEN}✓ {event['name']} done{Style.RESET_ALL}")
+                if self.debug:
+                    print(
+                        f"{Fore.YELLOW}Debug: {json.dumps(result, indent=2)}{Style.RESET_ALL}"
+                    )
+            elif event_type == "done":
+                if event.get("error"):
+                    print(f"{Fore.RED}Error: {event['error']}{Style.RESET_ALL}")
+                if self.debug:
+                    print(
+                        f"{Fore.YELLOW}Debug: {json.dumps(event, indent=2)}{Style.RESET_ALL}"
+                    )
+        if streaming_text:
+            print(Style.RESET_ALL)
+        print()
+
+    def chat_payload(self, message: str, session_id: str, agent: Optional[dict] = None) -> dict:
+        """
+        Body of a /chat request for an agent, on the agent's own network.
+
+        Without an agent, the current agent and network are used.
+        """
+        if agent is None:
+            agent = self.agent_manager.get_current_agent()
+            environment = self.agent_manager.get_current_network()
+        else:
+            environment = agent["network"]
+        return {
+            "message": message,
+            "session_id": session_id,
+            "agent_id": agent["address"],
+            "agent_key": agent["private_key"],
+            "environment": environment,
+        }
+
+    async def send_batch_prompt(
+        self, session: aiohttp.ClientSession, index: int, prompt: str, agent: dict
+    ) -> dict:
+        """Send one batch prompt, timing the full response and the first token"""
+        url = f"{self.api_url.rstrip('/')}/chat"
+        data = self.chat_payload(prompt, f"{self.session_id}-{index}", agent)
+        data["stream"] = self.stream
+        stat = {"index": index, "prompt": prompt, "status": None, "error": None, "ttft": None}
+        start = time.perf_counter()
+        try:
+            async with session.post(url, json=data) as response:
+                stat["status"] = response.status
+                if not self.stream:
+                    result = await response.json()
+                    stat["error"] = result.get("error")
+                else:
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+                        event = json.loads(line)
+                        if stat["ttft"] is None and event.get("type") == "token":
+                            stat["ttft"] = time.perf_counter() - start
+                        if event.get("type") == "done":
+                            stat["error"] = event.get("error")
+                if response.status != 200 and not stat["error"]:
+                    stat["error"] = f"HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            stat["error"] = str(e) or type(e).__name__
+        stat["latency"] = time.perf_counter() - start
+
+        color = Fore.RED if stat["error"] else Fore.GREEN
+        print(
+            f"{color}[{index}] {stat['latency']:.2f}s {stat['status']}{Style.RESET_ALL} "
+            f"{prompt[:60]}{' - ' + str(stat['error']) if stat['error'] else ''}"
+        )
+        return stat
+
+    async def run_batch(
+        self, prompts: List[str], concurrency: int, agents: List[dict]
+    ) -> List[dict]:
+        """
+        Send prompts concurrently over one pooled session.
+
+        Prompts are spread round-robin over agents. Prompts of one agent
+        share its chain account, so its transactions still go out one
+        sequence number at a time; use several agents to measure parallel
+        writes.
+        """
+        connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=300)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+            async def send(index: int, prompt: str) -> dict:
+                async with semaphore:
+                    return await self.send_batch_prompt(
+                        session, index, prompt, agents[index % len(agents)]
+                    )
+
+            start = time.perf_counter()
+            stats = await asyncio.gather(
+                *[send(i, prompt) for i, prompt in enumerate(prompts)]
+            )
+            self.display_batch_stats(stats, time.perf_counter() - start)
+            return stats
+
+    def display_batch_stats(self, stats: List[dict], elapsed: float):
+        """Print latency percentiles of a batch run"""
+
+        def percentiles(values: List[float]) -> str:
+            ordered = sorted(values)
+            pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+            return (
+                f"mean {statistics.mean(ordered):.3f}s  p50 {pick(0.5):.3f}s  "
+                f"p95 {pick(0.95):.3f}s  p99 {pick(0.99):.3f}s  max {ordered[-1]:.3f}s"
+            )
+
+        failed = [stat for stat in stats if stat["error"]]
+        print(f"{Fore.CYAN}=" * 80)
+        print(
+            f"Requests: {len(stats)}  Failed: {len(failed)}  "
+            f"Elapsed: {elapsed:.2f}s  Throughput: {len(stats) / elapsed:.2f} req/s"
+        )
+        if stats:
+            print(f"Latency:  {percentiles([stat['latency'] for stat in stats])}")
+        first_tokens = [stat["ttft"] for stat in stats if stat["ttft"] is not None]
+        if first_tokens:
+            print(f"First token: {percentiles(first_tokens)}")
+        print("=" * 80 + Style.RESET_ALL)
+
     def run(self):
         """Run the enhanced CLI interface"""
         self.display_banner()
@@ -359,17 +571,12 @@ class InjectiveCLI:
                 self.start_animation()
 
                 try:
-                    agent = self.agent_manager.get_current_agent()
-                    result = self.make_request(
-                        "/chat",
-                        {
-                            "message": user_input,
-                            "session_id": self.session_id,
-                            "agent_id": agent["address"],
-                            "agent_key": agent["private_key"],
-                            "environment": self.agent_manager.get_current_network(),
-                        },
-                    )
+                    request_data = self.chat_payload(user_input, self.session_id)
+                    if self.stream:
+                        self.display_stream(self.stream_request("/chat", request_data))
+                        continue
+
+                    result = self.make_request("/chat", request_data)
 
                     # Stop animation before displaying response
                     self.stop_animation()
@@ -380,6 +587,9 @@ class InjectiveCLI:
                 except Exception as e:
                     self.stop_animation()
                     print(f"{Fore.RED}Error: {str(e)}{Style.RESET_ALL}")
+                finally:
+                    # Also covers streams that end without any event
+                    self.stop_animation()
 
             except KeyboardInterrupt:
                 self.stop_animation()
@@ -396,11 +606,64 @@ def main():
     parser = argparse.ArgumentParser(description="Injective Chain CLI Client")
     parser.add_argument("--url", default="http://localhost:5000", help="API URL")
     parser.add_argument("--debug", action="store_true", help="Enable debug mode")
+    parser.add_argument(
+        "--no-stream", action="store_true", help="Wait for the full response"
+    )
+    parser.add_argument(
+        "--batch", help="Send the prompts of a file (one per line) and exit"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Batch requests in flight"
+    )
+    parser.add_argument(
+        "--agent",
+        help="Comma-separated agents the batch is spread over, every agent of the network by default",
+    )
+    parser.add_argument(
+        "--network",
+        choices=["mainnet", "testnet"],
+        help="Network of the batch agents, testnet by default without --agent",
+    )
     args = parser.parse_args()
 
     try:
-        cli = InjectiveCLI(args.url, args.debug)
-        cli.run()
+        cli = InjectiveCLI(args.url, args.debug, stream=not args.no_stream)
+        if not args.batch:
+            cli.run()
+            return
+
+        if args.agent:
+            names = [name.strip() for name in args.agent.split(",") if name.strip()]
+        else:
+            network = args.network or cli.agent_manager.get_current_network()
+            names = sorted(
+                name
+                for name, info in cli.agent_manager.list_agents().items()
+                if info.get("network") == network
+            )
+        if not names:
+            raise ValueError("--batch found no agent to use, see --agent")
+        agents = []
+        for name in names:
+            cli.agent_manager.switch_agent(name)
+            agents.append(cli.agent_manager.get_current_agent())
+        # Every request goes out on its agent's network, see chat_payload
+        wrong_network = [
+            name
+            for name, agent in zip(names, agents)
+            if args.network and agent["network"] != args.network
+        ]
+        if wrong_network:
+            raise ValueError(
+                f"Agents not on {args.network}: {', '.join(wrong_network)}"
+            )
+        with open(args.batch, "r") as f:
+            prompts = [
+                line.strip() for line in f if line.strip() and not line.startswith("#")
+            ]
+        stats = asyncio.run(cli.run_batch(prompts, args.concurrency, agents))
+        if any(stat["error"] for stat in stats):
+            sys.exit(1)
     except Exception as e:
         print(f"{Fore.RED}Failed to start CLI: {str(e)}{Style.RESET_ALL}")
         sys.exit(1)
@@ -0,0 +1,39 @@
+from app.conversation_store import RESULT_ROLES, ConversationStore
+
+
+def tool_call(call_id: str) -> dict:
+    return {"id": call_id, "type": "function", "function": {"name": "f", "arguments": "{}"}}
+
+
+def store_with_tool_group(token_budget: int) -> ConversationStore:
+    store = ConversationStore(token_budget=token_budget)
+    for message in [
+        {"role": "user", "content": "check my balances"},
+        {"role": "assistant", "content": None, "tool_calls": [tool_call("1"), tool_call("2")]},
+        {"role": "tool", "tool_call_id": "1", "content": "a" * 200},
+        {"role": "tool", "tool_call_id": "2", "content": "b" * 300},
+    ]:
+        store.append("session", message)
+    return store
+
+
+def test_context_keeps_tool_results_with_their_request_over_budget():
+    context = store_with_tool_group(token_budget=100).context("session")
+
+    assert context[0].get("role") not in RESULT_ROLES
+    assert [message["role"] for message in context][-3:] == ["assistant", "tool", "tool"]
+    assert [call["id"] for call in context[-3]["tool_calls"]] == ["1", "2"]
+
+
+def test_context_starts_on_the_user_message_when_it_fits():
+    context = store_with_tool_group(token_budget=1000).context("session")
+
+    assert [message["role"] for message in context] == ["user", "assistant", "tool", "tool"]
+
+
+def test_context_drops_results_without_their_request():
+    store = ConversationStore(token_budget=1000)
+    store.append("session", {"role": "tool", "tool_call_id": "1", "content": "orphan"})
+    store.append("session", {"role": "user", "content": "hello"})
+
+    assert [message["role"] for message in store.context("session")] == ["user"]